@@ -1,13 +1,39 @@
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import ClassVar, List, Optional
 
 from pydantic import BaseModel, Field, model_validator
 
+from app.config import config
 from app.llm import LLM
 from app.logger import logger
+from app.prompt.memory import SUMMARY_PROMPT
 from app.sandbox.client import SANDBOX_CLIENT
 from app.schema import ROLE_TYPE, AgentState, Memory, Message
+from app.tracing import tracer
+from app.utils.observation_store import ObservationStore
+
+
+def _default_memory() -> Memory:
+    """Create a memory bounded as configured in the [memory] section."""
+    settings = config.memory_config
+    if settings is None:
+        return Memory()
+    memory = Memory(
+        **settings.model_dump(
+            exclude={"summary_llm", "offload_chars", "offload_images"}
+        )
+    )
+    # Spilled outputs are host files, out of reach of the sandbox's file tools
+    offload_chars = None if config.sandbox.use_sandbox else settings.offload_chars
+    if offload_chars or settings.offload_images:
+        store = ObservationStore(
+            config.workspace_root / ".observations",
+            max_chars=offload_chars,
+            offload_images=settings.offload_images,
+        )
+        memory.offloader = store.offload
+    return memory
 
 
 class BaseAgent(BaseModel, ABC):
@@ -31,7 +57,12 @@ class BaseAgent(BaseModel, ABC):
 
     # Dependencies
     llm: LLM = Field(default_factory=LLM, description="Language model instance")
-    memory: Memory = Field(default_factory=Memory, description="Agent's memory store")
+    memory: Memory = Field(
+        default_factory=_default_memory, description="Agent's memory store"
+    )
+    summary_llm: Optional[LLM] = Field(
+        None, description="Cheaper language model summarizing older turns"
+    )
     state: AgentState = Field(
         default=AgentState.IDLE, description="Current agent state"
     )
@@ -42,6 +73,9 @@ class BaseAgent(BaseModel, ABC):
 
     duplicate_threshold: int = 2
 
+    # Characters of each message shown to the summary LLM
+    SUMMARY_ENTRY_CHARS: ClassVar[int] = 2000
+
     class Config:
         arbitrary_types_allowed = True
         extra = "allow"  # Allow extra fields for flexibility in subclasses
@@ -52,7 +86,12 @@ class BaseAgent(BaseModel, ABC):
         if self.llm is None or not isinstance(self.llm, LLM):
             self.llm = LLM(config_name=self.name.lower())
         if not isinstance(self.memory, Memory):
-            self.memory = Memory()
+            self.memory = _default_memory()
+        if self.memory.token_counter is None:
+            self.memory.token_counter = self.llm.token_counter.count_message
+        summary_config = config.memory_config and config.memory_config.summary_llm
+        if self.summary_llm is None and summary_config:
+            self.summary_llm = LLM(config_name=summary_config)
         return self
 
     @asynccontextmanager
@@ -134,29 +173,67 @@ class BaseAgent(BaseModel, ABC):
         results: List[str] = []
         # logger.info(f"[DEBUG] Starting create SANDBOX_CLIENT")
         # await SANDBOX_CLIENT.create()
-        async with self.state_context(AgentState.RUNNING):
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
-            ):
-                self.current_step += 1
-                logger.info(f"Executing step {self.current_step}/{self.max_steps}")
-                step_result = await self.step()
-
-                # Check for stuck state
-                if self.is_stuck():
-                    self.handle_stuck_state()
-
-                results.append(f"Step {self.current_step}: {step_result}")
-
-            if self.current_step >= self.max_steps:
-                self.current_step = 0
-                self.state = AgentState.IDLE
-                results.append(f"Terminated: Reached max steps ({self.max_steps})")
-        # logger.info(f"[Profiling] Prepare to call SANDBOX_CLIENT.cleanup()")
+        with tracer.span("agent.run", agent=self.name) as run_span:
+            async with self.state_context(AgentState.RUNNING):
+                while (
+                    self.current_step < self.max_steps
+                    and self.state != AgentState.FINISHED
+                ):
+                    self.current_step += 1
+                    logger.info(f"Executing step {self.current_step}/{self.max_steps}")
+                    with tracer.span(
+                        "agent.step", agent=self.name, step=self.current_step
+                    ):
+                        await self.compact_memory()
+                        step_result = await self.step()
+
+                    # Check for stuck state
+                    if self.is_stuck():
+                        self.handle_stuck_state()
+
+                    results.append(f"Step {self.current_step}: {step_result}")
+
+                run_span.set(
+                    steps=self.current_step,
+                    finished=self.state == AgentState.FINISHED,
+                )
+                if self.current_step >= self.max_steps:
+                    self.current_step = 0
+                    self.state = AgentState.IDLE
+                    results.append(f"Terminated: Reached max steps ({self.max_steps})")
         # await SANDBOX_CLIENT.cleanup()
-        # logger.info(f"[Profiling] Finish to call SANDBOX_CLIENT.cleanup()")
         return "\n".join(results) if results else "No steps executed"
 
+    async def compact_memory(self) -> None:
+        """Summarize older turns with the summary LLM once memory nears its budget."""
+        if self.summary_llm is None or not self.memory.needs_summary:
+            return
+        before = self.memory.total_tokens
+        try:
+            with tracer.span("memory.summarize", tokens_before=before):
+                summarized = await self.memory.summarize(self._summarize_messages)
+        except Exception as e:
+            logger.warning(f"Memory summarization failed, keeping history: {e}")
+            return
+        if summarized:
+            logger.info(
+                f"🗜️ Summarized older turns: {before} -> "
+                f"{self.memory.total_tokens} memory tokens"
+            )
+
+    async def _summarize_messages(self, messages: List[Message]) -> str:
+        lines = []
+        for msg in messages:
+            text = msg.content or ""
+            for call in msg.tool_calls or []:
+                text += f"\n-> {call.function.name}({call.function.arguments})"
+            speaker = f"{msg.role} ({msg.name})" if msg.name else msg.role
+            lines.append(f"[{speaker}] {text[:self.SUMMARY_ENTRY_CHARS]}")
+        prompt = SUMMARY_PROMPT.format(transcript="\n\n".join(lines))
+        return await self.summary_llm.ask(
+            [Message.user_message(prompt)], stream=False, temperature=0
+        )
+
     @abstractmethod
     async def step(self) -> str:
         """Execute a single step in the agent's workflow.
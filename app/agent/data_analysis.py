@@ -29,7 +29,7 @@ class DataAnalysis(ToolCallAgent):
     # Add general-purpose tools to the tool collection
     available_tools: ToolCollection = Field(
         default_factory=lambda: ToolCollection(
-            NormalPythonExecute(),
+            NormalPythonExecute(persistent_namespace=True),
             VisualizationPrepare(),
             DataVisualization(),
             Terminate(),
@@ -1,5 +1,3 @@
-
-import time
 from typing import Dict, List, Optional
 
 from pydantic import Field, model_validator
@@ -15,6 +13,7 @@ from app.tool.browser_use_tool import BrowserUseTool
 from app.tool.mcp import MCPClients, MCPClientTool
 from app.tool.python_execute import PythonExecute
 from app.tool.str_replace_editor import StrReplaceEditor
+from app.tracing import tracer
 
 
 class Manus(ToolCallAgent):
@@ -46,6 +45,11 @@ class Manus(ToolCallAgent):
     special_tool_names: list[str] = Field(default_factory=lambda: [Terminate().name])
     browser_context_helper: Optional[BrowserContextHelper] = None
 
+    # Route among MCP tools when many are connected; built-in tools stay on
+    tool_router_top_k: Optional[int] = Field(
+        default_factory=lambda: config.mcp_config.tool_top_k
+    )
+
     # Track connected MCP servers
     connected_servers: Dict[str, str] = Field(
         default_factory=dict
@@ -56,6 +60,8 @@ class Manus(ToolCallAgent):
     def initialize_helper(self) -> "Manus":
         """Initialize basic components synchronously."""
         self.browser_context_helper = BrowserContextHelper(self)
+        if not self.always_on_tools:
+            self.always_on_tools = [tool.name for tool in self.available_tools]
         return self
 
     @classmethod
@@ -141,13 +147,10 @@ class Manus(ToolCallAgent):
 
     async def think(self) -> bool:
         """Process current state and decide next actions with appropriate context."""
-        logger.info("[Profiling] Manus.think(): enter")
-        t_start = time.time()
         if not self._initialized:
-            logger.info("[Profiling] Manus.think(): initializing MCP servers...")
-            await self.initialize_mcp_servers()
+            with tracer.span("mcp.initialize"):
+                await self.initialize_mcp_servers()
             self._initialized = True
-            logger.info("[Profiling] Manus.think(): MCP servers initialized.")
 
         original_prompt = self.next_step_prompt
         recent_messages = self.memory.messages[-3:] if self.memory.messages else []
@@ -157,24 +160,16 @@ class Manus(ToolCallAgent):
             if msg.tool_calls
             for tc in msg.tool_calls
         )
-        logger.info(f"[Profiling] Manus.think(): browser_in_use={browser_in_use}")
 
         if browser_in_use:
-            logger.info("[Profiling] Manus.think(): formatting next step prompt for browser context...")
-            self.next_step_prompt = (
-                await self.browser_context_helper.format_next_step_prompt()
-            )
-            logger.info("[Profiling] Manus.think(): next_step_prompt updated for browser context.")
+            with tracer.span("browser.state"):
+                self.next_step_prompt = (
+                    await self.browser_context_helper.format_next_step_prompt()
+                )
 
-        t_parent_start = time.time()
         result = await super().think()
-        t_parent_end = time.time()
-        logger.info(f"[Profiling] Manus.think(): super().think() time={(t_parent_end-t_parent_start):.3f}s")
 
         # Restore original prompt
         self.next_step_prompt = original_prompt
 
-        t_end = time.time()
-        logger.info(f"[Profiling] Manus.think(): total time={(t_end-t_start):.3f}s")
-        logger.info("[Profiling] Manus.think(): exit")
         return result
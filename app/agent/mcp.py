@@ -3,6 +3,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from pydantic import Field
 
 from app.agent.toolcall import ToolCallAgent
+from app.config import config
 from app.logger import logger
 from app.prompt.mcp import MULTIMEDIA_RESPONSE_PROMPT, NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import AgentState, Message
@@ -37,6 +38,11 @@ class MCPAgent(ToolCallAgent):
     # Special tool names that should trigger termination
     special_tool_names: List[str] = Field(default_factory=lambda: ["terminate"])
 
+    # Offer only the most relevant tools per step when the server has many
+    tool_router_top_k: Optional[int] = Field(
+        default_factory=lambda: config.mcp_config.tool_top_k
+    )
+
     async def initialize(
         self,
         connection_type: Optional[str] = None,
@@ -1,13 +1,12 @@
 from abc import ABC, abstractmethod
-import time
 from typing import Optional
 
 from pydantic import Field
 
 from app.agent.base import BaseAgent
 from app.llm import LLM
-from app.schema import AgentState, Memory
-from app.logger import logger
+from app.schema import AgentState
+from app.tracing import tracer
 
 
 class ReActAgent(BaseAgent, ABC):
@@ -18,7 +17,6 @@ class ReActAgent(BaseAgent, ABC):
     next_step_prompt: Optional[str] = None
 
     llm: Optional[LLM] = Field(default_factory=LLM)
-    memory: Memory = Field(default_factory=Memory)
     state: AgentState = AgentState.IDLE
 
     max_steps: int = 10
@@ -34,16 +32,10 @@ class ReActAgent(BaseAgent, ABC):
 
     async def step(self) -> str:
         """Execute a single step: think and act."""
-        logger.info(f"[Profiling] Think starting")
-        t1 = time.time()
-        should_act = await self.think()
-        logger.info(f"[Profiling] Think completed")
-        logger.info(f"[Profiling] Think completed in {time.time()-t1:.6f}s")
+        with tracer.span("agent.think", agent=self.name) as span:
+            should_act = await self.think()
+            span.set(should_act=should_act)
         if not should_act:
             return "Thinking complete - no action needed"
-        logger.info(f"[Profiling] Act starting")
-        t2 = time.time()
-        ret = await self.act()
-        logger.info(f"[Profiling] Act completed")
-        logger.info(f"[Profiling] Act completed in {time.time()-t2:.6f}s")
-        return ret
+        with tracer.span("agent.act", agent=self.name):
+            return await self.act()
@@ -1,7 +1,6 @@
 import asyncio
-import time
 import json
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import Field
 
@@ -11,6 +10,8 @@ from app.logger import logger
 from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import TOOL_CHOICE_TYPE, AgentState, Message, ToolCall, ToolChoice
 from app.tool import CreateChatCompletion, Terminate, ToolCollection
+from app.tool.tool_router import ToolRouter
+from app.tracing import tracer
 
 
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
@@ -37,30 +38,46 @@ class ToolCallAgent(ReActAgent):
     max_steps: int = 30
     max_observe: Optional[Union[int, bool]] = None
 
+    # Run concurrency-safe tool calls from the same step concurrently
+    parallel_tool_calls: bool = False
+    max_parallel_tool_calls: int = 4
+
+    # Stream the LLM response and start concurrency-safe tool calls as soon as
+    # their arguments are complete, while the model is still generating
+    stream_tool_calls: bool = False
+    _prefetched_tool_calls: Dict[str, asyncio.Task] = {}
+
+    # (key, system messages, tool schemas, schema tokens), see _prompt_prefix
+    _prompt_prefix_cache: Optional[Tuple[Any, ...]] = None
+
+    # Offer only the top-k most relevant tools per step once the collection
+    # holds more; special and always-on tools are always offered
+    tool_router_top_k: Optional[int] = None
+    always_on_tools: List[str] = Field(default_factory=list)
+    tool_schema_tokens_saved: int = 0
+    _tool_router: Optional[ToolRouter] = None
+
     async def think(self) -> bool:
         """Process current state and decide next actions using tools"""
-        logger.info(f"[Profiling] ToolCallAgent.think(): enter for agent {self.name}")
-        t_start = time.time()
         if self.next_step_prompt:
-            logger.info(f"[Profiling] ToolCallAgent.think(): next_step_prompt present, adding user message.")
             user_msg = Message.user_message(self.next_step_prompt)
             self.messages += [user_msg]
 
         try:
-            t_llm_start = time.time()
             # Get response with tool options
-            response = await self.llm.ask_tool(
+            ask = (
+                self._ask_tool_streaming
+                if self.stream_tool_calls
+                else self.llm.ask_tool
+            )
+            system_msgs, tools, tool_tokens = self._prompt_prefix()
+            response = await ask(
                 messages=self.messages,
-                system_msgs=(
-                    [Message.system_message(self.system_prompt)]
-                    if self.system_prompt
-                    else None
-                ),
-                tools=self.available_tools.to_params(),
+                system_msgs=system_msgs,
+                tools=tools,
                 tool_choice=self.tool_choices,
+                tool_tokens=tool_tokens,
             )
-            t_llm_end = time.time()
-            logger.info(f"[Profiling] ToolCallAgent.think(): llm.ask_tool time={(t_llm_end-t_llm_start):.3f}s")
         except ValueError:
             raise
         except Exception as e:
@@ -76,14 +93,14 @@ class ToolCallAgent(ReActAgent):
                     )
                 )
                 self.state = AgentState.FINISHED
-                logger.info(f"[Profiling] ToolCallAgent.think(): exit (token limit error)")
+                tracer.current().set(error="token limit exceeded")
                 return False
             raise
 
-        t_response_start = time.time()
         self.tool_calls = tool_calls = (
             response.tool_calls if response and response.tool_calls else []
         )
+        tracer.current().set(tool_calls=len(tool_calls))
         content = response.content if response and response.content else ""
 
         # Log response info
@@ -109,9 +126,7 @@ class ToolCallAgent(ReActAgent):
                     )
                 if content:
                     self.memory.add_message(Message.assistant_message(content))
-                    logger.info(f"[Profiling] ToolCallAgent.think(): exit (NONE mode, content)")
                     return True
-                logger.info(f"[Profiling] ToolCallAgent.think(): exit (NONE mode, no content)")
                 return False
 
             # Create and add assistant message
@@ -123,19 +138,12 @@ class ToolCallAgent(ReActAgent):
             self.memory.add_message(assistant_msg)
 
             if self.tool_choices == ToolChoice.REQUIRED and not self.tool_calls:
-                logger.info(f"[Profiling] ToolCallAgent.think(): exit (REQUIRED mode, no tool_calls)")
                 return True  # Will be handled in act()
 
             # For 'auto' mode, continue with content if no commands but content exists
             if self.tool_choices == ToolChoice.AUTO and not self.tool_calls:
-                logger.info(f"[Profiling] ToolCallAgent.think(): exit (AUTO mode, no tool_calls, content={bool(content)})")
                 return bool(content)
 
-            t_response_end = time.time()
-            logger.info(f"[Profiling] ToolCallAgent.think(): response handling time={(t_response_end-t_response_start):.3f}s")
-            t_end = time.time()
-            logger.info(f"[Profiling] ToolCallAgent.think(): total time={(t_end-t_start):.3f}s")
-            logger.info(f"[Profiling] ToolCallAgent.think(): exit (tool_calls={bool(self.tool_calls)})")
             return bool(self.tool_calls)
         except Exception as e:
             logger.error(f"🚨 Oops! The {self.name}'s thinking process hit a snag: {e}")
@@ -144,9 +152,108 @@ class ToolCallAgent(ReActAgent):
                     f"Error encountered while processing: {str(e)}"
                 )
             )
-            logger.info(f"[Profiling] ToolCallAgent.think(): exit (exception)")
+            tracer.current().set(error=str(e))
             return False
 
+    def select_tools(self) -> Optional[List[str]]:
+        """Names of the tools to offer the model in this step (None for all)
+
+        With tool_router_top_k set, large collections are narrowed to the
+        tools that best match the task and the latest messages.
+        """
+        tools = self.available_tools
+        top_k = self.tool_router_top_k
+        always = [*self.special_tool_names, *self.always_on_tools]
+        if not top_k or len(tools.tools) <= top_k + len(always):
+            return None
+
+        if self._tool_router is None or self._tool_router.collection is not tools:
+            self._tool_router = ToolRouter(tools)
+        names = self._tool_router.select(self._routing_query(), top_k, always)
+
+        counter = self.llm.token_counter
+        saved = tools.token_cost(counter) - tools.token_cost(counter, names)
+        self.tool_schema_tokens_saved += saved
+        logger.info(
+            f"🧭 Offering {len(names)} of {len(tools.tools)} tools, "
+            f"saving {saved} schema tokens (total saved: {self.tool_schema_tokens_saved})"
+        )
+        return names
+
+    def _routing_query(self, recent: int = 4, max_chars: int = 4000) -> str:
+        """Text the tools are ranked against: the task and the latest messages"""
+        messages = [m for m in self.messages if m.content and m.role != "system"]
+        # The next-step prompt just added to memory says nothing about the task
+        if self.next_step_prompt and messages:
+            if messages[-1].content == self.next_step_prompt:
+                messages = messages[:-1]
+        task = next((m for m in messages if m.role == "user"), None)
+        task_text = task.content[: max_chars // 2] if task else ""
+        recent_text = " ".join(m.content for m in messages[-recent:] if m is not task)
+        return f"{task_text} {recent_text[-(max_chars // 2):]}"
+
+    def _prompt_prefix(self) -> Tuple[Optional[List[dict]], List[dict], int]:
+        """System messages, tool schemas and their token cost for this step
+
+        Rebuilt only when the system prompt, the tool collection or the tool
+        selection changes. Reusing them keeps the request prefix identical
+        between steps, which is what provider-side prompt caching keys on.
+        """
+        names = self.select_tools()
+        tools = self.available_tools
+        key = (
+            self.system_prompt,
+            id(tools),
+            tools.version,
+            None if names is None else tuple(names),
+        )
+        if self._prompt_prefix_cache is None or self._prompt_prefix_cache[0] != key:
+            system_msgs = (
+                [Message.system_message(self.system_prompt).to_dict()]
+                if self.system_prompt
+                else None
+            )
+            self._prompt_prefix_cache = (
+                key,
+                system_msgs,
+                tools.to_params(names),
+                tools.token_cost(self.llm.token_counter, names),
+            )
+        return self._prompt_prefix_cache[1:]
+
+    async def _ask_tool_streaming(self, **kwargs):
+        """Stream the LLM response, prefetching concurrency-safe tool calls"""
+        self._cancel_prefetched_tool_calls()
+        stream = await self.llm.ask_tool_stream(**kwargs)
+        try:
+            async for command in stream:
+                if self.tool_choices != ToolChoice.NONE and self._is_concurrency_safe(
+                    command
+                ):
+                    logger.info(
+                        f"⚡ Starting '{command.function.name}' while the response streams"
+                    )
+                    self._prefetched_tool_calls[command.id] = asyncio.create_task(
+                        self._execute_tool_call(command)
+                    )
+        except BaseException:
+            self._cancel_prefetched_tool_calls()
+            raise
+        return stream.message
+
+    def _cancel_prefetched_tool_calls(self) -> None:
+        """Cancel prefetched tool calls that were never consumed by act()"""
+        for task in self._prefetched_tool_calls.values():
+            task.cancel()
+        self._prefetched_tool_calls.clear()
+
+    async def _await_tool_call(self, command: ToolCall) -> Tuple[str, Optional[str]]:
+        """Return the outcome of a prefetched tool call, or execute it now"""
+        task = self._prefetched_tool_calls.pop(command.id, None)
+        if task is not None:
+            return await task
+        return await self._execute_tool_call(command)
+
     async def act(self) -> str:
         """Execute tool calls and handle their results"""
         if not self.tool_calls:
@@ -156,75 +263,138 @@ class ToolCallAgent(ReActAgent):
             # Return last message content if no tool calls
             return self.messages[-1].content or "No content or commands to execute"
 
+        if self.parallel_tool_calls and len(self.tool_calls) > 1:
+            return await self._act_concurrently()
+
         results = []
         for command in self.tool_calls:
             # Reset base64_image for each tool call
             self._current_base64_image = None
 
             result = await self.execute_tool(command)
+            results.append(
+                self._record_tool_result(command, result, self._current_base64_image)
+            )
 
-            if self.max_observe:
-                result = result[: self.max_observe]
+        return "\n\n".join(results)
 
-            logger.info(
-                f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
-            )
+    async def _act_concurrently(self) -> str:
+        """Execute tool calls concurrently where the tools allow it.
 
-            # Add tool response to memory
-            tool_msg = Message.tool_message(
-                content=result,
-                tool_call_id=command.id,
-                name=command.function.name,
-                base64_image=self._current_base64_image,
-            )
-            self.memory.add_message(tool_msg)
-            results.append(result)
+        Consecutive concurrency-safe calls are gathered under a semaphore, while
+        any other call acts as a barrier and runs on its own. Tool messages are
+        still added to memory in the original call order.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel_tool_calls))
 
+        async def run_limited(command: ToolCall) -> Tuple[str, Optional[str]]:
+            async with semaphore:
+                return await self._await_tool_call(command)
+
+        outcomes: List[Tuple[str, Optional[str]]] = []
+        batch: List[ToolCall] = []
+        for command in self.tool_calls:
+            if self._is_concurrency_safe(command):
+                batch.append(command)
+                continue
+            if batch:
+                outcomes.extend(await asyncio.gather(*map(run_limited, batch)))
+                batch = []
+            outcomes.append(await self._await_tool_call(command))
+        if batch:
+            outcomes.extend(await asyncio.gather(*map(run_limited, batch)))
+
+        results = [
+            self._record_tool_result(command, result, base64_image)
+            for command, (result, base64_image) in zip(self.tool_calls, outcomes)
+        ]
         return "\n\n".join(results)
 
+    def _is_concurrency_safe(self, command: ToolCall) -> bool:
+        """Check whether a tool call may run alongside other tool calls"""
+        tool = self.available_tools.get_tool(command.function.name)
+        if not tool:
+            return False
+        try:
+            args = json.loads(command.function.arguments or "{}")
+        except json.JSONDecodeError:
+            return False
+        return isinstance(args, dict) and tool.is_concurrency_safe(**args)
+
+    def _record_tool_result(
+        self, command: ToolCall, result: str, base64_image: Optional[str] = None
+    ) -> str:
+        """Truncate a tool observation and add it to memory as a tool message"""
+        if self.max_observe:
+            result = result[: self.max_observe]
+
+        logger.info(
+            f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
+        )
+
+        # Add tool response to memory
+        tool_msg = Message.tool_message(
+            content=result,
+            tool_call_id=command.id,
+            name=command.function.name,
+            base64_image=base64_image,
+        )
+        self.memory.add_message(tool_msg)
+        return result
+
     async def execute_tool(self, command: ToolCall) -> str:
         """Execute a single tool call with robust error handling"""
+        result, base64_image = await self._await_tool_call(command)
+        if base64_image:
+            # Store the base64_image for later use in tool_message
+            self._current_base64_image = base64_image
+        return result
+
+    async def _execute_tool_call(self, command: ToolCall) -> Tuple[str, Optional[str]]:
+        """Execute a tool call and return its observation and optional image"""
         if not command or not command.function or not command.function.name:
-            return "Error: Invalid command format"
+            return "Error: Invalid command format", None
 
         name = command.function.name
         if name not in self.available_tools.tool_map:
-            return f"Error: Unknown tool '{name}'"
+            return f"Error: Unknown tool '{name}'", None
 
-        try:
-            # Parse arguments
-            args = json.loads(command.function.arguments or "{}")
+        with tracer.span("tool.execute", tool=name, call_id=command.id) as span:
+            try:
+                # Parse arguments
+                args = json.loads(command.function.arguments or "{}")
 
-            # Execute the tool
-            logger.info(f"🔧 Activating tool: '{name}'...")
-            result = await self.available_tools.execute(name=name, tool_input=args)
+                # Execute the tool
+                logger.info(f"🔧 Activating tool: '{name}'...")
+                result = await self.available_tools.execute(name=name, tool_input=args)
 
-            # Handle special tools
-            await self._handle_special_tool(name=name, result=result)
+                # Handle special tools
+                await self._handle_special_tool(name=name, result=result)
 
-            # Check if result is a ToolResult with base64_image
-            if hasattr(result, "base64_image") and result.base64_image:
-                # Store the base64_image for later use in tool_message
-                self._current_base64_image = result.base64_image
+                # Check if result is a ToolResult with base64_image
+                base64_image = getattr(result, "base64_image", None) or None
 
-            # Format result for display (standard case)
-            observation = (
-                f"Observed output of cmd `{name}` executed:\n{str(result)}"
-                if result
-                else f"Cmd `{name}` completed with no output"
-            )
+                # Format result for display (standard case)
+                observation = (
+                    f"Observed output of cmd `{name}` executed:\n{str(result)}"
+                    if result
+                    else f"Cmd `{name}` completed with no output"
+                )
 
-            return observation
-        except json.JSONDecodeError:
-            error_msg = f"Error parsing arguments for {name}: Invalid JSON format"
-            logger.error(
-                f"📝 Oops! The arguments for '{name}' don't make sense - invalid JSON, arguments:{command.function.arguments}"
-            )
-            return f"Error: {error_msg}"
-        except Exception as e:
-            error_msg = f"⚠️ Tool '{name}' encountered a problem: {str(e)}"
-            logger.exception(error_msg)
-            return f"Error: {error_msg}"
+                span.add(output_chars=len(observation))
+                return observation, base64_image
+            except json.JSONDecodeError:
+                error_msg = f"Error parsing arguments for {name}: Invalid JSON format"
+                logger.error(
+                    f"📝 Oops! The arguments for '{name}' don't make sense - invalid JSON, arguments:{command.function.arguments}"
+                )
+                span.set(error="invalid JSON arguments")
+                return f"Error: {error_msg}", None
+            except Exception as e:
+                error_msg = f"⚠️ Tool '{name}' encountered a problem: {str(e)}"
+                logger.exception(error_msg)
+                span.set(error=str(e))
+                return f"Error: {error_msg}", None
 
     async def _handle_special_tool(self, name: str, result: Any, **kwargs):
         """Handle special tool execution and state changes"""
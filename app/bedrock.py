@@ -81,6 +81,9 @@ class ChatCompletions:
                     }
                 }
                 bedrock_tools.append(bedrock_tool)
+                if tool.get("cache_control"):
+                    # Prompt caching breakpoint after this tool definition
+                    bedrock_tools.append({"cachePoint": {"type": "default"}})
         return bedrock_tools
 
     def _convert_openai_messages_to_bedrock_format(self, messages):
@@ -89,7 +92,14 @@ class ChatCompletions:
         system_prompt = []
         for message in messages:
             if message.get("role") == "system":
-                system_prompt = [{"text": message.get("content")}]
+                content = message.get("content")
+                if isinstance(content, list):
+                    # Text parts, possibly carrying a prompt caching breakpoint
+                    system_prompt = [{"text": part["text"]} for part in content]
+                    if any(part.get("cache_control") for part in content):
+                        system_prompt.append({"cachePoint": {"type": "default"}})
+                else:
+                    system_prompt = [{"text": content}]
             elif message.get("role") == "user":
                 bedrock_message = {
                     "role": message.get("role", "user"),
@@ -188,6 +198,11 @@ class ChatCompletions:
                     "inputTokens", 0
                 ),
                 "total_tokens": bedrock_response.get("usage", {}).get("totalTokens", 0),
+                "prompt_tokens_details": {
+                    "cached_tokens": bedrock_response.get("usage", {}).get(
+                        "cacheReadInputTokens", 0
+                    )
+                },
             },
         }
         return OpenAIResponse(openai_format)
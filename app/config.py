@@ -2,7 +2,7 @@ import json
 import threading
 import tomllib
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -26,8 +26,18 @@ class LLMSettings(BaseModel):
         description="Maximum input tokens to use across all requests (None for unlimited)",
     )
     temperature: float = Field(1.0, description="Sampling temperature")
-    api_type: str = Field(..., description="Azure, Openai, or Ollama")
+    api_type: str = Field(
+        ..., description="Azure, Openai, Ollama, or Mock (see [mock_llm])"
+    )
     api_version: str = Field(..., description="Azure Openai version if AzureOpenai")
+    prompt_cache: bool = Field(
+        True,
+        description="Mark the system prompt and tools as a cacheable prefix for providers that need explicit hints (Anthropic, Bedrock)",
+    )
+    stream_usage: bool = Field(
+        True,
+        description="Request token usage at the end of streamed responses (stream_options.include_usage); disabled automatically if the provider rejects it",
+    )
 
 
 class ProxySettings(BaseModel):
@@ -58,6 +68,38 @@ class SearchSettings(BaseModel):
         default="us",
         description="Country code for search results (e.g., us, cn, uk)",
     )
+    hedged: bool = Field(
+        default=False,
+        description="Race engines: start the next engine if the current one has not answered within hedge_delay",
+    )
+    hedge_delay: float = Field(
+        default=1.5,
+        description="Seconds to wait for an engine before also starting the next one in hedged mode",
+    )
+    adaptive_order: bool = Field(
+        default=False,
+        description="Reorder engines by observed latency and error rate",
+    )
+    cache_enabled: bool = Field(
+        default=True,
+        description="Cache search results and fetched pages on disk",
+    )
+    cache_ttl: int = Field(
+        default=3600,
+        description="Seconds a cached search result stays valid",
+    )
+    page_cache_ttl: int = Field(
+        default=600,
+        description="Seconds a cached page is used before it is revalidated with the server",
+    )
+    cache_max_entries: int = Field(
+        default=2000,
+        description="Maximum number of cached search results and of cached pages",
+    )
+    cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the cache (default: .cache/web_search.sqlite3 in the project root)",
+    )
 
 
 class RunflowSettings(BaseModel):
@@ -66,6 +108,77 @@ class RunflowSettings(BaseModel):
     )
 
 
+class MemorySettings(BaseModel):
+    max_messages: int = Field(
+        default=100, description="Maximum number of messages kept in agent memory"
+    )
+    max_tokens: Optional[int] = Field(
+        default=None,
+        description="Token budget of agent memory; old tool outputs are elided and old turns dropped beyond it (None for unlimited)",
+    )
+    keep_recent: int = Field(
+        default=6,
+        description="Number of most recent messages never elided or summarized",
+    )
+    summarize_at: float = Field(
+        default=0.8,
+        description="Fraction of max_tokens at which older turns are summarized, if summary_llm is set",
+    )
+    summary_llm: Optional[str] = Field(
+        default=None,
+        description="Name of the [llm.<name>] configuration used to summarize older turns (None disables summarization)",
+    )
+    offload_chars: Optional[int] = Field(
+        default=None,
+        description="Tool observations longer than this are saved to a workspace file and kept in memory as a preview (None disables; ignored with use_sandbox, whose file tools cannot read host files)",
+    )
+    offload_images: bool = Field(
+        default=True,
+        description="Keep images in workspace files instead of memory, loading them only when sent",
+    )
+
+
+class TracingSettings(BaseModel):
+    enabled: bool = Field(
+        default=False, description="Record run/step/LLM/tool/sandbox spans"
+    )
+    format: Literal["jsonl", "otlp"] = Field(
+        default="jsonl",
+        description="One flat JSON object per span, or OTLP/JSON export requests",
+    )
+    path: Optional[str] = Field(
+        default=None,
+        description="Trace file (default: logs/trace_<timestamp>.jsonl in the project root)",
+    )
+
+
+class MockLLMSettings(BaseModel):
+    script: Optional[str] = Field(
+        default=None,
+        description="JSON lines file of responses to replay, recorded or scripted (None: every request calls terminate)",
+    )
+    mode: Literal["sequence", "conversation"] = Field(
+        default="sequence",
+        description="Replay the script across all requests in order, or per conversation by its number of assistant messages",
+    )
+    first_token_latency: float = Field(
+        default=0.0, description="Seconds before the first token of each response"
+    )
+    prompt_tokens_per_second: Optional[float] = Field(
+        default=None,
+        description="Prompt processing rate added to the first token latency (None: instant)",
+    )
+    tokens_per_second: Optional[float] = Field(
+        default=None, description="Generation rate of responses (None: instant)"
+    )
+    host: str = Field(default="127.0.0.1", description="Address of run_mock_llm.py")
+    port: int = Field(default=8765, description="Port of run_mock_llm.py")
+    record_path: Optional[str] = Field(
+        default=None,
+        description="Append the tool-call responses of real providers to this file, for replay",
+    )
+
+
 class BrowserSettings(BaseModel):
     headless: bool = Field(False, description="Whether to run browser in headless mode")
     disable_security: bool = Field(
@@ -144,6 +257,10 @@ class MCPSettings(BaseModel):
     servers: Dict[str, MCPServerConfig] = Field(
         default_factory=dict, description="MCP server configurations"
     )
+    tool_top_k: Optional[int] = Field(
+        None,
+        description="Offer agents only the k most relevant tools per step when more tools are connected (None offers all)",
+    )
 
     @classmethod
     def load_server_config(cls) -> Dict[str, MCPServerConfig]:
@@ -189,6 +306,15 @@ class AppConfig(BaseModel):
     daytona_config: Optional[DaytonaSettings] = Field(
         None, description="Daytona configuration"
     )
+    memory_config: Optional[MemorySettings] = Field(
+        None, description="Agent memory configuration"
+    )
+    tracing_config: Optional[TracingSettings] = Field(
+        None, description="Tracing configuration"
+    )
+    mock_llm_config: Optional[MockLLMSettings] = Field(
+        None, description="Mock LLM configuration"
+    )
 
     class Config:
         arbitrary_types_allowed = True
@@ -246,6 +372,8 @@ class Config:
             "temperature": base_llm.get("temperature", 1.0),
             "api_type": base_llm.get("api_type", ""),
             "api_version": base_llm.get("api_version", ""),
+            "prompt_cache": base_llm.get("prompt_cache", True),
+            "stream_usage": base_llm.get("stream_usage", True),
         }
 
         # handle browser config.
@@ -310,6 +438,24 @@ class Config:
             run_flow_settings = RunflowSettings(**run_flow_config)
         else:
             run_flow_settings = RunflowSettings()
+
+        memory_config = raw_config.get("memory")
+        if memory_config:
+            memory_settings = MemorySettings(**memory_config)
+        else:
+            memory_settings = MemorySettings()
+
+        tracing_config = raw_config.get("tracing")
+        if tracing_config:
+            tracing_settings = TracingSettings(**tracing_config)
+        else:
+            tracing_settings = TracingSettings()
+
+        mock_llm_config = raw_config.get("mock_llm")
+        if mock_llm_config:
+            mock_llm_settings = MockLLMSettings(**mock_llm_config)
+        else:
+            mock_llm_settings = MockLLMSettings()
         config_dict = {
             "llm": {
                 "default": default_settings,
@@ -324,6 +470,9 @@ class Config:
             "mcp_config": mcp_settings,
             "run_flow_config": run_flow_settings,
             "daytona_config": daytona_settings,
+            "memory_config": memory_settings,
+            "tracing_config": tracing_settings,
+            "mock_llm_config": mock_llm_settings,
         }
 
         self._config = AppConfig(**config_dict)
@@ -358,6 +507,21 @@ class Config:
         """Get the Run Flow configuration"""
         return self._config.run_flow_config
 
+    @property
+    def memory_config(self) -> MemorySettings:
+        """Get the agent memory configuration"""
+        return self._config.memory_config
+
+    @property
+    def tracing_config(self) -> TracingSettings:
+        """Get the tracing configuration"""
+        return self._config.tracing_config
+
+    @property
+    def mock_llm_config(self) -> MockLLMSettings:
+        """Get the mock LLM configuration"""
+        return self._config.mock_llm_config
+
     @property
     def workspace_root(self) -> Path:
         """Get the workspace root directory"""
@@ -1,6 +1,11 @@
+import functools
+import hashlib
+import json
 import math
+import os
 import time
-from typing import Dict, List, Optional, Union
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
 import tiktoken
 from openai import (
@@ -8,10 +13,17 @@ from openai import (
     AsyncAzureOpenAI,
     AsyncOpenAI,
     AuthenticationError,
+    BadRequestError,
     OpenAIError,
     RateLimitError,
 )
-from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -23,13 +35,17 @@ from app.bedrock import BedrockClient
 from app.config import LLMSettings, config
 from app.exceptions import TokenLimitExceeded
 from app.logger import logger  # Assuming a logger is set up in your app
+from app.mock_llm import MOCK_SCRIPT_ENV, MockClient, ResponseRecorder
 from app.schema import (
     ROLE_VALUES,
     TOOL_CHOICE_TYPE,
     TOOL_CHOICE_VALUES,
     Message,
+    MessageDict,
     ToolChoice,
 )
+from app.tracing import NOOP_SPAN, tracer
+from app.utils.observation_store import ObservationStore
 
 
 REASONING_MODELS = ["o1", "o3-mini"]
@@ -55,8 +71,55 @@ class TokenCounter:
     HIGH_DETAIL_TARGET_SHORT_SIDE = 768
     TILE_SIZE = 512
 
+    # Memoization constants
+    MAX_CACHE_ENTRIES = 4096
+    _MESSAGE_KEY_FIELDS = ("role", "content", "tool_calls", "name", "tool_call_id")
+
     def __init__(self, tokenizer):
         self.tokenizer = tokenizer
+        # Per-message and per-tool-schema token counts keyed by content hash.
+        # A mutated message hashes differently, so stale entries are never hit.
+        self._message_cache: "OrderedDict[str, int]" = OrderedDict()
+        self._tool_cache: "OrderedDict[str, int]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @staticmethod
+    def _hash_key(payload) -> str:
+        """Build a stable content hash for a message or tool schema"""
+        if not isinstance(payload, str):
+            payload = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _cache_get(self, cache: "OrderedDict[str, int]", key: str) -> Optional[int]:
+        tokens = cache.get(key)
+        if tokens is None:
+            self.cache_misses += 1
+            return None
+        cache.move_to_end(key)
+        self.cache_hits += 1
+        return tokens
+
+    def _cache_put(self, cache: "OrderedDict[str, int]", key: str, tokens: int) -> None:
+        cache[key] = tokens
+        if len(cache) > self.MAX_CACHE_ENTRIES:
+            cache.popitem(last=False)
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return token cache hit/miss counters for profiling"""
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "message_entries": len(self._message_cache),
+            "tool_entries": len(self._tool_cache),
+        }
+
+    def clear_cache(self) -> None:
+        """Drop all memoized token counts and reset the counters"""
+        self._message_cache.clear()
+        self._tool_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def count_text(self, text: str) -> int:
         """Calculate tokens for a text string"""
@@ -145,31 +208,279 @@ class TokenCounter:
                 token_count += self.count_text(function.get("arguments", ""))
         return token_count
 
+    def _count_single_message(self, message: dict) -> int:
+        """Calculate tokens for a single formatted message"""
+        tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+
+        # Add role tokens
+        tokens += self.count_text(message.get("role", ""))
+
+        # Add content tokens
+        if "content" in message:
+            tokens += self.count_content(message["content"])
+
+        # Add tool calls tokens
+        if "tool_calls" in message:
+            tokens += self.count_tool_calls(message["tool_calls"])
+
+        # Add name and tool_call_id tokens
+        tokens += self.count_text(message.get("name", ""))
+        tokens += self.count_text(message.get("tool_call_id", ""))
+
+        return tokens
+
     def count_message_tokens(self, messages: List[dict]) -> int:
-        """Calculate the total number of tokens in a message list"""
+        """Calculate the total number of tokens in a message list
+
+        Token counts are memoized per message, so on each agent step only the
+        messages added since the previous call are actually tokenized.
+        """
         total_tokens = self.FORMAT_TOKENS  # Base format tokens
 
         for message in messages:
-            tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+            total_tokens += self.count_message(message)
 
-            # Add role tokens
-            tokens += self.count_text(message.get("role", ""))
+        return total_tokens
+
+    def count_message(self, message: dict) -> int:
+        """Calculate the tokens of a single formatted message, memoized"""
+        if isinstance(message, MessageDict):
+            # Read-only dicts cached on Message objects carry their own count
+            tokens = message.token_counts.get(id(self))
+            if tokens is None:
+                tokens = message.token_counts[id(self)] = self._count_hashed(message)
+            return tokens
+        return self._count_hashed(message)
+
+    def _count_hashed(self, message: dict) -> int:
+        key = self._hash_key(
+            {field: message.get(field) for field in self._MESSAGE_KEY_FIELDS}
+        )
+        tokens = self._cache_get(self._message_cache, key)
+        if tokens is None:
+            tokens = self._count_single_message(message)
+            self._cache_put(self._message_cache, key, tokens)
+        return tokens
+
+    def count_tools(self, tools: Optional[List[dict]]) -> int:
+        """Calculate the total number of tokens in a list of tool schemas"""
+        if not tools:
+            return 0
+
+        token_count = 0
+        for tool in tools:
+            schema = str(tool)
+            key = self._hash_key(schema)
+            tokens = self._cache_get(self._tool_cache, key)
+            if tokens is None:
+                tokens = self.count_text(schema)
+                self._cache_put(self._tool_cache, key, tokens)
+            token_count += tokens
+        return token_count
 
-            # Add content tokens
-            if "content" in message:
-                tokens += self.count_content(message["content"])
 
-            # Add tool calls tokens
-            if "tool_calls" in message:
-                tokens += self.count_tool_calls(message["tool_calls"])
+class StreamUsage:
+    """Token accounting of one streamed completion.
+
+    Providers asked with stream_options.include_usage report the exact usage
+    in the last chunk. Until then, and for providers that never report it,
+    completion tokens are counted per chunk as the deltas arrive, so the
+    full response never has to be tokenized again. The usage is added to
+    `span`, the request span, which ends when the usage is recorded.
+    """
+
+    def __init__(self, llm: "LLM", input_tokens: int, span=NOOP_SPAN):
+        self.llm = llm
+        self.input_tokens = input_tokens
+        self.span = span
+        self.completion_tokens = 0
+        self.usage = None
+        self._recorded = False
+
+    def add(self, chunk: ChatCompletionChunk) -> None:
+        """Account for one chunk of the stream."""
+        if chunk.usage is not None:
+            self.usage = chunk.usage
+        for choice in chunk.choices:
+            delta = choice.delta
+            text = delta.content or ""
+            for call_delta in delta.tool_calls or []:
+                if call_delta.function:
+                    text += call_delta.function.name or ""
+                    text += call_delta.function.arguments or ""
+            if text:
+                self.completion_tokens += self.llm.count_tokens(text)
+
+    def record(self, error: Optional[BaseException] = None) -> None:
+        """Add the usage of the stream to the LLM's totals, once."""
+        if self._recorded:
+            return
+        self._recorded = True
+        # Entered so that update_token_count() adds to the request span
+        with self.span:
+            if self.usage is not None:
+                self.llm.update_token_count(
+                    self.usage.prompt_tokens,
+                    self.usage.completion_tokens,
+                    self.llm.cached_input_tokens(self.usage),
+                )
+            else:
+                logger.info(
+                    f"Estimated completion tokens for streaming response: {self.completion_tokens}"
+                )
+                self.llm.update_token_count(self.input_tokens, self.completion_tokens)
+            self.span.end(error)
 
-            # Add name and tool_call_id tokens
-            tokens += self.count_text(message.get("name", ""))
-            tokens += self.count_text(message.get("tool_call_id", ""))
 
-            total_tokens += tokens
+class ToolCallStream:
+    """Streaming response of LLM.ask_tool_stream, assembled incrementally.
 
-        return total_tokens
+    Iterating yields each tool call as soon as its JSON arguments are
+    complete, while the model may still be generating the rest. When the
+    iteration ends, `message` holds the complete assistant message.
+
+    Timings are in seconds from `started_at`, a time.perf_counter() value:
+        ttft: Time until the first content or tool-call token
+        time_to_first_tool_call: Time until the first complete tool call
+        total_time: Time until the stream ended
+    """
+
+    def __init__(
+        self,
+        chunks: Optional[AsyncIterator[ChatCompletionChunk]],
+        started_at: float,
+        usage: Optional[StreamUsage] = None,
+        on_message: Optional[Callable[[ChatCompletionMessage], None]] = None,
+    ):
+        self._chunks = chunks
+        self._started_at = started_at
+        self._usage = usage
+        self._on_message = on_message
+        self._content: List[str] = []
+        # index -> {"id", "name", "arguments"} of the calls being assembled
+        self._calls: Dict[int, Dict[str, str]] = {}
+        self._emitted: set = set()
+
+        self.message: Optional[ChatCompletionMessage] = None
+        self.ttft: Optional[float] = None
+        self.time_to_first_tool_call: Optional[float] = None
+        self.total_time: Optional[float] = None
+
+    @classmethod
+    def from_message(
+        cls, message: Optional[ChatCompletionMessage], started_at: float
+    ) -> "ToolCallStream":
+        """Wrap a non-streamed response, for providers without streaming."""
+        stream = cls(None, started_at)
+        stream.message = message
+        stream.ttft = stream.time_to_first_tool_call = time.perf_counter() - started_at
+        stream.total_time = stream.ttft
+        return stream
+
+    def __aiter__(self) -> AsyncIterator[ChatCompletionMessageToolCall]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[ChatCompletionMessageToolCall]:
+        if self._chunks is None:
+            for tool_call in (self.message and self.message.tool_calls) or []:
+                yield tool_call
+            return
+
+        error = None
+        try:
+            async for chunk in self._chunks:
+                if self._usage is not None:
+                    self._usage.add(chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if self.ttft is None and (delta.content or delta.tool_calls):
+                    self.ttft = time.perf_counter() - self._started_at
+                if delta.content:
+                    self._content.append(delta.content)
+
+                for call_delta in delta.tool_calls or []:
+                    # A new call index means every earlier call is complete
+                    for index in sorted(self._calls):
+                        if index < call_delta.index and index not in self._emitted:
+                            yield self._emit(index)
+
+                    call = self._calls.setdefault(
+                        call_delta.index, {"id": "", "name": "", "arguments": ""}
+                    )
+                    if call_delta.id:
+                        call["id"] = call_delta.id
+                    if call_delta.function:
+                        call["name"] += call_delta.function.name or ""
+                        call["arguments"] += call_delta.function.arguments or ""
+                    if (
+                        call_delta.index not in self._emitted
+                        and self._arguments_closed(call["arguments"])
+                    ):
+                        yield self._emit(call_delta.index)
+
+            # Calls whose arguments never parsed are still handed over as-is
+            for index in sorted(self._calls):
+                if index not in self._emitted:
+                    yield self._emit(index)
+            self._finish()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Also account for streams that failed or were abandoned
+            if self._usage is not None:
+                self._usage.record(error)
+
+    @staticmethod
+    def _arguments_closed(arguments: str) -> bool:
+        # Only attempt a parse when the arguments can be a complete object
+        if not arguments.rstrip().endswith("}"):
+            return False
+        try:
+            json.loads(arguments)
+            return True
+        except json.JSONDecodeError:
+            return False
+
+    def _tool_call(self, index: int) -> ChatCompletionMessageToolCall:
+        call = self._calls[index]
+        return ChatCompletionMessageToolCall(
+            id=call["id"],
+            type="function",
+            function=Function(name=call["name"], arguments=call["arguments"]),
+        )
+
+    def _emit(self, index: int) -> ChatCompletionMessageToolCall:
+        self._emitted.add(index)
+        if self.time_to_first_tool_call is None:
+            self.time_to_first_tool_call = time.perf_counter() - self._started_at
+        return self._tool_call(index)
+
+    def _finish(self) -> None:
+        self.total_time = time.perf_counter() - self._started_at
+        content = "".join(self._content)
+        tool_calls = [self._tool_call(index) for index in sorted(self._calls)]
+        self.message = ChatCompletionMessage(
+            role="assistant", content=content or None, tool_calls=tool_calls or None
+        )
+        if self._on_message is not None:
+            self._on_message(self.message)
+        if self._usage is not None:
+            self._usage.span.set(
+                ttft=self.ttft, time_to_first_tool_call=self.time_to_first_tool_call
+            )
+
+
+def _traced_request(method):
+    """Run an LLM request method in an `llm.request` span."""
+
+    @functools.wraps(method)
+    async def wrapper(self: "LLM", *args, **kwargs):
+        with tracer.span("llm.request", model=self.model, method=method.__name__):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class LLM:
@@ -193,14 +504,21 @@ class LLM:
             self.model = llm_config.model
             self.max_tokens = llm_config.max_tokens
             self.temperature = llm_config.temperature
-            self.api_type = llm_config.api_type
+            # OPENMANUS_MOCK_LLM switches every LLM to the mock for offline runs
+            self.api_type = (
+                "mock" if os.environ.get(MOCK_SCRIPT_ENV) else llm_config.api_type
+            )
             self.api_key = llm_config.api_key
             self.api_version = llm_config.api_version
             self.base_url = llm_config.base_url
 
+            self.prompt_cache = getattr(llm_config, "prompt_cache", True)
+            self.stream_usage = getattr(llm_config, "stream_usage", True)
+
             # Add token counting related attributes
             self.total_input_tokens = 0
             self.total_completion_tokens = 0
+            self.total_cached_input_tokens = 0
             self.max_input_tokens = (
                 llm_config.max_input_tokens
                 if hasattr(llm_config, "max_input_tokens")
@@ -222,11 +540,21 @@ class LLM:
                 )
             elif self.api_type == "aws":
                 self.client = BedrockClient()
+            elif self.api_type == "mock":
+                self.client = MockClient()
             else:
                 self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
 
             self.token_counter = TokenCounter(self.tokenizer)
 
+            # Tool-call responses of real providers, recorded for the mock
+            record_path = config.mock_llm_config.record_path
+            self.recorder = (
+                ResponseRecorder(record_path)
+                if record_path and self.api_type != "mock"
+                else None
+            )
+
     def count_tokens(self, text: str) -> int:
         """Calculate the number of tokens in a text"""
         if not text:
@@ -236,17 +564,95 @@ class LLM:
     def count_message_tokens(self, messages: List[dict]) -> int:
         return self.token_counter.count_message_tokens(messages)
 
-    def update_token_count(self, input_tokens: int, completion_tokens: int = 0) -> None:
-        """Update token counts"""
+    def token_cache_stats(self) -> Dict[str, int]:
+        """Get token counting cache statistics"""
+        return self.token_counter.cache_stats()
+
+    def update_token_count(
+        self, input_tokens: int, completion_tokens: int = 0, cached_tokens: int = 0
+    ) -> None:
+        """Update token counts; cached_tokens is the part of the input read from the provider's prompt cache"""
         # Only track tokens if max_input_tokens is set
         self.total_input_tokens += input_tokens
         self.total_completion_tokens += completion_tokens
+        self.total_cached_input_tokens += cached_tokens
+        tracer.current().add(
+            input_tokens=input_tokens,
+            completion_tokens=completion_tokens,
+            cached_input_tokens=cached_tokens,
+        )
         logger.info(
-            f"Token usage: Input={input_tokens}, Completion={completion_tokens}, "
-            f"Cumulative Input={self.total_input_tokens}, Cumulative Completion={self.total_completion_tokens}, "
+            f"Token usage: Input={input_tokens} (Cached={cached_tokens}, Uncached={input_tokens - cached_tokens}), "
+            f"Completion={completion_tokens}, "
+            f"Cumulative Input={self.total_input_tokens} (Cached={self.total_cached_input_tokens}), "
+            f"Cumulative Completion={self.total_completion_tokens}, "
             f"Total={input_tokens + completion_tokens}, Cumulative Total={self.total_input_tokens + self.total_completion_tokens}"
         )
 
+    @staticmethod
+    def cached_input_tokens(usage) -> int:
+        """Read the number of prompt-cache hits from a response's usage"""
+        if usage is None:
+            return 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None)
+        if cached is None:
+            # Anthropic-compatible and DeepSeek-style usage fields
+            cached = getattr(usage, "cache_read_input_tokens", None) or getattr(
+                usage, "prompt_cache_hit_tokens", None
+            )
+        return cached or 0
+
+    def apply_cache_hints(
+        self, messages: List[dict], tools: Optional[List[dict]] = None
+    ) -> Tuple[List[dict], Optional[List[dict]]]:
+        """
+        Mark the end of the stable system prompt + tools prefix as cacheable.
+
+        OpenAI-style providers cache a repeated prefix automatically, so only
+        the ordering (tools and system prompt first, unchanged between calls)
+        matters for them. Anthropic models and Bedrock need an explicit
+        cache_control breakpoint, which is added to the last leading system
+        message and, for Bedrock, the last tool. The inputs are not modified.
+
+        Returns:
+            Tuple of (messages, tools) with the hints applied
+        """
+        if not self.prompt_cache or not (
+            self.api_type == "aws" or "claude" in self.model.lower()
+        ):
+            return messages, tools
+
+        cache_control = {"type": "ephemeral"}
+        system_count = 0
+        while (
+            system_count < len(messages)
+            and messages[system_count].get("role") == "system"
+        ):
+            system_count += 1
+        if system_count:
+            message = dict(messages[system_count - 1])
+            content = message.get("content")
+            if isinstance(content, str):
+                parts = [{"type": "text", "text": content}]
+            else:
+                parts = [
+                    {"type": "text", "text": part}
+                    if isinstance(part, str)
+                    else dict(part)
+                    for part in content or []
+                ]
+            if parts:
+                parts[-1]["cache_control"] = cache_control
+                message["content"] = parts
+                messages = (
+                    messages[: system_count - 1] + [message] + messages[system_count:]
+                )
+
+        if tools and self.api_type == "aws":
+            tools = tools[:-1] + [{**tools[-1], "cache_control": cache_control}]
+        return messages, tools
+
     def check_token_limit(self, input_tokens: int) -> bool:
         """Check if token limits are exceeded"""
         if self.max_input_tokens is not None:
@@ -276,7 +682,8 @@ class LLM:
             supports_images: Flag indicating if the target model supports image inputs
 
         Returns:
-            List[dict]: List of formatted messages in OpenAI format
+            List[dict]: List of formatted messages in OpenAI format; dicts of
+            Message objects may be shared with them and must not be mutated
 
         Raises:
             ValueError: If messages are invalid or missing required fields
@@ -293,14 +700,27 @@ class LLM:
         formatted_messages = []
 
         for message in messages:
-            # Convert Message objects to dictionaries
             if isinstance(message, Message):
+                if message.base64_image is None and message.image_path is None:
+                    # Text messages reuse the dict cached on the message; its
+                    # role was validated when the message was created
+                    message = message.cached_dict()
+                    if "content" in message or "tool_calls" in message:
+                        formatted_messages.append(message)
+                    continue
                 message = message.to_dict()
 
             if isinstance(message, dict):
                 # If message is a dict, ensure it has required fields
                 if "role" not in message:
                     raise ValueError("Message dict must contain 'role' field")
+                if message["role"] not in ROLE_VALUES:
+                    raise ValueError(f"Invalid role: {message['role']}")
+
+                # Load images offloaded from memory only when they are sent
+                image_path = message.pop("image_path", None)
+                if image_path and supports_images and not message.get("base64_image"):
+                    message["base64_image"] = ObservationStore.load_image(image_path)
 
                 # Process base64 images if present and model supports images
                 if supports_images and message.get("base64_image"):
@@ -345,13 +765,24 @@ class LLM:
             else:
                 raise TypeError(f"Unsupported message type: {type(message)}")
 
-        # Validate all messages have required fields
-        for msg in formatted_messages:
-            if msg["role"] not in ROLE_VALUES:
-                raise ValueError(f"Invalid role: {msg['role']}")
-
         return formatted_messages
 
+    async def _create_stream(self, params: dict):
+        """Open a completion stream, asking for usage data where supported."""
+        if self.stream_usage and self.api_type != "aws":
+            try:
+                return await self.client.chat.completions.create(
+                    **params, stream=True, stream_options={"include_usage": True}
+                )
+            except BadRequestError as e:
+                if "stream_options" not in str(e):
+                    raise
+                logger.warning(
+                    f"{self.model} rejects stream_options; counting streamed tokens locally"
+                )
+                self.stream_usage = False
+        return await self.client.chat.completions.create(**params, stream=True)
+
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -359,6 +790,7 @@ class LLM:
             (OpenAIError, Exception, ValueError)
         ),  # Don't retry TokenLimitExceeded
     )
+    @_traced_request
     async def ask(
         self,
         messages: List[Union[dict, Message]],
@@ -404,6 +836,7 @@ class LLM:
                 # Raise a special exception that won't be retried
                 raise TokenLimitExceeded(error_message)
 
+            messages, _ = self.apply_cache_hints(messages)
             params = {
                 "model": self.model,
                 "messages": messages,
@@ -428,36 +861,34 @@ class LLM:
 
                 # Update token counts
                 self.update_token_count(
-                    response.usage.prompt_tokens, response.usage.completion_tokens
+                    response.usage.prompt_tokens,
+                    response.usage.completion_tokens,
+                    self.cached_input_tokens(response.usage),
                 )
 
                 return response.choices[0].message.content
 
-            # Streaming request, For streaming, update estimated token count before making the request
-            self.update_token_count(input_tokens)
-
-            response = await self.client.chat.completions.create(**params, stream=True)
+            # Streaming request
+            response = await self._create_stream(params)
+            usage = StreamUsage(self, input_tokens)
 
             collected_messages = []
-            completion_text = ""
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                completion_text += chunk_message
-                print(chunk_message, end="", flush=True)
+            try:
+                async for chunk in response:
+                    usage.add(chunk)
+                    if not chunk.choices:
+                        continue  # the usage-only last chunk
+                    chunk_message = chunk.choices[0].delta.content or ""
+                    collected_messages.append(chunk_message)
+                    print(chunk_message, end="", flush=True)
+            finally:
+                usage.record()
 
             print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
             if not full_response:
                 raise ValueError("Empty response from streaming LLM")
 
-            # estimate completion tokens for streaming response
-            completion_tokens = self.count_tokens(completion_text)
-            logger.info(
-                f"Estimated completion tokens for streaming response: {completion_tokens}"
-            )
-            self.total_completion_tokens += completion_tokens
-
             return full_response
 
         except TokenLimitExceeded:
@@ -486,6 +917,7 @@ class LLM:
             (OpenAIError, Exception, ValueError)
         ),  # Don't retry TokenLimitExceeded
     )
+    @_traced_request
     async def ask_with_images(
         self,
         messages: List[Union[dict, Message]],
@@ -530,8 +962,9 @@ class LLM:
                     "The last message must be from the user to attach images"
                 )
 
-            # Process the last user message to include images
-            last_message = formatted_messages[-1]
+            # Process the last user message to include images; copy it, as
+            # formatted messages may be shared with the Message objects
+            last_message = formatted_messages[-1] = dict(formatted_messages[-1])
 
             # Convert content to multimodal format if needed
             content = last_message["content"]
@@ -577,7 +1010,6 @@ class LLM:
             params = {
                 "model": self.model,
                 "messages": all_messages,
-                "stream": stream,
             }
 
             # Add model-specific parameters
@@ -591,23 +1023,35 @@ class LLM:
 
             # Handle non-streaming request
             if not stream:
-                response = await self.client.chat.completions.create(**params)
+                response = await self.client.chat.completions.create(
+                    **params, stream=False
+                )
 
                 if not response.choices or not response.choices[0].message.content:
                     raise ValueError("Empty or invalid response from LLM")
 
-                self.update_token_count(response.usage.prompt_tokens)
+                self.update_token_count(
+                    response.usage.prompt_tokens,
+                    response.usage.completion_tokens,
+                    self.cached_input_tokens(response.usage),
+                )
                 return response.choices[0].message.content
 
             # Handle streaming request
-            self.update_token_count(input_tokens)
-            response = await self.client.chat.completions.create(**params)
+            response = await self._create_stream(params)
+            usage = StreamUsage(self, input_tokens)
 
             collected_messages = []
-            async for chunk in response:
-                chunk_message = chunk.choices[0].delta.content or ""
-                collected_messages.append(chunk_message)
-                print(chunk_message, end="", flush=True)
+            try:
+                async for chunk in response:
+                    usage.add(chunk)
+                    if not chunk.choices:
+                        continue  # the usage-only last chunk
+                    chunk_message = chunk.choices[0].delta.content or ""
+                    collected_messages.append(chunk_message)
+                    print(chunk_message, end="", flush=True)
+            finally:
+                usage.record()
 
             print()  # Newline after streaming
             full_response = "".join(collected_messages).strip()
@@ -635,6 +1079,86 @@ class LLM:
             logger.error(f"Unexpected error in ask_with_images: {e}")
             raise
 
+    def _prepare_tool_request(
+        self,
+        messages: List[Union[dict, Message]],
+        system_msgs: Optional[List[Union[dict, Message]]],
+        timeout: int,
+        tools: Optional[List[dict]],
+        tool_choice: TOOL_CHOICE_TYPE,  # type: ignore
+        temperature: Optional[float],
+        tool_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> Tuple[dict, int]:
+        """Validate a tool request and build its completion parameters.
+
+        Returns:
+            Tuple of (completion parameters, estimated input tokens)
+
+        Raises:
+            TokenLimitExceeded: If token limits are exceeded
+            ValueError: If tools, tool_choice, or messages are invalid
+        """
+        # Validate tool_choice
+        if tool_choice not in TOOL_CHOICE_VALUES:
+            raise ValueError(f"Invalid tool_choice: {tool_choice}")
+
+        # Check if the model supports images
+        supports_images = self.model in MULTIMODAL_MODELS
+
+        # Format messages
+        if system_msgs:
+            system_msgs = self.format_messages(system_msgs, supports_images)
+            messages = system_msgs + self.format_messages(messages, supports_images)
+        else:
+            messages = self.format_messages(messages, supports_images)
+
+        # Calculate input token count
+        input_tokens = self.count_message_tokens(messages)
+
+        # If there are tools, calculate token count for tool descriptions
+        tools_tokens = (
+            tool_tokens
+            if tool_tokens is not None
+            else self.token_counter.count_tools(tools)
+        )
+
+        input_tokens += tools_tokens
+
+        # Check if token limits are exceeded
+        if not self.check_token_limit(input_tokens):
+            error_message = self.get_limit_error_message(input_tokens)
+            # Raise a special exception that won't be retried
+            raise TokenLimitExceeded(error_message)
+
+        # Validate tools if provided
+        if tools:
+            for tool in tools:
+                if not isinstance(tool, dict) or "type" not in tool:
+                    raise ValueError("Each tool must be a dict with 'type' field")
+
+        messages, tools = self.apply_cache_hints(messages, tools)
+
+        # Set up the completion request
+        params = {
+            "model": self.model,
+            "messages": messages,
+            "tools": tools,
+            "tool_choice": tool_choice,
+            "timeout": timeout,
+            **kwargs,
+        }
+
+        if self.model in REASONING_MODELS:
+            params["max_completion_tokens"] = self.max_tokens
+        else:
+            params["max_tokens"] = self.max_tokens
+            params["temperature"] = (
+                temperature if temperature is not None else self.temperature
+            )
+
+        return params, input_tokens
+
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -642,6 +1166,7 @@ class LLM:
             (OpenAIError, Exception, ValueError)
         ),  # Don't retry TokenLimitExceeded
     )
+    @_traced_request
     async def ask_tool(
         self,
         messages: List[Union[dict, Message]],
@@ -650,6 +1175,7 @@ class LLM:
         tools: Optional[List[dict]] = None,
         tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
         temperature: Optional[float] = None,
+        tool_tokens: Optional[int] = None,
         **kwargs,
     ) -> ChatCompletionMessage | None:
         """
@@ -662,6 +1188,8 @@ class LLM:
             tools: List of tools to use
             tool_choice: Tool choice strategy
             temperature: Sampling temperature for the response
+            tool_tokens: Precomputed token count of `tools`, e.g. from
+                ToolCollection.token_cost; counted here if None
             **kwargs: Additional completion arguments
 
         Returns:
@@ -674,68 +1202,21 @@ class LLM:
             Exception: For unexpected errors
         """
         try:
-            # Validate tool_choice
-            if tool_choice not in TOOL_CHOICE_VALUES:
-                raise ValueError(f"Invalid tool_choice: {tool_choice}")
-
-            # Check if the model supports images
-            supports_images = self.model in MULTIMODAL_MODELS
-
-            # Format messages
-            if system_msgs:
-                system_msgs = self.format_messages(system_msgs, supports_images)
-                messages = system_msgs + self.format_messages(messages, supports_images)
-            else:
-                messages = self.format_messages(messages, supports_images)
-
-            # Calculate input token count
-            input_tokens = self.count_message_tokens(messages)
-
-            # If there are tools, calculate token count for tool descriptions
-            tools_tokens = 0
-            if tools:
-                for tool in tools:
-                    tools_tokens += self.count_tokens(str(tool))
-
-            input_tokens += tools_tokens
-
-            # Check if token limits are exceeded
-            if not self.check_token_limit(input_tokens):
-                error_message = self.get_limit_error_message(input_tokens)
-                # Raise a special exception that won't be retried
-                raise TokenLimitExceeded(error_message)
-
-            # Validate tools if provided
-            if tools:
-                for tool in tools:
-                    if not isinstance(tool, dict) or "type" not in tool:
-                        raise ValueError("Each tool must be a dict with 'type' field")
-
-            # Set up the completion request
-            params = {
-                "model": self.model,
-                "messages": messages,
-                "tools": tools,
-                "tool_choice": tool_choice,
-                "timeout": timeout,
+            params, _ = self._prepare_tool_request(
+                messages,
+                system_msgs,
+                timeout,
+                tools,
+                tool_choice,
+                temperature,
+                tool_tokens,
                 **kwargs,
-            }
-
-            if self.model in REASONING_MODELS:
-                params["max_completion_tokens"] = self.max_tokens
-            else:
-                params["max_tokens"] = self.max_tokens
-                params["temperature"] = (
-                    temperature if temperature is not None else self.temperature
-                )
+            )
 
             params["stream"] = False  # Always use non-streaming for tool requests
-            t_llm_start = time.time()
             response: ChatCompletion = await self.client.chat.completions.create(
                 **params
             )
-            t_llm_end = time.time()
-            logger.info(f"[Profiling] LLM.ask_tool(): llm_request_time={(t_llm_end-t_llm_start):.6f}s")
 
             # Check if response is valid
             if not response.choices or not response.choices[0].message:
@@ -743,9 +1224,14 @@ class LLM:
                 # raise ValueError("Invalid or empty response from LLM")
                 return None
 
+            if self.recorder:
+                self.recorder.record(response.choices[0].message)
+
             # Update token counts
             self.update_token_count(
-                response.usage.prompt_tokens, response.usage.completion_tokens
+                response.usage.prompt_tokens,
+                response.usage.completion_tokens,
+                self.cached_input_tokens(response.usage),
             )
 
             return response.choices[0].message
@@ -768,3 +1254,98 @@ class LLM:
         except Exception as e:
             logger.error(f"Unexpected error in ask_tool: {e}")
             raise
+
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+        retry=retry_if_exception_type(
+            (OpenAIError, Exception, ValueError)
+        ),  # Don't retry TokenLimitExceeded
+    )
+    async def ask_tool_stream(
+        self,
+        messages: List[Union[dict, Message]],
+        system_msgs: Optional[List[Union[dict, Message]]] = None,
+        timeout: int = 300,
+        tools: Optional[List[dict]] = None,
+        tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
+        temperature: Optional[float] = None,
+        tool_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> ToolCallStream:
+        """
+        Ask LLM using functions/tools, streaming the response.
+
+        Takes the same arguments as ask_tool. Only opening the stream is
+        retried; errors while reading it are raised from the iteration.
+
+        Returns:
+            ToolCallStream: Yields tool calls as they complete and then holds
+                the full message and latency metrics
+
+        Raises:
+            TokenLimitExceeded: If token limits are exceeded
+            ValueError: If tools, tool_choice, or messages are invalid
+            OpenAIError: If API call fails after retries
+        """
+        started_at = time.perf_counter()
+        if self.api_type == "aws":
+            # The Bedrock client collects the stream itself; nothing to gain
+            message = await self.ask_tool(
+                messages,
+                system_msgs=system_msgs,
+                timeout=timeout,
+                tools=tools,
+                tool_choice=tool_choice,
+                temperature=temperature,
+                tool_tokens=tool_tokens,
+                **kwargs,
+            )
+            return ToolCallStream.from_message(message, started_at)
+
+        try:
+            params, input_tokens = self._prepare_tool_request(
+                messages,
+                system_msgs,
+                timeout,
+                tools,
+                tool_choice,
+                temperature,
+                tool_tokens,
+                **kwargs,
+            )
+
+            # Ended by the stream once its usage is recorded
+            span = tracer.span(
+                "llm.request", model=self.model, method="ask_tool_stream"
+            )
+            try:
+                chunks = await self._create_stream(params)
+            except Exception as e:
+                span.end(e)
+                raise
+            return ToolCallStream(
+                chunks,
+                started_at,
+                usage=StreamUsage(self, input_tokens, span),
+                on_message=self.recorder.record if self.recorder else None,
+            )
+
+        except TokenLimitExceeded:
+            # Re-raise token limit errors without logging
+            raise
+        except ValueError as ve:
+            logger.error(f"Validation error in ask_tool_stream: {ve}")
+            raise
+        except OpenAIError as oe:
+            logger.error(f"OpenAI API error: {oe}")
+            if isinstance(oe, AuthenticationError):
+                logger.error("Authentication failed. Check API key.")
+            elif isinstance(oe, RateLimitError):
+                logger.error("Rate limit exceeded. Consider increasing retry attempts.")
+            elif isinstance(oe, APIError):
+                logger.error(f"API error: {oe}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in ask_tool_stream: {e}")
+            raise
@@ -0,0 +1,345 @@
+"""Deterministic stand-in for OpenAI-compatible chat completion APIs.
+
+Responses come from a script of assistant messages, either recorded from a
+real provider (see ResponseRecorder) or written by hand, and are delivered
+with configurable latency and token rates. Agents, flows and tools can thus
+be load-tested offline with reproducible timings. MockClient answers
+requests in-process for api_type = "mock"; app.mock_llm.server serves the
+same responses over HTTP (run_mock_llm.py).
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
+
+import tiktoken
+from openai.types.chat import ChatCompletion, ChatCompletionChunk, ChatCompletionMessage
+
+from app.config import PROJECT_ROOT, MockLLMSettings, config
+
+
+MOCK_SCRIPT_ENV = "OPENMANUS_MOCK_LLM"
+
+# Tool-call arguments are streamed in pieces of this many characters
+ARGUMENT_CHUNK_CHARS = 16
+
+_WORD = re.compile(r"\S+\s*|\s+")
+
+
+def _resolve(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def _normalize(step: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """Assistant message of a script line, in the chat completions format.
+
+    Lines are recorded messages ({"message": {...}}), dumped completions
+    ({"choices": [...]}) or messages whose tool calls may be written as
+    {"name": ..., "arguments": {...}}.
+    """
+    if "choices" in step:
+        step = step["choices"][0]["message"]
+    elif "message" in step:
+        step = step["message"]
+
+    tool_calls = []
+    for n, call in enumerate(step.get("tool_calls") or []):
+        function = call.get("function", call)
+        arguments = function.get("arguments", {})
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments, ensure_ascii=False)
+        tool_calls.append(
+            {
+                "id": call.get("id") or f"call_{index}_{n}",
+                "type": "function",
+                "function": {"name": function["name"], "arguments": arguments},
+            }
+        )
+    message = {"role": "assistant", "content": step.get("content")}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return message
+
+
+class MockScript:
+    """Assistant messages replayed in order.
+
+    In "sequence" mode the script advances with every answered request, so
+    an agent, its memory summarizer and the planner of a flow all share one
+    sequence. In "conversation" mode the position is the number of assistant
+    messages in the request, so concurrent agents each replay the script.
+    Requests without tools never consume a step with tool calls.
+    """
+
+    def __init__(self, steps: List[Dict[str, Any]], mode: str = "sequence"):
+        self.steps = [_normalize(step, i) for i, step in enumerate(steps)]
+        self.mode = mode
+        self._position = 0
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        mode: str = "sequence",
+        variables: Optional[Dict[str, Any]] = None,
+    ) -> "MockScript":
+        """Read a JSON list or JSON lines script; `{name}` placeholders are
+        replaced by variables, e.g. {workspace}. Lines starting with # are
+        comments."""
+        text = _resolve(path).read_text(encoding="utf-8")
+        for name, value in (variables or {}).items():
+            text = text.replace("{" + name + "}", json.dumps(str(value))[1:-1])
+        if text.lstrip().startswith("["):
+            steps = json.loads(text)
+        else:
+            steps = [
+                json.loads(line)
+                for line in text.splitlines()
+                if line.strip() and not line.lstrip().startswith("#")
+            ]
+        return cls(steps, mode)
+
+    def next(self, messages: List[Dict[str, Any]], with_tools: bool) -> Optional[dict]:
+        """The message answering a request, or None if there is none left."""
+        if self.mode == "conversation":
+            position = sum(1 for m in messages if m.get("role") == "assistant")
+        else:
+            position = self._position
+        if position >= len(self.steps):
+            return None
+        step = self.steps[position]
+        if step.get("tool_calls") and not with_tools:
+            return None
+        if self.mode == "sequence":
+            self._position += 1
+        return step
+
+
+class MockBackend:
+    """Answers chat completion requests from a script with simulated timing.
+
+    Without a script, or once it is exhausted, requests offering the
+    terminate tool are answered by calling it and others with a short text,
+    so agents always come to an end. Token counts use cl100k_base.
+    """
+
+    DEFAULT_REPLY = "Task complete."
+
+    _shared: Optional["MockBackend"] = None
+
+    def __init__(
+        self,
+        script: Optional[MockScript] = None,
+        settings: Optional[MockLLMSettings] = None,
+    ):
+        from app.llm import TokenCounter
+
+        self.script = script
+        self.settings = settings or MockLLMSettings()
+        self.token_counter = TokenCounter(tiktoken.get_encoding("cl100k_base"))
+        self._ids = itertools.count()
+
+    @classmethod
+    def from_settings(cls, settings: MockLLMSettings) -> "MockBackend":
+        script = None
+        if settings.script:
+            workspace = (
+                config.sandbox.work_dir
+                if config.sandbox.use_sandbox
+                else config.workspace_root
+            )
+            script = MockScript.load(
+                settings.script, settings.mode, variables={"workspace": workspace}
+            )
+        return cls(script, settings)
+
+    @classmethod
+    def shared(cls) -> "MockBackend":
+        """The backend of all api_type = "mock" LLMs of this process.
+
+        Configured by [mock_llm]; the OPENMANUS_MOCK_LLM variable overrides
+        its script.
+        """
+        if cls._shared is None:
+            settings = config.mock_llm_config
+            if os.environ.get(MOCK_SCRIPT_ENV):
+                settings = settings.model_copy(
+                    update={"script": os.environ[MOCK_SCRIPT_ENV]}
+                )
+            cls._shared = cls.from_settings(settings)
+        return cls._shared
+
+    def reply(self, messages: List[Dict[str, Any]], tools: Optional[List[dict]]):
+        offered: Set[str] = {
+            tool["function"]["name"] for tool in tools or [] if "function" in tool
+        }
+        message = self.script.next(messages, bool(offered)) if self.script else None
+        if message is not None:
+            return message
+        if "terminate" in offered:
+            return _normalize(
+                {
+                    "content": self.DEFAULT_REPLY,
+                    "tool_calls": [
+                        {"name": "terminate", "arguments": {"status": "success"}}
+                    ],
+                },
+                next(self._ids),
+            )
+        return {"role": "assistant", "content": self.DEFAULT_REPLY}
+
+    def _completion_tokens(self, text: str) -> int:
+        return self.token_counter.count_text(text) if text else 0
+
+    def _count_usage(self, messages, tools, message) -> Dict[str, int]:
+        prompt_tokens = self.token_counter.count_message_tokens(
+            messages
+        ) + self.token_counter.count_tools(tools)
+        completion_tokens = self._completion_tokens(message.get("content") or "")
+        for call in message.get("tool_calls") or []:
+            function = call["function"]
+            completion_tokens += self._completion_tokens(
+                function["name"] + function["arguments"]
+            )
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _first_token_delay(self, prompt_tokens: int) -> float:
+        delay = self.settings.first_token_latency
+        if self.settings.prompt_tokens_per_second:
+            delay += prompt_tokens / self.settings.prompt_tokens_per_second
+        return delay
+
+    def _generation_delay(self, tokens: int) -> float:
+        if not self.settings.tokens_per_second:
+            return 0.0
+        return tokens / self.settings.tokens_per_second
+
+    async def create(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str = "mock",
+        tools: Optional[List[dict]] = None,
+        stream: bool = False,
+        stream_options: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Union[ChatCompletion, AsyncIterator[ChatCompletionChunk]]:
+        """Answer a request like client.chat.completions.create()."""
+        message = self.reply(messages, tools)
+        usage = self._count_usage(messages, tools, message)
+        completion_id = f"chatcmpl-mock-{next(self._ids)}"
+        if stream:
+            include_usage = bool((stream_options or {}).get("include_usage"))
+            return self._stream(completion_id, model, message, usage, include_usage)
+
+        await asyncio.sleep(
+            self._first_token_delay(usage["prompt_tokens"])
+            + self._generation_delay(usage["completion_tokens"])
+        )
+        return ChatCompletion.model_validate(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": message,
+                        "finish_reason": (
+                            "tool_calls" if message.get("tool_calls") else "stop"
+                        ),
+                    }
+                ],
+                "usage": usage,
+            }
+        )
+
+    @staticmethod
+    def _deltas(message: Dict[str, Any]):
+        """Stream deltas of a message with their text, a word or a few
+        characters each."""
+        for word in _WORD.findall(message.get("content") or ""):
+            yield {"role": "assistant", "content": word}, word
+        for index, call in enumerate(message.get("tool_calls") or []):
+            function = call["function"]
+            yield {
+                "tool_calls": [
+                    {
+                        "index": index,
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {"name": function["name"], "arguments": ""},
+                    }
+                ]
+            }, function["name"]
+            arguments = function["arguments"]
+            for start in range(0, len(arguments), ARGUMENT_CHUNK_CHARS):
+                piece = arguments[start : start + ARGUMENT_CHUNK_CHARS]
+                yield {
+                    "tool_calls": [{"index": index, "function": {"arguments": piece}}]
+                }, piece
+
+    async def _stream(
+        self,
+        completion_id: str,
+        model: str,
+        message: Dict[str, Any],
+        usage: Dict[str, int],
+        include_usage: bool,
+    ) -> AsyncIterator[ChatCompletionChunk]:
+        def chunk(choices: List[dict], chunk_usage=None) -> ChatCompletionChunk:
+            return ChatCompletionChunk.model_validate(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": choices,
+                    "usage": chunk_usage,
+                }
+            )
+
+        await asyncio.sleep(self._first_token_delay(usage["prompt_tokens"]))
+        for delta, text in self._deltas(message):
+            await asyncio.sleep(self._generation_delay(self._completion_tokens(text)))
+            yield chunk([{"index": 0, "delta": delta, "finish_reason": None}])
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        yield chunk([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+        if include_usage:
+            yield chunk([], usage)
+
+
+class MockClient:
+    """OpenAI client stand-in answering from a MockBackend."""
+
+    def __init__(self, backend: Optional[MockBackend] = None):
+        backend = backend or MockBackend.shared()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=backend.create))
+
+
+class ResponseRecorder:
+    """Appends assistant messages to a JSON lines file MockScript can replay."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = _resolve(path)
+
+    def record(self, message: Optional[ChatCompletionMessage]) -> None:
+        if message is None:
+            return
+        line = json.dumps(
+            {"message": message.model_dump(exclude_none=True)}, ensure_ascii=False
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
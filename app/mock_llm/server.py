@@ -0,0 +1,69 @@
+"""OpenAI-compatible HTTP server answering from a MockBackend."""
+
+import argparse
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.config import config
+from app.mock_llm import MockBackend
+
+
+def create_app(backend: MockBackend) -> FastAPI:
+    """Serve /v1/chat/completions, streamed as server-sent events or not."""
+    app = FastAPI(title="OpenManus mock LLM")
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {
+            "object": "list",
+            "data": [
+                {"id": "mock", "object": "model", "created": 0, "owned_by": "mock"}
+            ],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        params = await request.json()
+        result = await backend.create(**params)
+        if not params.get("stream"):
+            return JSONResponse(result.model_dump(exclude_unset=True))
+
+        async def events():
+            async for chunk in result:
+                yield f"data: {chunk.model_dump_json(exclude_unset=True)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Options overriding the [mock_llm] configuration."""
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM server")
+    parser.add_argument("--script", help="JSON lines file of responses to replay")
+    parser.add_argument(
+        "--mode",
+        choices=["sequence", "conversation"],
+        help="Replay across all requests in order, or per conversation",
+    )
+    parser.add_argument(
+        "--first-token-latency", type=float, help="Seconds before the first token"
+    )
+    parser.add_argument(
+        "--prompt-tokens-per-second", type=float, help="Prompt processing rate"
+    )
+    parser.add_argument("--tokens-per-second", type=float, help="Generation rate")
+    parser.add_argument("--host", help="Address to listen on")
+    parser.add_argument("--port", type=int, help="Port to listen on")
+    return parser.parse_args(argv)
+
+
+def run(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    overrides = {k: v for k, v in vars(args).items() if v is not None}
+    settings = config.mock_llm_config.model_copy(update=overrides)
+    backend = MockBackend.from_settings(settings)
+    uvicorn.run(create_app(backend), host=settings.host, port=settings.port)
@@ -0,0 +1,6 @@
+SUMMARY_PROMPT = """Summarize the following part of an agent's conversation so the agent can continue its task without it.
+Keep the goals, decisions made, facts and results found (with exact values, file paths and URLs), errors met and what remains to be done.
+Leave out pleasantries and raw tool output that is no longer needed. Answer with the summary only.
+
+{transcript}
+"""
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Protocol
+from typing import Dict, Iterable, Optional, Protocol, Tuple
 
 from app.config import SandboxSettings
 from app.sandbox.core.sandbox import DockerSandbox
@@ -47,6 +47,25 @@ class SandboxFileOperations(Protocol):
         """
         ...
 
+    async def read_files(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Reads several files from container in one transfer.
+
+        Args:
+            paths: File paths in container.
+
+        Returns:
+            Dict[str, str]: Mapping of paths to file contents.
+        """
+        ...
+
+    async def write_files(self, files: Dict[str, str]) -> None:
+        """Writes several files to container in one transfer.
+
+        Args:
+            files: Mapping of file paths in container to contents.
+        """
+        ...
+
 
 class BaseSandboxClient(ABC):
     """Base sandbox client interface."""
@@ -63,6 +82,12 @@ class BaseSandboxClient(ABC):
     async def run_command(self, command: str, timeout: Optional[int] = None) -> str:
         """Executes command."""
 
+    @abstractmethod
+    async def run_python(
+        self, code: str, timeout: Optional[int] = None
+    ) -> Tuple[str, bool]:
+        """Executes Python code in a persistent interpreter."""
+
     @abstractmethod
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container."""
@@ -79,6 +104,14 @@ class BaseSandboxClient(ABC):
     async def write_file(self, path: str, content: str) -> None:
         """Writes file."""
 
+    @abstractmethod
+    async def read_files(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Reads several files."""
+
+    @abstractmethod
+    async def write_files(self, files: Dict[str, str]) -> None:
+        """Writes several files."""
+
     @abstractmethod
     async def cleanup(self) -> None:
         """Cleans up resources."""
@@ -172,6 +205,25 @@ class LocalSandboxClient(BaseSandboxClient):
             raise RuntimeError("Sandbox not initialized")
         return await self.sandbox.run_command(command, timeout)
 
+    async def run_python(
+        self, code: str, timeout: Optional[int] = None
+    ) -> Tuple[str, bool]:
+        """Runs Python code in the sandbox's persistent interpreter.
+
+        Args:
+            code: Python source to execute.
+            timeout: Execution timeout in seconds.
+
+        Returns:
+            Tuple of (output, success).
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        return await self.sandbox.run_python(code, timeout)
+
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container to local.
 
@@ -230,6 +282,35 @@ class LocalSandboxClient(BaseSandboxClient):
             raise RuntimeError("Sandbox not initialized")
         await self.sandbox.write_file(path, content)
 
+    async def read_files(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Reads several files from container with a single archive download.
+
+        Args:
+            paths: File paths in container.
+
+        Returns:
+            Mapping of paths to file contents.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        return await self.sandbox.read_files(paths)
+
+    async def write_files(self, files: Dict[str, str]) -> None:
+        """Writes several files to container with a single archive upload.
+
+        Args:
+            files: Mapping of file paths in container to contents.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        await self.sandbox.write_files(files)
+
     async def cleanup(self) -> None:
         """Cleans up resources."""
         if self.sandbox:
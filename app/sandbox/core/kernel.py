@@ -0,0 +1,232 @@
+"""
+Persistent Python Kernel
+
+This module runs a long-lived Python interpreter inside a Docker container and
+executes code in it over a Docker exec socket, keeping interpreter state
+between calls.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import Dict, Optional, Tuple
+
+from docker import APIClient
+
+
+# Driver executed by the in-container interpreter. It reads one JSON request
+# per line from a private copy of stdin (executed code sees /dev/null), runs
+# the code in a persistent namespace, and terminates the output of every
+# request with the sentinel chosen by the caller.
+_KERNEL_DRIVER = r"""
+import json, os, sys, traceback
+requests = os.fdopen(os.dup(0), "rb")
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+sys.stdin = open(os.devnull)
+os.dup2(1, 2)
+sys.stderr = sys.stdout
+namespace = {"__name__": "__main__"}
+os.write(1, ("__OM_KERNEL_READY__ %d\n" % os.getpid()).encode())
+for line in requests:
+    request = json.loads(line)
+    success = True
+    try:
+        exec(compile(request["code"], "<sandbox>", "exec"), namespace)
+    except BaseException as e:
+        success = False
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    sys.stdout.flush()
+    status = json.dumps({"success": success})
+    os.write(1, ("\n" + request["marker"] + status + "\n").encode())
+"""
+
+_READY_MARKER = b"__OM_KERNEL_READY__ "
+
+# Docker multiplexes stdout/stderr of non-tty execs into 8-byte-header frames
+_FRAME_HEADER_SIZE = 8
+
+
+class PythonKernel:
+    def __init__(
+        self,
+        container_id: str,
+        working_dir: str = "/workspace",
+        env_vars: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Initializes a Python kernel for a container.
+
+        Args:
+            container_id: ID of the Docker container.
+            working_dir: Working directory of the interpreter.
+            env_vars: Environment variables to set.
+        """
+        self.api = APIClient()
+        self.container_id = container_id
+        self.working_dir = working_dir
+        self.env_vars = env_vars or {}
+        self.exec_id = None
+        self.socket = None
+        self.pid: Optional[int] = None
+        self._frames = b""
+        self._output = b""
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        return self.socket is not None
+
+    async def start(self) -> None:
+        """Starts the interpreter and waits until it is ready.
+
+        Raises:
+            RuntimeError: If socket connection fails.
+        """
+        exec_data = await asyncio.to_thread(
+            self.api.exec_create,
+            self.container_id,
+            ["python3", "-u", "-c", _KERNEL_DRIVER],
+            stdin=True,
+            tty=False,
+            stdout=True,
+            stderr=True,
+            workdir=self.working_dir,
+            environment=self.env_vars,
+        )
+        self.exec_id = exec_data["Id"]
+
+        socket_data = await asyncio.to_thread(
+            self.api.exec_start, self.exec_id, socket=True, tty=False
+        )
+        if not hasattr(socket_data, "_sock"):
+            raise RuntimeError("Failed to get socket connection")
+        self.socket = socket_data._sock
+        self.socket.setblocking(False)
+
+        while True:
+            start = self._output.find(_READY_MARKER)
+            end = self._output.find(b"\n", start)
+            if start != -1 and end != -1:
+                break
+            await self._read_frame()
+        self.pid = int(self._output[start + len(_READY_MARKER) : end])
+        self._output = self._output[end + 1 :]
+
+    async def _read_frame(self) -> None:
+        """Waits for the next complete output frame and appends its payload.
+
+        Raises:
+            ConnectionError: If the interpreter exited.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            if len(self._frames) >= _FRAME_HEADER_SIZE:
+                size = int.from_bytes(self._frames[4:_FRAME_HEADER_SIZE], "big")
+                end = _FRAME_HEADER_SIZE + size
+                if len(self._frames) >= end:
+                    self._output += self._frames[_FRAME_HEADER_SIZE:end]
+                    self._frames = self._frames[end:]
+                    return
+            chunk = await loop.sock_recv(self.socket, 65536)
+            if not chunk:
+                raise ConnectionError("Python kernel exited")
+            self._frames += chunk
+
+    async def _read_result(self, marker: bytes) -> Tuple[str, bool]:
+        """Reads output up to the request's sentinel line.
+
+        Args:
+            marker: Sentinel sent with the request.
+
+        Returns:
+            Tuple of (output, success).
+        """
+        while True:
+            index = self._output.find(marker)
+            if index != -1:
+                end = self._output.find(b"\n", index)
+                if end != -1:
+                    break
+            await self._read_frame()
+
+        status = json.loads(self._output[index + len(marker) : end])
+        output = self._output[:index]
+        self._output = self._output[end + 1 :]
+        # Drop the newline printed in front of the sentinel
+        if output.endswith(b"\n"):
+            output = output[:-1]
+        return output.decode("utf-8", errors="replace"), status["success"]
+
+    async def execute(
+        self, code: str, timeout: Optional[int] = None
+    ) -> Tuple[str, bool]:
+        """Executes code in the persistent namespace.
+
+        Args:
+            code: Python source to execute.
+            timeout: Maximum execution time in seconds.
+
+        Returns:
+            Tuple of (output, success); output includes the traceback on error.
+
+        Raises:
+            RuntimeError: If kernel not started.
+            TimeoutError: If execution exceeds timeout.
+        """
+        if not self.socket:
+            raise RuntimeError("Kernel not started")
+
+        async with self._lock:
+            marker = f"__OM_KERNEL_{uuid.uuid4().hex}__"
+            request = json.dumps({"code": code, "marker": marker}) + "\n"
+            await asyncio.get_running_loop().sock_sendall(self.socket, request.encode())
+
+            try:
+                return await asyncio.wait_for(
+                    self._read_result(marker.encode()), timeout
+                )
+            except asyncio.TimeoutError:
+                await self._interrupt(marker.encode())
+                raise TimeoutError(f"Execution timed out after {timeout} seconds")
+
+    async def _interrupt(self, marker: bytes) -> None:
+        """Interrupts a running request, killing the interpreter if it hangs.
+
+        A KeyboardInterrupt keeps the namespace intact; only an interpreter
+        that does not respond to it is killed and must be restarted.
+
+        Args:
+            marker: Sentinel of the running request.
+        """
+        await self._signal("INT")
+        try:
+            await asyncio.wait_for(self._read_result(marker), 2)
+        except (asyncio.TimeoutError, ConnectionError):
+            await self._signal("KILL")
+            await self.close()
+
+    async def _signal(self, name: str) -> None:
+        """Sends a signal to the interpreter process."""
+        if self.pid is None:
+            return
+        try:
+            exec_data = await asyncio.to_thread(
+                self.api.exec_create,
+                self.container_id,
+                ["kill", f"-{name}", str(self.pid)],
+            )
+            await asyncio.to_thread(self.api.exec_start, exec_data["Id"])
+        except Exception:
+            pass  # The process may already be gone
+
+    async def close(self) -> None:
+        """Stops the interpreter by closing its stdin."""
+        if self.socket:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+        self.exec_id = None
+        self.pid = None
+        self._frames = b""
+        self._output = b""
@@ -1,7 +1,8 @@
 import asyncio
 import uuid
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import Dict, Optional, Set
+from typing import Deque, Dict, List, Optional, Set
 
 import docker
 from docker.errors import APIError, ImageNotFound
@@ -22,8 +23,11 @@ class SandboxManager:
         max_sandboxes: Maximum allowed number of sandboxes.
         idle_timeout: Sandbox idle timeout in seconds.
         cleanup_interval: Cleanup check interval in seconds.
+        pool_min_size: Number of warm sandboxes kept ready per configuration.
+        pool_max_size: Maximum number of warm sandboxes kept per configuration.
         _sandboxes: Active sandbox instance mapping.
         _last_used: Last used time record for sandboxes.
+        _pools: Ready-to-use sandboxes keyed by sandbox configuration.
     """
 
     def __init__(
@@ -31,6 +35,8 @@ class SandboxManager:
         max_sandboxes: int = 100,
         idle_timeout: int = 3600,
         cleanup_interval: int = 300,
+        pool_min_size: int = 0,
+        pool_max_size: Optional[int] = None,
     ):
         """Initializes sandbox manager.
 
@@ -38,10 +44,18 @@ class SandboxManager:
             max_sandboxes: Maximum sandbox count limit.
             idle_timeout: Idle timeout in seconds.
             cleanup_interval: Cleanup check interval in seconds.
+            pool_min_size: Warm sandboxes to keep ready per configuration.
+                A value of 0 disables the warm pool.
+            pool_max_size: Maximum warm sandboxes per configuration, including
+                recycled ones. Defaults to pool_min_size.
         """
         self.max_sandboxes = max_sandboxes
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = max(
+            pool_min_size, pool_max_size if pool_max_size is not None else 0
+        )
 
         # Docker client
         self._client = docker.from_env()
@@ -55,6 +69,19 @@ class SandboxManager:
         self._global_lock = asyncio.Lock()
         self._active_operations: Set[str] = set()
 
+        # Warm pool of pre-started sandboxes, keyed by configuration
+        self._pools: Dict[str, Deque[DockerSandbox]] = {}
+        self._pool_configs: Dict[str, SandboxSettings] = {}
+        self._pool_keys: Dict[str, str] = {}  # sandbox_id -> pool key
+        self._pool_creating: Dict[str, int] = {}
+        self._refill_tasks: Set[asyncio.Task] = set()
+        self._pool_hits = 0
+        self._pool_misses = 0
+        self._pool_recycled = 0
+        self._refill_count = 0
+        self._refill_total_time = 0.0
+        self._refill_last_time = 0.0
+
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
         self._is_shutting_down = False
@@ -118,6 +145,11 @@ class SandboxManager:
     ) -> str:
         """Creates a new sandbox instance.
 
+        A pre-started sandbox is handed out from the warm pool when one is
+        available for the requested configuration; otherwise a new container
+        is created on the spot. Sandboxes with custom volume bindings are never
+        pooled.
+
         Args:
             config: Sandbox configuration.
             volume_bindings: Volume mapping configuration.
@@ -128,13 +160,25 @@ class SandboxManager:
         Raises:
             RuntimeError: If max sandbox count reached or creation fails.
         """
+        config = config or SandboxSettings()
+        pool_key = None if volume_bindings else self._register_pool(config)
+
         async with self._global_lock:
             if len(self._sandboxes) >= self.max_sandboxes:
                 raise RuntimeError(
                     f"Maximum number of sandboxes ({self.max_sandboxes}) reached"
                 )
 
-            config = config or SandboxSettings()
+            if pool_key is not None:
+                sandbox = await self._take_from_pool(pool_key)
+                if sandbox is not None:
+                    self._pool_hits += 1
+                    sandbox_id = self._register_sandbox(sandbox, pool_key)
+                    self._schedule_refill(pool_key)
+                    logger.info(f"Handed out warm sandbox {sandbox_id}")
+                    return sandbox_id
+                self._pool_misses += 1
+
             if not await self.ensure_image(config.image):
                 raise RuntimeError(f"Failed to ensure Docker image: {config.image}")
 
@@ -143,9 +187,7 @@ class SandboxManager:
                 sandbox = DockerSandbox(config, volume_bindings)
                 await sandbox.create()
 
-                self._sandboxes[sandbox_id] = sandbox
-                self._last_used[sandbox_id] = asyncio.get_event_loop().time()
-                self._locks[sandbox_id] = asyncio.Lock()
+                self._register_sandbox(sandbox, pool_key, sandbox_id)
 
                 logger.info(f"Created sandbox {sandbox_id}")
                 return sandbox_id
@@ -155,6 +197,155 @@ class SandboxManager:
                 if sandbox_id in self._sandboxes:
                     await self.delete_sandbox(sandbox_id)
                 raise RuntimeError(f"Failed to create sandbox: {e}")
+            finally:
+                if pool_key is not None:
+                    self._schedule_refill(pool_key)
+
+    def _register_sandbox(
+        self,
+        sandbox: DockerSandbox,
+        pool_key: Optional[str] = None,
+        sandbox_id: Optional[str] = None,
+    ) -> str:
+        """Records a sandbox as active and returns its ID."""
+        sandbox_id = sandbox_id or str(uuid.uuid4())
+        self._sandboxes[sandbox_id] = sandbox
+        self._last_used[sandbox_id] = asyncio.get_event_loop().time()
+        self._locks[sandbox_id] = asyncio.Lock()
+        if pool_key is not None:
+            self._pool_keys[sandbox_id] = pool_key
+        return sandbox_id
+
+    def _register_pool(self, config: SandboxSettings) -> Optional[str]:
+        """Registers a warm pool for the configuration if pooling is enabled.
+
+        Returns:
+            Optional[str]: Pool key, or None if pooling is disabled.
+        """
+        if self.pool_max_size <= 0:
+            return None
+        pool_key = config.model_dump_json()
+        if pool_key not in self._pools:
+            self._pools[pool_key] = deque()
+            self._pool_configs[pool_key] = config
+            self._pool_creating[pool_key] = 0
+        return pool_key
+
+    async def _take_from_pool(self, pool_key: str) -> Optional[DockerSandbox]:
+        """Pops the first healthy sandbox from a pool, discarding dead ones."""
+        pool = self._pools.get(pool_key)
+        while pool:
+            sandbox = pool.popleft()
+            if await sandbox.is_running():
+                return sandbox
+            logger.warning("Discarding dead sandbox from warm pool")
+            await sandbox.cleanup()
+        return None
+
+    async def warm_pool(
+        self, config: Optional[SandboxSettings] = None, size: Optional[int] = None
+    ) -> int:
+        """Fills the warm pool for a configuration and waits until it is ready.
+
+        Args:
+            config: Sandbox configuration to pre-create sandboxes for.
+            size: Target pool size. Defaults to pool_min_size.
+
+        Returns:
+            int: Number of ready sandboxes in the pool.
+        """
+        config = config or SandboxSettings()
+        pool_key = self._register_pool(config)
+        if pool_key is None:
+            return 0
+        target = self.pool_min_size if size is None else size
+        target = min(target, self.pool_max_size)
+        await self._refill_pool(pool_key, target)
+        return len(self._pools[pool_key])
+
+    def _schedule_refill(self, pool_key: str) -> None:
+        """Starts a background task topping the pool up to pool_min_size."""
+        if self._is_shutting_down or self.pool_min_size <= 0:
+            return
+        task = asyncio.create_task(self._refill_pool(pool_key, self.pool_min_size))
+        self._refill_tasks.add(task)
+        task.add_done_callback(self._refill_tasks.discard)
+
+    async def _refill_pool(self, pool_key: str, target: int) -> None:
+        """Creates sandboxes until the pool holds `target` ready instances."""
+        config = self._pool_configs[pool_key]
+        if not await self.ensure_image(config.image):
+            logger.error(f"Cannot refill warm pool, image unavailable: {config.image}")
+            return
+
+        while (
+            not self._is_shutting_down
+            and len(self._pools[pool_key]) + self._pool_creating[pool_key] < target
+        ):
+            self._pool_creating[pool_key] += 1
+            start = asyncio.get_event_loop().time()
+            try:
+                sandbox = DockerSandbox(config)
+                await sandbox.create()
+            except Exception as e:
+                logger.error(f"Failed to refill warm pool: {e}")
+                return
+            finally:
+                self._pool_creating[pool_key] -= 1
+
+            elapsed = asyncio.get_event_loop().time() - start
+            self._refill_count += 1
+            self._refill_total_time += elapsed
+            self._refill_last_time = elapsed
+
+            if self._is_shutting_down:
+                await sandbox.cleanup()
+                return
+            self._pools[pool_key].append(sandbox)
+
+    async def release_sandbox(self, sandbox_id: str, recycle: bool = True) -> None:
+        """Returns a sandbox to the manager.
+
+        Pooled sandboxes are reset and put back into their warm pool when there
+        is room; otherwise the sandbox is destroyed.
+
+        Args:
+            sandbox_id: Sandbox ID.
+            recycle: Whether the sandbox may be reused.
+        """
+        pool_key = self._pool_keys.get(sandbox_id)
+        pool = self._pools.get(pool_key) if pool_key is not None else None
+        if (
+            not recycle
+            or pool is None
+            or self._is_shutting_down
+            or len(pool) >= self.pool_max_size
+            or sandbox_id in self._active_operations
+        ):
+            await self.delete_sandbox(sandbox_id)
+            return
+
+        async with self._global_lock:
+            sandbox = self._sandboxes.pop(sandbox_id, None)
+            self._last_used.pop(sandbox_id, None)
+            self._locks.pop(sandbox_id, None)
+            self._pool_keys.pop(sandbox_id, None)
+        if sandbox is None:
+            return
+
+        try:
+            await sandbox.reset()
+        except Exception as e:
+            logger.warning(f"Failed to recycle sandbox {sandbox_id}: {e}")
+            await sandbox.cleanup()
+            return
+
+        if self._is_shutting_down or len(pool) >= self.pool_max_size:
+            await sandbox.cleanup()
+            return
+        pool.append(sandbox)
+        self._pool_recycled += 1
+        logger.info(f"Recycled sandbox {sandbox_id} into warm pool")
 
     async def get_sandbox(self, sandbox_id: str) -> DockerSandbox:
         """Gets a sandbox instance.
@@ -216,15 +407,28 @@ class SandboxManager:
             except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
 
+        # Stop pool refills
+        for task in list(self._refill_tasks):
+            task.cancel()
+        if self._refill_tasks:
+            await asyncio.wait(self._refill_tasks, timeout=5.0)
+
         # Get all sandbox IDs to clean up
         async with self._global_lock:
             sandbox_ids = list(self._sandboxes.keys())
+            pooled: List[DockerSandbox] = [
+                sandbox for pool in self._pools.values() for sandbox in pool
+            ]
+            for pool in self._pools.values():
+                pool.clear()
 
         # Concurrently clean up all sandboxes
         cleanup_tasks = []
         for sandbox_id in sandbox_ids:
             task = asyncio.create_task(self._safe_delete_sandbox(sandbox_id))
             cleanup_tasks.append(task)
+        for sandbox in pooled:
+            cleanup_tasks.append(asyncio.create_task(sandbox.cleanup()))
 
         if cleanup_tasks:
             # Wait for all cleanup tasks to complete, with timeout to avoid infinite waiting
@@ -238,6 +442,7 @@ class SandboxManager:
         self._last_used.clear()
         self._locks.clear()
         self._active_operations.clear()
+        self._pool_keys.clear()
 
         logger.info("Manager cleanup completed")
 
@@ -271,6 +476,7 @@ class SandboxManager:
                     self._sandboxes.pop(sandbox_id, None)
                     self._last_used.pop(sandbox_id, None)
                     self._locks.pop(sandbox_id, None)
+                    self._pool_keys.pop(sandbox_id, None)
                     logger.info(f"Deleted sandbox {sandbox_id}")
         except Exception as e:
             logger.error(f"Error during cleanup of sandbox {sandbox_id}: {e}")
@@ -303,6 +509,10 @@ class SandboxManager:
         Returns:
             Dict: Statistics information.
         """
+        ready: Dict[str, int] = {}
+        for key, config in self._pool_configs.items():
+            ready[config.image] = ready.get(config.image, 0) + len(self._pools[key])
+
         return {
             "total_sandboxes": len(self._sandboxes),
             "active_operations": len(self._active_operations),
@@ -310,4 +520,19 @@ class SandboxManager:
             "idle_timeout": self.idle_timeout,
             "cleanup_interval": self.cleanup_interval,
             "is_shutting_down": self._is_shutting_down,
+            "pool": {
+                "min_size": self.pool_min_size,
+                "max_size": self.pool_max_size,
+                "ready": ready,
+                "hits": self._pool_hits,
+                "misses": self._pool_misses,
+                "recycled": self._pool_recycled,
+                "refills": self._refill_count,
+                "refill_last_time": self._refill_last_time,
+                "refill_avg_time": (
+                    self._refill_total_time / self._refill_count
+                    if self._refill_count
+                    else 0.0
+                ),
+            },
         }
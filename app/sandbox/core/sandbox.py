@@ -5,7 +5,7 @@ import tarfile
 import tempfile
 import time
 import uuid
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import docker
 from docker.errors import NotFound
@@ -13,8 +13,52 @@ from docker.models.containers import Container
 
 from app.config import SandboxSettings
 from app.sandbox.core.exceptions import SandboxTimeoutError
+from app.sandbox.core.kernel import PythonKernel
 from app.sandbox.core.terminal import AsyncDockerizedTerminal
 from app.logger import logger
+from app.tracing import tracer
+
+
+# read_files archives a common parent of at least this depth (not "/") ...
+_MIN_ARCHIVE_DEPTH = 1
+# ... and gives up on the archive once this many bytes were streamed
+_MAX_ARCHIVE_BYTES = 32 * 1024 * 1024
+
+
+class _ChunkReader:
+    """File-like view of an iterable of byte chunks, for streamed tar reads.
+
+    Reads return EOF once `limit` bytes have been consumed from the chunks.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], limit: Optional[int] = None):
+        self._chunks = iter(chunks)
+        self._chunk = b""
+        self._offset = 0
+        self.limit = limit
+        self.bytes_read = 0
+
+    @property
+    def limit_reached(self) -> bool:
+        return self.limit is not None and self.bytes_read >= self.limit
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0:
+            if self._offset >= len(self._chunk):
+                chunk = None if self.limit_reached else next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._chunk, self._offset = chunk, 0
+                self.bytes_read += len(chunk)
+                continue
+            end = len(self._chunk) if size < 0 else self._offset + size
+            part = self._chunk[self._offset : end]
+            self._offset += len(part)
+            parts.append(part)
+            if size > 0:
+                size -= len(part)
+        return b"".join(parts)
 
 
 class DockerSandbox:
@@ -47,6 +91,7 @@ class DockerSandbox:
         self.client = docker.from_env()
         self.container: Optional[Container] = None
         self.terminal: Optional[AsyncDockerizedTerminal] = None
+        self.kernel: Optional[PythonKernel] = None
 
     async def create(self) -> "DockerSandbox":
         """Creates and starts the sandbox container.
@@ -91,13 +136,7 @@ class DockerSandbox:
             await asyncio.to_thread(self.container.start)
 
             # Initialize terminal
-            self.terminal = AsyncDockerizedTerminal(
-                container["Id"],
-                self.config.work_dir,
-                env_vars={"PYTHONUNBUFFERED": "1"}
-                # Ensure Python output is not buffered
-            )
-            await self.terminal.init()
+            await self._init_terminal()
             logger.info("[DEBUG] sandbox.py:DockerSandbox:create():Finish Docker sandbox[name:{container_name}] creation.")
             return self
 
@@ -105,6 +144,59 @@ class DockerSandbox:
             await self.cleanup()  # Ensure resources are cleaned up
             raise RuntimeError(f"Failed to create sandbox: {e}") from e
 
+    async def _init_terminal(self) -> None:
+        """Creates and initializes a fresh terminal session for the container."""
+        self.terminal = AsyncDockerizedTerminal(
+            self.container,
+            self.config.work_dir,
+            env_vars={"PYTHONUNBUFFERED": "1"}
+            # Ensure Python output is not buffered
+        )
+        await self.terminal.init()
+
+    async def is_running(self) -> bool:
+        """Checks whether the sandbox container is still running.
+
+        Returns:
+            bool: True if the container exists and is running.
+        """
+        if not self.container:
+            return False
+        try:
+            await asyncio.to_thread(self.container.reload)
+        except Exception:
+            return False
+        return self.container.status == "running"
+
+    async def reset(self) -> None:
+        """Resets the sandbox so it can be handed out again.
+
+        Clears the working directory and replaces the terminal session, so no
+        files, shell state or environment changes leak to the next user.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or reset fails.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+
+        try:
+            if self.terminal:
+                await self.terminal.close()
+                self.terminal = None
+            await self._close_kernel()
+
+            exit_code, output = await asyncio.to_thread(
+                self.container.exec_run,
+                ["find", self.config.work_dir, "-mindepth", "1", "-delete"],
+            )
+            if exit_code != 0:
+                raise RuntimeError(output.decode("utf-8", errors="replace"))
+
+            await self._init_terminal()
+        except Exception as e:
+            raise RuntimeError(f"Failed to reset sandbox: {e}") from e
+
     def _prepare_volume_bindings(self) -> Dict[str, Dict[str, str]]:
         """Prepares volume binding configuration.
 
@@ -158,14 +250,61 @@ class DockerSandbox:
             raise RuntimeError("Sandbox not initialized")
 
         try:
-            return await self.terminal.run_command(
-                cmd, timeout=timeout or self.config.timeout
-            )
+            with tracer.span("sandbox.run_command", command=cmd[:200]):
+                return await self.terminal.run_command(
+                    cmd, timeout=timeout or self.config.timeout
+                )
         except TimeoutError:
             raise SandboxTimeoutError(
                 f"Command execution timed out after {timeout or self.config.timeout} seconds"
             )
 
+    async def run_python(
+        self, code: str, timeout: Optional[int] = None
+    ) -> Tuple[str, bool]:
+        """Runs Python code in the sandbox's persistent interpreter.
+
+        The interpreter is started on first use and keeps its state between
+        calls, so there is no file copy or interpreter startup per execution.
+
+        Args:
+            code: Python source to execute.
+            timeout: Timeout in seconds.
+
+        Returns:
+            Tuple of (output, success); output includes the traceback on error.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or execution fails.
+            SandboxTimeoutError: If execution times out.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+
+        timeout = timeout or self.config.timeout
+        try:
+            if not (self.kernel and self.kernel.is_running):
+                self.kernel = PythonKernel(
+                    self.container.id,
+                    self.config.work_dir,
+                    env_vars={"PYTHONUNBUFFERED": "1"},
+                )
+                await self.kernel.start()
+            return await self.kernel.execute(code, timeout)
+        except TimeoutError:
+            raise SandboxTimeoutError(
+                f"Python execution timed out after {timeout} seconds"
+            )
+        except ConnectionError as e:
+            await self._close_kernel()
+            raise RuntimeError(f"Python kernel failed: {e}")
+
+    async def _close_kernel(self) -> None:
+        """Stops the persistent Python interpreter, if any."""
+        if self.kernel:
+            await self.kernel.close()
+            self.kernel = None
+
     async def read_file(self, path: str) -> str:
         """Reads a file from the container.
 
@@ -183,15 +322,17 @@ class DockerSandbox:
             raise RuntimeError("Sandbox not initialized")
 
         try:
-            # Get file archive
-            resolved_path = self._safe_resolve_path(path)
-            tar_stream, _ = await asyncio.to_thread(
-                self.container.get_archive, resolved_path
-            )
+            with tracer.span("sandbox.read_file", path=path) as span:
+                # Get file archive
+                resolved_path = self._safe_resolve_path(path)
+                tar_stream, _ = await asyncio.to_thread(
+                    self.container.get_archive, resolved_path
+                )
 
-            # Read file content from tar stream
-            content = await self._read_from_tar(tar_stream)
-            return content.decode("utf-8")
+                # Read file content from tar stream
+                content = await self._read_from_tar(tar_stream)
+                span.add(bytes_read=len(content))
+                return content.decode("utf-8")
 
         except NotFound:
             raise FileNotFoundError(f"File not found: {path}")
@@ -211,52 +352,147 @@ class DockerSandbox:
         if not self.container:
             raise RuntimeError("Sandbox not initialized")
 
-        logger.info(f"[Profiling] sandbox.py:DockerSandbox:write_file():Writing to file {path} in sandbox...")
         try:
-            t0 = time.time()
-            resolved_path = self._safe_resolve_path(path)
-            parent_dir = os.path.dirname(resolved_path)
+            with tracer.span("sandbox.write_file", path=path) as span:
+                resolved_path = self._safe_resolve_path(path)
+                parent_dir = os.path.dirname(resolved_path)
+
+                # Create parent directory
+                if parent_dir:
+                    await self.run_command(f"mkdir -p {parent_dir}")
+
+                # Prepare file data
+                # 把要写的文件内容打包成一个 tar 格式的字节流，
+                # 例如把文件名 123hello.py 和内容一起封装成内存中的一个小型 tar 包
+                # （因为 Docker 的文件写接口只接受 tar 流）
+                data = content.encode("utf-8")
+                with tracer.span("sandbox.tar"):
+                    tar_stream = await self._create_tar_stream(
+                        os.path.basename(path), data
+                    )
+
+                # Write file
+                # 把刚刚的 tar 流解压到容器中的 parent_dir
+                with tracer.span("sandbox.put_archive"):
+                    await asyncio.to_thread(
+                        self.container.put_archive, parent_dir or "/", tar_stream
+                    )
+                span.add(bytes_written=len(data))
 
-            # Create parent directory
-            if parent_dir:
-                cmd_t0 = time.time()
-                await self.run_command(f"mkdir -p {parent_dir}")
-                cmd_t1 = time.time()
-                logger.info(
-                    f"[Profiling] sandbox.py:DockerSandbox:write_file():mkdir_time={(cmd_t1-cmd_t0):.6f}s for {parent_dir}"
-                )
+        except Exception as e:
+            raise RuntimeError(f"Failed to write file: {e}")
 
-            # Prepare file data
-            # 把要写的文件内容打包成一个 tar 格式的字节流，
-            # 例如把文件名 123hello.py 和内容一起封装成内存中的一个小型 tar 包
-            # （因为 Docker 的文件写接口只接受 tar 流）
-            tar_t0 = time.time()
-            tar_stream = await self._create_tar_stream(
-                os.path.basename(path), content.encode("utf-8")
-            )
-            tar_t1 = time.time()
-            logger.info(
-                f"[Profiling] sandbox.py:DockerSandbox:write_file():tar_prep_time={(tar_t1-tar_t0):.6f}s for {path}"
-            )
+    async def write_files(self, files: Dict[str, str]) -> None:
+        """Writes several files to the container with a single archive upload.
 
-            # Write file
-            # 把刚刚的 tar 流解压到容器中的 parent_dir
-            put_t0 = time.time()
-            await asyncio.to_thread(
-                self.container.put_archive, parent_dir or "/", tar_stream
-            )
-            put_t1 = time.time()
-            logger.info(
-                f"[Profiling] sandbox.py:DockerSandbox:write_file():put_archive_time={(put_t1-put_t0):.6f}s for {path}"
-            )
+        All files are packed into one tar stream rooted at "/" and uploaded
+        with one put_archive call. Missing parent directories are created by
+        the archive extraction itself, so no mkdir round trip is needed.
 
-            t_end = time.time()
-            logger.info(
-                f"[Profiling] sandbox.py:DockerSandbox:write_file():total_write_time={(t_end-t0):.6f}s for {path}"
-            )
+        Args:
+            files: Mapping of target paths to file contents.
 
+        Raises:
+            RuntimeError: If write operation fails.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+        if not files:
+            return
+
+        try:
+            with tracer.span("sandbox.write_files", files=len(files)) as span:
+                entries = {
+                    os.path.normpath(self._safe_resolve_path(path)).lstrip("/"): (
+                        content.encode("utf-8")
+                    )
+                    for path, content in files.items()
+                }
+                with tracer.span("sandbox.tar"):
+                    tar_stream = await self._create_multi_tar_stream(entries)
+                with tracer.span("sandbox.put_archive"):
+                    await asyncio.to_thread(self.container.put_archive, "/", tar_stream)
+                span.add(bytes_written=sum(len(data) for data in entries.values()))
         except Exception as e:
-            raise RuntimeError(f"Failed to write file: {e}")
+            raise RuntimeError(f"Failed to write files: {e}")
+
+    async def read_files(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Reads several files from the container with a single archive download.
+
+        The files are fetched with one get_archive call on their deepest common
+        parent directory, streamed until all of them were found. When the
+        only common parent is the filesystem root, each file is fetched
+        separately (concurrently) instead, to avoid archiving the whole
+        container filesystem; files not found within _MAX_ARCHIVE_BYTES of the
+        archive are fetched separately as well.
+
+        Args:
+            paths: File paths.
+
+        Returns:
+            Mapping of each requested path to its contents.
+
+        Raises:
+            FileNotFoundError: If any of the files does not exist.
+            RuntimeError: If read operation fails.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return {}
+
+        resolved = {
+            path: os.path.normpath(self._safe_resolve_path(path)) for path in paths
+        }
+        if len(paths) == 1:
+            common = resolved[paths[0]]
+        else:
+            common = os.path.commonpath(list(resolved.values()))
+        if common.rstrip("/").count("/") < _MIN_ARCHIVE_DEPTH:
+            return await self._read_files_separately(paths)
+
+        # Archive members are named relative to the parent of the archived path
+        archive_root = os.path.dirname(common)
+        wanted = {
+            os.path.relpath(target, archive_root): path
+            for path, target in resolved.items()
+        }
+
+        try:
+            with tracer.span("sandbox.read_files", files=len(paths)) as span:
+                tar_stream, _ = await asyncio.to_thread(
+                    self.container.get_archive, common
+                )
+                found, complete = await asyncio.to_thread(
+                    self._extract_from_tar,
+                    tar_stream,
+                    set(wanted),
+                    _MAX_ARCHIVE_BYTES,
+                )
+                span.add(bytes_read=sum(len(data) for data in found.values()))
+        except NotFound:
+            raise FileNotFoundError(f"Path not found: {common}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to read files: {e}")
+
+        contents = {
+            path: found[name].decode("utf-8")
+            for name, path in wanted.items()
+            if name in found
+        }
+        missing = [path for name, path in wanted.items() if name not in found]
+        if missing and complete:
+            raise FileNotFoundError(f"Files not found: {', '.join(missing)}")
+        if missing:
+            contents.update(await self._read_files_separately(missing))
+        return {path: contents[path] for path in paths}
+
+    async def _read_files_separately(self, paths: List[str]) -> Dict[str, str]:
+        """Reads files with one concurrent get_archive call each."""
+        contents = await asyncio.gather(*(self.read_file(path) for path in paths))
+        return dict(zip(paths, contents))
 
     def _safe_resolve_path(self, path: str) -> str:
         """Safely resolves container path, preventing path traversal.
@@ -422,6 +658,62 @@ class DockerSandbox:
         tar_stream.seek(0)
         return tar_stream
 
+    @staticmethod
+    async def _create_multi_tar_stream(files: Dict[str, bytes]) -> io.BytesIO:
+        """Creates a tar file stream holding several files.
+
+        Args:
+            files: Mapping of archive member names to file contents.
+
+        Returns:
+            Tar file stream.
+        """
+        tar_stream = io.BytesIO()
+        mtime = int(time.time())
+        with tarfile.open(fileobj=tar_stream, mode="w") as tar:
+            for name, content in files.items():
+                tarinfo = tarfile.TarInfo(name=name)
+                tarinfo.size = len(content)
+                tarinfo.mtime = mtime
+                tarinfo.mode = 0o644
+                tar.addfile(tarinfo, io.BytesIO(content))
+        tar_stream.seek(0)
+        return tar_stream
+
+    @staticmethod
+    def _extract_from_tar(
+        tar_stream, names: set, limit: Optional[int] = None
+    ) -> Tuple[Dict[str, bytes], bool]:
+        """Extracts the requested regular files from a streamed tar archive.
+
+        Chunks are consumed only until all requested files were found, or
+        until `limit` bytes were read.
+
+        Args:
+            tar_stream: Iterable of tar archive chunks.
+            names: Member names to extract.
+            limit: Maximum number of archive bytes to read.
+
+        Returns:
+            Tuple of (mapping of found member names to their contents, whether
+            the archive was searched completely).
+        """
+        reader = _ChunkReader(tar_stream, limit)
+        found: Dict[str, bytes] = {}
+        try:
+            with tarfile.open(fileobj=reader, mode="r|") as tar:
+                for member in tar:
+                    name = os.path.normpath(member.name)
+                    if name in names and member.isfile():
+                        found[name] = tar.extractfile(member).read()
+                        if len(found) == len(names):
+                            return found, True
+        except tarfile.ReadError:
+            # The archive was cut short by the limit
+            if not reader.limit_reached:
+                raise
+        return found, not reader.limit_reached
+
     @staticmethod
     async def _read_from_tar(tar_stream) -> bytes:
         """Reads file content from a tar stream.
@@ -457,20 +749,23 @@ class DockerSandbox:
         try:
             if self.terminal:
                 try:
-                    logger.info("[Profiling] sandbox.py:DockerSandbox:cleanup():Starting terminal cleanup...")
-                    await self.terminal.close()
-                    logger.info("[Profiling] sandbox.py:DockerSandbox:cleanup():Finish terminal cleanup.")
+                    with tracer.span("sandbox.terminal_close"):
+                        await self.terminal.close()
                 except Exception as e:
                     errors.append(f"Terminal cleanup error: {e}")
                 finally:
                     self.terminal = None
 
+            try:
+                await self._close_kernel()
+            except Exception as e:
+                errors.append(f"Kernel cleanup error: {e}")
+
             if self.container:
                 try:
-                    logger.info("[Profiling] sandbox.py:DockerSandbox:cleanup():Starting Docker sandbox cleanup...")
                     t0 = time.time()
-                    await asyncio.to_thread(self.container.stop, timeout=5)
-                    logger.info("[Profiling] sandbox.py:DockerSandbox:cleanup():Finish Docker container stop.")
+                    with tracer.span("sandbox.container_stop"):
+                        await asyncio.to_thread(self.container.stop, timeout=5)
                     logger.info(f"Container stopped in {time.time()-t0:.2f}s")
                 except Exception as e:
                     errors.append(f"Container stop error: {e}")
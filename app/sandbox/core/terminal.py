@@ -6,8 +6,8 @@ allowing interactive command execution with timeout control.
 """
 
 import asyncio
-import re
 import socket
+import uuid
 from typing import Dict, Optional, Tuple, Union
 
 import docker
@@ -27,6 +27,10 @@ class DockerSession:
         self.container_id = container_id
         self.exec_id = None
         self.socket = None
+        self.last_exit_code: Optional[int] = None
+        self._pending = b""
+        self._needs_resync = False
+        self._lock = asyncio.Lock()
 
     async def create(self, working_dir: str, env_vars: Dict[str, str]) -> None:
         """Creates an interactive session with the container.
@@ -44,7 +48,7 @@ class DockerSession:
             f"cd {working_dir} && "
             "PROMPT_COMMAND='' "
             "PS1='$ ' "
-            "exec bash --norc --noprofile",
+            "exec bash --norc --noprofile --noediting",
         ]
 
         exec_data = self.api.exec_create(
@@ -72,6 +76,10 @@ class DockerSession:
 
         await self._read_until_prompt()
 
+        # Switch off input echo and prompts so that the socket only carries
+        # command output followed by the per-command sentinel line.
+        await self._run("stty -echo 2>/dev/null; PS1=''; PS2=''")
+
     async def close(self) -> None:
         """Cleans up session resources.
 
@@ -83,7 +91,9 @@ class DockerSession:
             if self.socket:
                 # Send exit command to close bash session
                 try:
-                    self.socket.sendall(b"exit\n")
+                    await asyncio.get_running_loop().sock_sendall(
+                        self.socket, b"exit\n"
+                    )
                     # Allow time for command execution
                     await asyncio.sleep(0.1)
                 except:
@@ -114,6 +124,20 @@ class DockerSession:
             # Log error but don't raise, ensure cleanup continues
             print(f"Warning: Error during session cleanup: {e}")
 
+    async def _recv(self) -> bytes:
+        """Waits until the socket is readable and returns the next chunk.
+
+        Returns:
+            Received bytes.
+
+        Raises:
+            ConnectionError: If the session socket was closed by the peer.
+        """
+        chunk = await asyncio.get_running_loop().sock_recv(self.socket, 4096)
+        if not chunk:
+            raise ConnectionError("Session socket closed")
+        return chunk
+
     async def _read_until_prompt(self) -> str:
         """Reads output until prompt is found.
 
@@ -125,17 +149,60 @@ class DockerSession:
         """
         buffer = b""
         while b"$ " not in buffer:
-            try:
-                chunk = self.socket.recv(4096)
-                if chunk:
-                    buffer += chunk
-            except socket.error as e:
-                if e.errno == socket.EWOULDBLOCK:
-                    await asyncio.sleep(0.1)
-                    continue
-                raise
+            buffer += await self._recv()
         return buffer.decode("utf-8")
 
+    async def _run(self, command: str) -> Tuple[str, int]:
+        """Sends a command and reads its output up to a unique sentinel.
+
+        The sentinel is printed by the shell right after the command finishes,
+        together with the command's exit status. Its text is assembled by
+        printf, so it never appears in an echoed copy of the command line.
+
+        Args:
+            command: Shell command to execute.
+
+        Returns:
+            Tuple of (output, exit_code).
+        """
+        token = uuid.uuid4().hex
+        marker = f"__OM_{token}__".encode()
+        await asyncio.get_running_loop().sock_sendall(
+            self.socket,
+            f"{command}\nprintf '\\n%s%s:%s\\n' '__OM_' '{token}__' \"$?\"\n".encode(),
+        )
+
+        buffer = self._pending
+        while True:
+            index = buffer.find(marker)
+            if index != -1:
+                end = buffer.find(b"\n", index)
+                if end != -1:
+                    break
+            buffer += await self._recv()
+
+        status = buffer[index + len(marker) + 1 : end].strip(b"\r:")
+        self._pending = buffer[end + 1 :]
+        output = buffer[:index].replace(b"\r\n", b"\n")
+        # Drop the newline printed in front of the sentinel
+        if output.endswith(b"\n"):
+            output = output[:-1]
+        return output.decode("utf-8", errors="replace"), int(status or 0)
+
+    async def _resync_and_run(self, command: str) -> Tuple[str, int]:
+        """Runs a command, first draining output left over by a timed-out one.
+
+        Args:
+            command: Shell command to execute.
+
+        Returns:
+            Tuple of (output, exit_code).
+        """
+        if self._needs_resync:
+            await self._run(":")
+            self._needs_resync = False
+        return await self._run(command)
+
     async def execute(self, command: str, timeout: Optional[int] = None) -> str:
         """Executes a command and returns cleaned output.
 
@@ -153,67 +220,28 @@ class DockerSession:
         if not self.socket:
             raise RuntimeError("Session not initialized")
 
-        try:
-            # Sanitize command to prevent shell injection
-            sanitized_command = self._sanitize_command(command)
-            full_command = f"{sanitized_command}\necho $?\n"
-            self.socket.sendall(full_command.encode())
-
-            async def read_output() -> str:
-                buffer = b""
-                result_lines = []
-                command_sent = False
-
-                while True:
-                    try:
-                        chunk = self.socket.recv(4096)
-                        if not chunk:
-                            break
-
-                        buffer += chunk
-                        lines = buffer.split(b"\n")
-
-                        buffer = lines[-1]
-                        lines = lines[:-1]
-
-                        for line in lines:
-                            line = line.rstrip(b"\r")
-
-                            if not command_sent:
-                                command_sent = True
-                                continue
-
-                            if line.strip() == b"echo $?" or line.strip().isdigit():
-                                continue
-
-                            if line.strip():
-                                result_lines.append(line)
-
-                        if buffer.endswith(b"$ "):
-                            break
-
-                    except socket.error as e:
-                        if e.errno == socket.EWOULDBLOCK:
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
-
-                output = b"\n".join(result_lines).decode("utf-8")
-                output = re.sub(r"\n\$ echo \$\$?.*$", "", output)
-
-                return output
-
-            if timeout:
-                result = await asyncio.wait_for(read_output(), timeout)
-            else:
-                result = await read_output()
-
-            return result.strip()
+        async with self._lock:
+            try:
+                # Sanitize command to prevent shell injection
+                sanitized_command = self._sanitize_command(command)
+                output, self.last_exit_code = await asyncio.wait_for(
+                    self._resync_and_run(sanitized_command), timeout
+                )
+                return output.strip()
 
-        except asyncio.TimeoutError:
-            raise TimeoutError(f"Command execution timed out after {timeout} seconds")
-        except Exception as e:
-            raise RuntimeError(f"Failed to execute command: {e}")
+            except asyncio.TimeoutError:
+                # Interrupt the running command and drop its partial output
+                self._pending = b""
+                self._needs_resync = True
+                try:
+                    await asyncio.get_running_loop().sock_sendall(self.socket, b"\x03")
+                except OSError:
+                    pass
+                raise TimeoutError(
+                    f"Command execution timed out after {timeout} seconds"
+                )
+            except Exception as e:
+                raise RuntimeError(f"Failed to execute command: {e}")
 
     def _sanitize_command(self, command: str) -> str:
         """Sanitizes the command string to prevent shell injection.
@@ -1,7 +1,19 @@
+import json
 from enum import Enum
-from typing import Any, List, Literal, Optional, Union
-
-from pydantic import BaseModel, Field
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class Role(str, Enum):
@@ -51,6 +63,30 @@ class ToolCall(BaseModel):
     function: Function
 
 
+class MessageDict(dict):
+    """Read-only dict form of a Message, shared by every request it is sent in.
+
+    Token counts are memoized on it per TokenCounter; copy it with dict()
+    to get a mutable version.
+    """
+
+    __slots__ = ("token_counts",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.token_counts: Dict[int, int] = {}
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("MessageDict is read-only, copy it with dict() first")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # copy, deepcopy and pickle rebuild the dict instead of setting items
+        return (type(self), (dict(self),))
+
+
 class Message(BaseModel):
     """Represents a chat message in the conversation"""
 
@@ -60,6 +96,12 @@ class Message(BaseModel):
     name: Optional[str] = Field(default=None)
     tool_call_id: Optional[str] = Field(default=None)
     base64_image: Optional[str] = Field(default=None)
+    image_path: Optional[str] = Field(
+        default=None, description="File of an image offloaded from memory"
+    )
+
+    # (field values, dict) of the last cached_dict() call
+    _dict_cache: Optional[Tuple[tuple, "MessageDict"]] = PrivateAttr(default=None)
 
     def __add__(self, other) -> List["Message"]:
         """支持 Message + list 或 Message + Message 的操作"""
@@ -83,6 +125,28 @@ class Message(BaseModel):
 
     def to_dict(self) -> dict:
         """Convert message to dictionary format"""
+        return dict(self.cached_dict())
+
+    def cached_dict(self) -> dict:
+        """
+        Dictionary form of the message, built once and reused across steps.
+
+        The dict is rebuilt when a field is reassigned, and messages with
+        images are never cached. The result is a shared, read-only
+        MessageDict; use to_dict() for a mutable copy.
+        """
+        if self.base64_image is not None or self.image_path is not None:
+            return self._build_dict()
+        key = (self.role, self.content, self.tool_calls, self.name, self.tool_call_id)
+        # Read the private attribute directly: pydantic's __getattr__ for
+        # private attributes would cost more than building the dict
+        private = self.__pydantic_private__
+        cache = private["_dict_cache"]
+        if cache is None or cache[0] != key:
+            cache = private["_dict_cache"] = (key, MessageDict(self._build_dict()))
+        return cache[1]
+
+    def _build_dict(self) -> dict:
         message = {"role": self.role}
         if self.content is not None:
             message["content"] = self.content
@@ -94,6 +158,8 @@ class Message(BaseModel):
             message["tool_call_id"] = self.tool_call_id
         if self.base64_image is not None:
             message["base64_image"] = self.base64_image
+        if self.image_path is not None:
+            message["image_path"] = self.image_path
         return message
 
     @classmethod
@@ -157,26 +223,61 @@ class Message(BaseModel):
 
 
 class Memory(BaseModel):
+    """Conversation history of an agent, bounded by message count and tokens.
+
+    An assistant message with tool calls and the tool results answering it
+    form one turn and are kept or dropped together, so the history never
+    holds orphaned tool messages. Beyond `max_tokens`, the outputs of older
+    tool calls are elided first, then the oldest turns are dropped; a leading
+    user message (the task) is always kept.
+    """
+
+    ELIDED_PREFIX: ClassVar[str] = "[Output elided to save context"
+    SUMMARY_PREFIX: ClassVar[str] = "Summary of the earlier conversation:"
+
     messages: List[Message] = Field(default_factory=list)
     max_messages: int = Field(default=100)
+    max_tokens: Optional[int] = Field(
+        default=None, description="Token budget of the history (None for unlimited)"
+    )
+    keep_recent: int = Field(
+        default=6, description="Most recent messages never elided or summarized"
+    )
+    summarize_at: float = Field(
+        default=0.8, description="Fraction of max_tokens at which to summarize"
+    )
+    token_counter: Optional[Callable[[dict], int]] = Field(
+        default=None,
+        exclude=True,
+        description="Counts the tokens of a formatted message; estimated if unset",
+    )
+    offloader: Optional[Callable[[Message], Message]] = Field(
+        default=None,
+        exclude=True,
+        description="Moves large payloads of added messages out of memory",
+    )
+
+    # id(message) -> (message, tokens); messages are not mutated in place
+    _token_counts: Dict[int, Tuple[Message, int]] = PrivateAttr(default_factory=dict)
 
     def add_message(self, message: Message) -> None:
         """Add a message to memory"""
+        if self.offloader is not None:
+            message = self.offloader(message)
         self.messages.append(message)
-        # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._enforce_limits()
 
     def add_messages(self, messages: List[Message]) -> None:
         """Add multiple messages to memory"""
+        if self.offloader is not None:
+            messages = [self.offloader(message) for message in messages]
         self.messages.extend(messages)
-        # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._enforce_limits()
 
     def clear(self) -> None:
         """Clear all messages"""
         self.messages.clear()
+        self._token_counts.clear()
 
     def get_recent_messages(self, n: int) -> List[Message]:
         """Get n most recent messages"""
@@ -185,3 +286,124 @@ class Memory(BaseModel):
     def to_dict_list(self) -> List[dict]:
         """Convert messages to list of dicts"""
         return [msg.to_dict() for msg in self.messages]
+
+    def message_tokens(self, message: Message) -> int:
+        """Token count of a message, computed once per message object"""
+        token_counts = self.__pydantic_private__["_token_counts"]
+        cached = token_counts.get(id(message))
+        if cached is not None and cached[0] is message:
+            return cached[1]
+        data = message.cached_dict()
+        if self.token_counter is not None:
+            tokens = self.token_counter(data)
+        else:
+            tokens = self._estimate_tokens(data)
+        token_counts[id(message)] = (message, tokens)
+        return tokens
+
+    @staticmethod
+    def _estimate_tokens(message: dict) -> int:
+        # Roughly four characters per token, plus the per-message overhead
+        text = str(message.get("content") or "")
+        if message.get("tool_calls"):
+            text += json.dumps(message["tool_calls"])
+        return 4 + len(text) // 4
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of all messages in memory"""
+        return sum(self.message_tokens(msg) for msg in self.messages)
+
+    @property
+    def needs_summary(self) -> bool:
+        """Whether the history has grown past the summarization threshold"""
+        return (
+            self.max_tokens is not None
+            and self.total_tokens > self.max_tokens * self.summarize_at
+        )
+
+    def _turn_starts(self) -> List[int]:
+        """Index of the first message of each turn"""
+        return [
+            i for i, msg in enumerate(self.messages) if i == 0 or msg.role != Role.TOOL
+        ]
+
+    def _first_removable(self) -> int:
+        """Index of the first message that may be dropped or summarized"""
+        return 1 if self.messages and self.messages[0].role == Role.USER else 0
+
+    def _enforce_limits(self) -> None:
+        if len(self.messages) > self.max_messages:
+            self._drop_oldest_turns(lambda: len(self.messages) > self.max_messages)
+        if self.max_tokens is not None and self.total_tokens > self.max_tokens:
+            self._elide_tool_outputs()
+            self._drop_oldest_turns(lambda: self.total_tokens > self.max_tokens)
+        if len(self._token_counts) > 2 * len(self.messages) + 16:
+            live = {id(msg) for msg in self.messages}
+            self._token_counts = {
+                key: value for key, value in self._token_counts.items() if key in live
+            }
+
+    def _elide_tool_outputs(self) -> None:
+        """Replace the outputs of older tool calls by a short note, oldest first"""
+        total = self.total_tokens
+        for i in range(len(self.messages) - self.keep_recent):
+            if total <= self.max_tokens:
+                return
+            msg = self.messages[i]
+            if msg.role != Role.TOOL or (msg.content or "").startswith(
+                self.ELIDED_PREFIX
+            ):
+                continue
+            tokens = self.message_tokens(msg)
+            elided = msg.model_copy(
+                update={
+                    "content": f"{self.ELIDED_PREFIX}: {tokens} tokens of"
+                    f" `{msg.name}` output]",
+                    "base64_image": None,
+                    "image_path": None,
+                }
+            )
+            self.messages[i] = elided
+            total += self.message_tokens(elided) - tokens
+
+    def _drop_oldest_turns(self, over_limit: Callable[[], bool]) -> None:
+        """Drop whole turns from the front while over the limit, keeping the last turn"""
+        start = self._first_removable()
+        while over_limit():
+            later = [i for i in self._turn_starts() if i > start]
+            if not later:
+                return
+            self.messages = self.messages[:start] + self.messages[later[0] :]
+
+    async def summarize(
+        self, summarizer: Callable[[List[Message]], Awaitable[str]]
+    ) -> bool:
+        """
+        Replace older turns by a summary message.
+
+        Args:
+            summarizer: Coroutine function producing a summary of messages
+
+        Returns:
+            Whether older turns were summarized
+        """
+        start = self._first_removable()
+        limit = len(self.messages) - self.keep_recent
+        ends = [i for i in self._turn_starts() if start < i <= limit]
+        if not ends or ends[-1] - start < 2:
+            return False
+        end = ends[-1]
+        old = self.messages[start:end]
+        summary = await summarizer(old)
+        current = self.messages[start:end]
+        if not summary or len(current) != len(old):
+            return False
+        if any(a is not b for a, b in zip(current, old)):
+            return False  # history changed while summarizing
+        self.messages = (
+            self.messages[:start]
+            + [Message.user_message(f"{self.SUMMARY_PREFIX}\n{summary}")]
+            + self.messages[end:]
+        )
+        return True
@@ -88,12 +88,15 @@ class BaseTool(ABC, BaseModel):
         name (str): Tool name
         description (str): Tool description
         parameters (dict): Tool parameters schema
+        concurrency_safe (bool): Whether calls may run concurrently with other
+            concurrency-safe tool calls issued in the same step
         _schemas (Dict[str, List[ToolSchema]]): Registered method schemas
     """
 
     name: str
     description: str
     parameters: Optional[dict] = None
+    concurrency_safe: bool = False
     # _schemas: Dict[str, List[ToolSchema]] = {}
 
     class Config:
@@ -121,6 +124,14 @@ class BaseTool(ABC, BaseModel):
     async def execute(self, **kwargs) -> Any:
         """Execute the tool with given parameters."""
 
+    def is_concurrency_safe(self, **kwargs) -> bool:
+        """Check whether a call with the given arguments may run concurrently.
+
+        Tools whose safety depends on the requested operation (e.g. read-only
+        commands) can override this to inspect the call arguments.
+        """
+        return self.concurrency_safe
+
     def to_param(self) -> Dict:
         """Convert tool to function call format.
 
@@ -1,6 +1,8 @@
 import asyncio
 import os
-from typing import Optional
+import time
+import uuid
+from typing import Optional, Tuple
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, CLIResult
@@ -13,6 +15,30 @@ _BASH_DESCRIPTION = """Execute a bash command in the terminal.
 """
 
 
+class _OutputBuffer:
+    """Capture buffer that keeps at most `limit` bytes, dropping the oldest."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.dropped = 0
+        self._data = bytearray()
+
+    def append(self, chunk: bytes) -> None:
+        self._data += chunk
+        overflow = len(self._data) - self.limit
+        if overflow > 0:
+            del self._data[:overflow]
+            self.dropped += overflow
+
+    def text(self) -> str:
+        text = self._data.decode(errors="replace")
+        if text.endswith("\n"):
+            text = text[:-1]
+        if self.dropped:
+            text = f"[... {self.dropped} bytes truncated ...]\n{text}"
+        return text
+
+
 class _BashSession:
     """A session of a bash shell."""
 
@@ -20,13 +46,15 @@ class _BashSession:
     _process: asyncio.subprocess.Process
 
     command: str = "/bin/bash"
-    _output_delay: float = 0.2  # seconds
     _timeout: float = 120.0  # seconds
     _sentinel: str = "<<exit>>"
+    _max_output_bytes: int = 256 * 1024
 
     def __init__(self):
         self._started = False
         self._timed_out = False
+        self.last_exit_code: Optional[int] = None
+        self.last_wall_time: Optional[float] = None  # seconds
 
     async def start(self):
         if self._started:
@@ -52,6 +80,33 @@ class _BashSession:
             return
         self._process.terminate()
 
+    async def _read_until(
+        self, stream: asyncio.StreamReader, separator: bytes
+    ) -> _OutputBuffer:
+        """Stream data into a bounded buffer until `separator` or EOF is read."""
+        buffer = _OutputBuffer(self._max_output_bytes)
+        while True:
+            try:
+                buffer.append((await stream.readuntil(separator))[: -len(separator)])
+                return buffer
+            except asyncio.LimitOverrunError as e:
+                # no separator within the reader limit: consume what is safe
+                buffer.append(await stream.read(e.consumed))
+            except asyncio.IncompleteReadError as e:
+                buffer.append(e.partial)
+                return buffer
+
+    async def _read_output(self, separator: bytes) -> Tuple[str, str, int]:
+        """Read stdout/stderr of one command up to its sentinels."""
+        stdout, stderr = await asyncio.gather(
+            self._read_until(self._process.stdout, separator),
+            self._read_until(self._process.stderr, separator),
+        )
+        exit_code = (await self._process.stdout.readline()).strip()
+        # drop the newline ending the stderr sentinel, or the next command gets it
+        await self._process.stderr.readline()
+        return stdout.text(), stderr.text(), int(exit_code or 0)
+
     async def run(self, command: str):
         """Execute a command in the bash shell."""
         if not self._started:
@@ -71,46 +126,42 @@ class _BashSession:
         assert self._process.stdout
         assert self._process.stderr
 
+        # a unique sentinel per command, so stray output can never match it;
+        # the exit code follows the stdout sentinel on the same line
+        separator = f"{self._sentinel[:-2]}:{uuid.uuid4().hex}>>"
+        start = time.perf_counter()
+
         # send command to the process
         self._process.stdin.write(
-            command.encode() + f"; echo '{self._sentinel}'\n".encode()
+            f"{command}\necho \"{separator}$?\"; echo '{separator}' >&2\n".encode()
         )
         await self._process.stdin.drain()
 
-        # read output from the process, until the sentinel is found
+        # read output from the process, until the sentinels are found
         try:
             async with asyncio.timeout(self._timeout):
-                while True:
-                    await asyncio.sleep(self._output_delay)
-                    # if we read directly from stdout/stderr, it will wait forever for
-                    # EOF. use the StreamReader buffer directly instead.
-                    output = (
-                        self._process.stdout._buffer.decode()
-                    )  # pyright: ignore[reportAttributeAccessIssue]
-                    if self._sentinel in output:
-                        # strip the sentinel and break
-                        output = output[: output.index(self._sentinel)]
-                        break
+                output, error, self.last_exit_code = await self._read_output(
+                    separator.encode()
+                )
         except asyncio.TimeoutError:
             self._timed_out = True
             raise ToolError(
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
             ) from None
+        finally:
+            self.last_wall_time = time.perf_counter() - start
 
-        if output.endswith("\n"):
-            output = output[:-1]
-
-        error = (
-            self._process.stderr._buffer.decode()
-        )  # pyright: ignore[reportAttributeAccessIssue]
-        if error.endswith("\n"):
-            error = error[:-1]
-
-        # clear the buffers so that the next output can be read correctly
-        self._process.stdout._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-        self._process.stderr._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
+        if self._process.stdout.at_eof():
+            return CLIResult(
+                system="tool must be restarted",
+                error=f"bash has exited with returncode {await self._process.wait()}",
+            )
 
-        return CLIResult(output=output, error=error)
+        return CLIResult(
+            output=output,
+            error=error,
+            system=f"exit code {self.last_exit_code}, wall time {self.last_wall_time:.3f}s",
+        )
 
 
 class Bash(BaseTool):
@@ -6,13 +6,27 @@ providing fast, precise, and AI-ready data extraction with clean Markdown genera
 """
 
 import asyncio
-from typing import List, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
+from pydantic import BaseModel, Field, PrivateAttr
+
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 
 
+class CrawlerStats(BaseModel):
+    """Lifecycle counters of the browser shared by Crawl4aiTool calls."""
+
+    starts: int = 0
+    restarts: int = 0
+    last_startup_time: Optional[float] = None
+    calls: int = 0
+    reused_calls: int = Field(
+        default=0, description="Calls served by an already running browser"
+    )
+
+
 class Crawl4aiTool(BaseTool):
     """
     Web crawler tool powered by Crawl4AI.
@@ -61,6 +75,21 @@ class Crawl4aiTool(BaseTool):
         },
         "required": ["urls"],
     }
+    concurrency_safe: bool = True
+    max_concurrent_pages: int = 5  # pages crawled in parallel per browser
+    max_pages_per_domain: int = 2  # politeness limit per domain
+    idle_timeout: float = 300.0  # seconds before an unused browser is closed
+
+    crawler_stats: CrawlerStats = Field(default_factory=CrawlerStats, exclude=True)
+
+    # One browser is started on first use and kept warm across calls
+    _crawler: Optional[Any] = PrivateAttr(default=None)
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+    _active_calls: int = PrivateAttr(default=0)
+    _idle_task: Optional[asyncio.Task] = PrivateAttr(default=None)
+    _page_limit: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+    _domain_limits: Dict[str, asyncio.Semaphore] = PrivateAttr(default_factory=dict)
 
     async def execute(
         self,
@@ -99,113 +128,18 @@ class Crawl4aiTool(BaseTool):
             return ToolResult(error="No valid URLs provided")
 
         try:
-            # Import crawl4ai components
-            from crawl4ai import (
-                AsyncWebCrawler,
-                BrowserConfig,
-                CacheMode,
-                CrawlerRunConfig,
-            )
-
-            # Configure browser settings
-            browser_config = BrowserConfig(
-                headless=True,
-                verbose=False,
-                browser_type="chromium",
-                ignore_https_errors=True,
-                java_script_enabled=True,
-            )
-
-            # Configure crawler settings
-            run_config = CrawlerRunConfig(
-                cache_mode=CacheMode.BYPASS if bypass_cache else CacheMode.ENABLED,
+            # Results are streamed in completion order; report them in input order
+            results: List[Optional[Dict[str, Any]]] = [None] * len(valid_urls)
+            async for index, result in self.crawl_stream(
+                valid_urls,
+                timeout=timeout,
+                bypass_cache=bypass_cache,
                 word_count_threshold=word_count_threshold,
-                process_iframes=True,
-                remove_overlay_elements=True,
-                excluded_tags=["script", "style"],
-                page_timeout=timeout * 1000,  # Convert to milliseconds
-                verbose=False,
-                wait_until="domcontentloaded",
-            )
-
-            results = []
-            successful_count = 0
-            failed_count = 0
-
-            # Process each URL
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                for url in valid_urls:
-                    try:
-                        logger.info(f"🕷️ Crawling URL: {url}")
-                        start_time = asyncio.get_event_loop().time()
-
-                        result = await crawler.arun(url=url, config=run_config)
-
-                        end_time = asyncio.get_event_loop().time()
-                        execution_time = end_time - start_time
-
-                        if result.success:
-                            # Count words in markdown
-                            word_count = 0
-                            if hasattr(result, "markdown") and result.markdown:
-                                word_count = len(result.markdown.split())
-
-                            # Count links
-                            links_count = 0
-                            if hasattr(result, "links") and result.links:
-                                internal_links = result.links.get("internal", [])
-                                external_links = result.links.get("external", [])
-                                links_count = len(internal_links) + len(external_links)
-
-                            # Count images
-                            images_count = 0
-                            if hasattr(result, "media") and result.media:
-                                images = result.media.get("images", [])
-                                images_count = len(images)
-
-                            results.append(
-                                {
-                                    "url": url,
-                                    "success": True,
-                                    "status_code": getattr(result, "status_code", 200),
-                                    "title": result.metadata.get("title")
-                                    if result.metadata
-                                    else None,
-                                    "markdown": result.markdown
-                                    if hasattr(result, "markdown")
-                                    else None,
-                                    "word_count": word_count,
-                                    "links_count": links_count,
-                                    "images_count": images_count,
-                                    "execution_time": execution_time,
-                                }
-                            )
-                            successful_count += 1
-                            logger.info(
-                                f"✅ Successfully crawled {url} in {execution_time:.2f}s"
-                            )
-
-                        else:
-                            results.append(
-                                {
-                                    "url": url,
-                                    "success": False,
-                                    "error_message": getattr(
-                                        result, "error_message", "Unknown error"
-                                    ),
-                                    "execution_time": execution_time,
-                                }
-                            )
-                            failed_count += 1
-                            logger.warning(f"❌ Failed to crawl {url}")
-
-                    except Exception as e:
-                        error_msg = f"Error crawling {url}: {str(e)}"
-                        logger.error(error_msg)
-                        results.append(
-                            {"url": url, "success": False, "error_message": error_msg}
-                        )
-                        failed_count += 1
+            ):
+                results[index] = result
+
+            successful_count = sum(1 for result in results if result["success"])
+            failed_count = len(results) - successful_count
 
             # Format output
             output_lines = [f"🕷️ Crawl4AI Results Summary:"]
@@ -257,6 +191,236 @@ class Crawl4aiTool(BaseTool):
             logger.error(error_msg)
             return ToolResult(error=error_msg)
 
+    async def crawl_stream(
+        self,
+        urls: List[str],
+        timeout: int = 30,
+        bypass_cache: bool = False,
+        word_count_threshold: int = 10,
+    ) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Crawl URLs concurrently, yielding each page as soon as it completes.
+
+        At most `max_concurrent_pages` pages are open in the shared browser at
+        once, and at most `max_pages_per_domain` of them on the same domain.
+
+        Args:
+            urls: Validated URLs to crawl
+            timeout: Timeout in seconds for each URL
+            bypass_cache: Whether to bypass cache
+            word_count_threshold: Minimum word count for content blocks
+
+        Yields:
+            Tuples of (index of the URL in `urls`, result dictionary)
+
+        Raises:
+            ImportError: If crawl4ai is not installed
+        """
+        from crawl4ai import CacheMode, CrawlerRunConfig
+
+        # Configure crawler settings
+        run_config = CrawlerRunConfig(
+            cache_mode=CacheMode.BYPASS if bypass_cache else CacheMode.ENABLED,
+            word_count_threshold=word_count_threshold,
+            process_iframes=True,
+            remove_overlay_elements=True,
+            excluded_tags=["script", "style"],
+            page_timeout=timeout * 1000,  # Convert to milliseconds
+            verbose=False,
+            wait_until="domcontentloaded",
+        )
+
+        crawler = await self._acquire_crawler()
+
+        async def crawl(url: str) -> Dict[str, Any]:
+            nonlocal crawler
+            async with self._domain_limit(url), self._page_limit:
+                result = await self._crawl_url(crawler, url, run_config)
+                if not result["success"] and not self._is_crawler_alive(crawler):
+                    # The browser died under this page; retry once on a new one
+                    crawler = await self._restart_crawler(crawler)
+                    result = await self._crawl_url(crawler, url, run_config)
+                return result
+
+        pending = {
+            asyncio.create_task(crawl(url)): index for index, url in enumerate(urls)
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield pending.pop(task), task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            self._release_crawler()
+
+    async def _acquire_crawler(self):
+        """Return the shared crawler, starting or restarting it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Browser connections and semaphores belong to the loop they were
+            # created on; a crawler left behind by another loop is unusable
+            self._loop = loop
+            self._crawler = None
+            self._idle_task = None
+            self._active_calls = 0
+            self._page_limit = asyncio.Semaphore(self.max_concurrent_pages)
+            self._domain_limits = {}
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._idle_task is not None:
+                self._idle_task.cancel()
+                self._idle_task = None
+
+            if self._crawler is not None and not self._is_crawler_alive(self._crawler):
+                logger.warning("🕷️ Crawl4AI browser is not running, restarting it")
+                await self._close_crawler()
+                self.crawler_stats.restarts += 1
+
+            if self._crawler is None:
+                await self._start_crawler()
+            else:
+                self.crawler_stats.reused_calls += 1
+            self.crawler_stats.calls += 1
+            self._active_calls += 1
+            return self._crawler
+
+    def _release_crawler(self) -> None:
+        """Mark a call as finished and schedule closing the idle browser."""
+        self._active_calls -= 1
+        if self._active_calls == 0 and self._crawler is not None:
+            self._idle_task = asyncio.create_task(self._close_when_idle())
+
+    async def _restart_crawler(self, failed_crawler):
+        """Replace a crashed crawler, unless another page already did."""
+        async with self._lock:
+            if self._crawler is failed_crawler:
+                logger.warning("🕷️ Crawl4AI browser crashed, restarting it")
+                await self._close_crawler()
+                await self._start_crawler()
+                self.crawler_stats.restarts += 1
+            return self._crawler
+
+    async def _start_crawler(self) -> None:
+        from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+        # Configure browser settings
+        browser_config = BrowserConfig(
+            headless=True,
+            verbose=False,
+            browser_type="chromium",
+            ignore_https_errors=True,
+            java_script_enabled=True,
+        )
+
+        start_time = asyncio.get_running_loop().time()
+        crawler = AsyncWebCrawler(config=browser_config)
+        await crawler.start()
+        startup_time = asyncio.get_running_loop().time() - start_time
+
+        self._crawler = crawler
+        self.crawler_stats.starts += 1
+        self.crawler_stats.last_startup_time = startup_time
+        logger.info(f"🕷️ Crawl4AI browser started in {startup_time:.2f}s")
+
+    async def _close_crawler(self) -> None:
+        crawler, self._crawler = self._crawler, None
+        if crawler is not None:
+            try:
+                await crawler.close()
+            except Exception as e:
+                logger.warning(f"Error closing Crawl4AI browser: {e}")
+
+    async def _close_when_idle(self) -> None:
+        await asyncio.sleep(self.idle_timeout)
+        async with self._lock:
+            if self._active_calls == 0 and self._crawler is not None:
+                logger.info("🕷️ Closing idle Crawl4AI browser")
+                await self._close_crawler()
+            self._idle_task = None
+
+    @staticmethod
+    def _is_crawler_alive(crawler) -> bool:
+        if not getattr(crawler, "ready", True):
+            return False
+        strategy = getattr(crawler, "crawler_strategy", None)
+        browser = getattr(getattr(strategy, "browser_manager", None), "browser", None)
+        return browser is None or browser.is_connected()
+
+    def _domain_limit(self, url: str) -> asyncio.Semaphore:
+        domain = urlparse(url).netloc.lower()
+        if domain not in self._domain_limits:
+            self._domain_limits[domain] = asyncio.Semaphore(self.max_pages_per_domain)
+        return self._domain_limits[domain]
+
+    async def cleanup(self):
+        """Close the browser kept open between calls."""
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            self._idle_task = None
+        async with self._lock:
+            await self._close_crawler()
+
+    async def _crawl_url(self, crawler, url: str, run_config) -> Dict[str, Any]:
+        """Crawl a single URL and summarize the result."""
+        try:
+            logger.info(f"🕷️ Crawling URL: {url}")
+            start_time = asyncio.get_event_loop().time()
+
+            result = await crawler.arun(url=url, config=run_config)
+
+            end_time = asyncio.get_event_loop().time()
+            execution_time = end_time - start_time
+
+            if not result.success:
+                logger.warning(f"❌ Failed to crawl {url}")
+                return {
+                    "url": url,
+                    "success": False,
+                    "error_message": getattr(result, "error_message", "Unknown error"),
+                    "execution_time": execution_time,
+                }
+
+            # Count words in markdown
+            word_count = 0
+            if hasattr(result, "markdown") and result.markdown:
+                word_count = len(result.markdown.split())
+
+            # Count links
+            links_count = 0
+            if hasattr(result, "links") and result.links:
+                internal_links = result.links.get("internal", [])
+                external_links = result.links.get("external", [])
+                links_count = len(internal_links) + len(external_links)
+
+            # Count images
+            images_count = 0
+            if hasattr(result, "media") and result.media:
+                images = result.media.get("images", [])
+                images_count = len(images)
+
+            logger.info(f"✅ Successfully crawled {url} in {execution_time:.2f}s")
+            return {
+                "url": url,
+                "success": True,
+                "status_code": getattr(result, "status_code", 200),
+                "title": result.metadata.get("title") if result.metadata else None,
+                "markdown": result.markdown if hasattr(result, "markdown") else None,
+                "word_count": word_count,
+                "links_count": links_count,
+                "images_count": images_count,
+                "execution_time": execution_time,
+            }
+
+        except Exception as e:
+            error_msg = f"Error crawling {url}: {str(e)}"
+            logger.error(error_msg)
+            return {"url": url, "success": False, "error_message": error_msg}
+
     def _is_valid_url(self, url: str) -> bool:
         """Validate if a URL is properly formatted."""
         try:
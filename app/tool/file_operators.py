@@ -2,7 +2,15 @@
 
 import asyncio
 from pathlib import Path
-from typing import Optional, Protocol, Tuple, Union, runtime_checkable
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
 from app.config import SandboxSettings
 from app.exceptions import ToolError
@@ -24,6 +32,14 @@ class FileOperator(Protocol):
         """Write content to a file."""
         ...
 
+    async def read_files(self, paths: Iterable[PathLike]) -> Dict[str, str]:
+        """Read several files at once, keyed by the given paths."""
+        ...
+
+    async def write_files(self, files: Dict[PathLike, str]) -> None:
+        """Write several files at once."""
+        ...
+
     async def is_directory(self, path: PathLike) -> bool:
         """Check if path points to a directory."""
         ...
@@ -58,6 +74,15 @@ class LocalFileOperator(FileOperator):
         except Exception as e:
             raise ToolError(f"Failed to write to {path}: {str(e)}") from None
 
+    async def read_files(self, paths: Iterable[PathLike]) -> Dict[str, str]:
+        """Read several local files."""
+        return {str(path): await self.read_file(path) for path in paths}
+
+    async def write_files(self, files: Dict[PathLike, str]) -> None:
+        """Write several local files."""
+        for path, content in files.items():
+            await self.write_file(path, content)
+
     async def is_directory(self, path: PathLike) -> bool:
         """Check if path points to a directory."""
         return Path(path).is_dir()
@@ -125,6 +150,28 @@ class SandboxFileOperator(FileOperator):
         except Exception as e:
             raise ToolError(f"Failed to write to {path} in sandbox: {str(e)}") from None
 
+    async def read_files(self, paths: Iterable[PathLike]) -> Dict[str, str]:
+        """Read several files from sandbox in a single archive transfer."""
+        await self._ensure_sandbox_initialized()
+        paths = [str(path) for path in paths]
+        try:
+            return await self.sandbox_client.read_files(paths)
+        except Exception as e:
+            raise ToolError(
+                f"Failed to read {', '.join(paths)} in sandbox: {str(e)}"
+            ) from None
+
+    async def write_files(self, files: Dict[PathLike, str]) -> None:
+        """Write several files to sandbox in a single archive transfer."""
+        await self._ensure_sandbox_initialized()
+        files = {str(path): content for path, content in files.items()}
+        try:
+            await self.sandbox_client.write_files(files)
+        except Exception as e:
+            raise ToolError(
+                f"Failed to write to {', '.join(files)} in sandbox: {str(e)}"
+            ) from None
+
     async def is_directory(self, path: PathLike) -> bool:
         """Check if path points to a directory in sandbox."""
         await self._ensure_sandbox_initialized()
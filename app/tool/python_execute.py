@@ -1,14 +1,190 @@
+import asyncio
+import importlib
 import multiprocessing
+import os
 import sys
-import tempfile
+import threading
+import uuid
+from collections import deque
 from io import StringIO
-from pathlib import Path
-from typing import Dict
+from typing import Deque, Dict, Optional
+
+from pydantic import PrivateAttr
 
 from app.tool.base import BaseTool
 from app.logger import logger
 
 
+# Modules imported by every worker at startup so snippets do not pay for them
+_PRELOAD_MODULES = ("numpy", "pandas")
+
+
+def _new_namespace() -> dict:
+    if isinstance(__builtins__, dict):
+        return {"__builtins__": __builtins__}
+    return {"__builtins__": __builtins__.__dict__.copy()}
+
+
+def _run_code(code: str, namespace: dict) -> Dict:
+    original_stdout = sys.stdout
+    try:
+        output_buffer = StringIO()
+        sys.stdout = output_buffer
+        exec(code, namespace, namespace)
+        return {"observation": output_buffer.getvalue(), "success": True}
+    except SystemExit as e:
+        # exit() in a snippet ends the snippet, not the worker
+        return {
+            "observation": f"{output_buffer.getvalue()}SystemExit: {e.code}",
+            "success": e.code in (None, 0),
+        }
+    except Exception as e:
+        return {"observation": str(e), "success": False}
+    finally:
+        sys.stdout = original_stdout
+
+
+def _worker_main(conn) -> None:
+    """Worker process loop: receive code over the pipe, send back the result."""
+    for module in _PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    namespace = _new_namespace()
+    while True:
+        try:
+            code, persistent = conn.recv()
+        except (EOFError, OSError):
+            break
+        if not persistent:
+            namespace = _new_namespace()
+        conn.send(_run_code(code, namespace))
+
+
+class _PythonWorker:
+    """A pre-forked Python process that executes snippets sent over a pipe."""
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def run(self, code: str, timeout: int, persistent: bool) -> Optional[Dict]:
+        """Run code in the worker; returns None if it did not finish in time.
+
+        Raises:
+            EOFError, OSError: If the worker process exited.
+        """
+        self.conn.send((code, persistent))
+        if self.conn.poll(timeout):
+            return self.conn.recv()
+        return None
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class _PythonWorkerPool:
+    """Pool of warm worker processes shared by all PythonExecute instances.
+
+    Stateless snippets borrow an idle worker which gets a fresh namespace per
+    run. A persistent namespace pins a dedicated worker to its key, so data
+    loaded in one call stays available to the next.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Deque[_PythonWorker] = deque()
+        self._pinned: Dict[str, _PythonWorker] = {}
+        self._lock = threading.Lock()
+        self._refill()
+
+    def _refill(self) -> None:
+        with self._lock:
+            while len(self._idle) < self.size:
+                self._idle.append(_PythonWorker())
+
+    def _acquire(self, namespace: Optional[str]) -> _PythonWorker:
+        with self._lock:
+            if namespace and namespace in self._pinned:
+                worker = self._pinned[namespace]
+                if worker.is_alive():
+                    return worker
+                del self._pinned[namespace]
+            worker = None
+            while self._idle and worker is None:
+                candidate = self._idle.popleft()
+                if candidate.is_alive():
+                    worker = candidate
+            worker = worker or _PythonWorker()
+            if not namespace:
+                return worker
+            self._pinned[namespace] = worker
+        # A pinned worker leaves the pool for good, start its replacement
+        self._refill()
+        return worker
+
+    def _release(self, worker: _PythonWorker, namespace: Optional[str]) -> None:
+        if namespace:
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.kill()
+
+    def run(self, code: str, timeout: int, namespace: Optional[str] = None) -> Dict:
+        worker = self._acquire(namespace)
+        try:
+            result = worker.run(code, timeout, persistent=namespace is not None)
+        except (EOFError, OSError):
+            observation = "Python worker exited"
+        else:
+            if result is not None:
+                self._release(worker, namespace)
+                return result
+            observation = f"Execution timeout after {timeout} seconds"
+
+        # Timed out or exited: the worker is unusable, replace it
+        worker.kill()
+        with self._lock:
+            if namespace:
+                self._pinned.pop(namespace, None)
+        self._refill()
+        if namespace:
+            observation += "; the persistent namespace was reset"
+        return {"observation": observation, "success": False}
+
+    def discard(self, namespace: str) -> None:
+        """Drop a persistent namespace and stop its worker."""
+        with self._lock:
+            worker = self._pinned.pop(namespace, None)
+        if worker:
+            worker.kill()
+
+
+_WORKER_POOL: Optional[_PythonWorkerPool] = None
+_WORKER_POOL_LOCK = threading.Lock()
+
+
+def _get_worker_pool() -> _PythonWorkerPool:
+    global _WORKER_POOL
+    with _WORKER_POOL_LOCK:
+        if _WORKER_POOL is None:
+            _WORKER_POOL = _PythonWorkerPool(size=min(4, os.cpu_count() or 1))
+        return _WORKER_POOL
+
+
 class PythonExecute(BaseTool):
     """A tool for executing Python code with timeout and safety restrictions."""
 
@@ -24,20 +200,19 @@ class PythonExecute(BaseTool):
         },
         "required": ["code"],
     }
+    # Keep variables between calls of this tool instance (i.e. per agent)
+    persistent_namespace: bool = False
 
-    def _run_code(self, code: str, result_dict: dict, safe_globals: dict) -> None:
-        original_stdout = sys.stdout
-        try:
-            output_buffer = StringIO()
-            sys.stdout = output_buffer
-            exec(code, safe_globals, safe_globals)
-            result_dict["observation"] = output_buffer.getvalue()
-            result_dict["success"] = True
-        except Exception as e:
-            result_dict["observation"] = str(e)
-            result_dict["success"] = False
-        finally:
-            sys.stdout = original_stdout
+    _namespace_id: str = PrivateAttr(default_factory=lambda: uuid.uuid4().hex)
+
+    def reset_namespace(self) -> None:
+        """Forget variables kept in this tool's persistent namespace."""
+        if self.persistent_namespace and _WORKER_POOL is not None:
+            _WORKER_POOL.discard(self._namespace_id)
+
+    async def cleanup(self) -> None:
+        """Stop the worker pinned to this tool's persistent namespace."""
+        self.reset_namespace()
 
     def _execute_in_current_env(
         self,
@@ -45,7 +220,9 @@ class PythonExecute(BaseTool):
         timeout: int = 5,
     ) -> Dict:
         """
-        Executes Python code in the current environment using multiprocessing.
+        Executes Python code in the current environment using a pool of warm
+        worker processes. A worker that exceeds the timeout is killed and
+        replaced.
 
         Args:
             code (str): The Python code to execute.
@@ -54,27 +231,8 @@ class PythonExecute(BaseTool):
         Returns:
             Dict: Contains 'observation' with execution output and 'success' status.
         """
-        with multiprocessing.Manager() as manager:
-            result = manager.dict({"observation": "", "success": False})
-            if isinstance(__builtins__, dict):
-                safe_globals = {"__builtins__": __builtins__}
-            else:
-                safe_globals = {"__builtins__": __builtins__.__dict__.copy()}
-            proc = multiprocessing.Process(
-                target=self._run_code, args=(code, result, safe_globals)
-            )
-            proc.start()
-            proc.join(timeout)
-
-            # timeout process
-            if proc.is_alive():
-                proc.terminate()
-                proc.join(1)
-                return {
-                    "observation": f"Execution timeout after {timeout} seconds",
-                    "success": False,
-                }
-            return dict(result)
+        namespace = self._namespace_id if self.persistent_namespace else None
+        return _get_worker_pool().run(code, timeout, namespace)
 
     async def _execute_in_sandbox(
         self,
@@ -82,7 +240,8 @@ class PythonExecute(BaseTool):
         timeout: int = 5,
     ) -> Dict:
         """
-        Executes Python code in the sandbox environment.
+        Executes Python code in the sandbox environment, using a persistent
+        interpreter inside the container that keeps state between calls.
 
         Args:
             code (str): The Python code to execute.
@@ -97,27 +256,12 @@ class PythonExecute(BaseTool):
             # Ensure sandbox is initialized
             await SANDBOX_CLIENT.create()
 
-            # Create a temporary file to store the Python code
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=".py", delete=False
-            ) as f:
-                temp_script = f.name
-                f.write(code)
-
-            # Copy the script to sandbox
-            container_script_path = f"/workspace/{Path(temp_script).name}"
-            await SANDBOX_CLIENT.copy_to(temp_script, container_script_path)
-
-            # Execute the Python script in sandbox
-            command = f"python {container_script_path}"
-            output = await SANDBOX_CLIENT.run_command(command, timeout)
-
-            # Clean up temporary file
-            Path(temp_script).unlink(missing_ok=True)
+            # Run the code in the sandbox's persistent Python interpreter
+            output, success = await SANDBOX_CLIENT.run_python(code, timeout)
 
             return {
                 "observation": output,
-                "success": True,
+                "success": success,
             }
         except Exception as e:
             logger.error(f"Error executing code in sandbox: {e}")
@@ -160,4 +304,4 @@ class PythonExecute(BaseTool):
             return await self._execute_in_sandbox(code, timeout)
         else:
             logger.debug("Executing Python code in current environment")
-            return self._execute_in_current_env(code, timeout)
+            return await asyncio.to_thread(self._execute_in_current_env, code, timeout)
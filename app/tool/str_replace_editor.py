@@ -1,8 +1,9 @@
 """File and directory manipulation tool with sandbox support."""
 
+import shlex
 from collections import defaultdict
 from pathlib import Path
-from typing import Any, DefaultDict, List, Literal, Optional, get_args
+from typing import Any, DefaultDict, Dict, List, Literal, Optional, get_args
 
 from app.config import config
 from app.exceptions import ToolError
@@ -38,6 +39,7 @@ _STR_REPLACE_EDITOR_DESCRIPTION = """Custom editing tool for viewing, creating a
 * State is persistent across command calls and discussions with the user
 * If `path` is a file, `view` displays the result of applying `cat -n`. If `path` is a directory, `view` lists non-hidden files and directories up to 2 levels deep
 * The `create` command cannot be used if the specified `path` already exists as a file
+* To create several files at once, pass them to `create` via `files`; they are written together with `path` in a single operation
 * If a `command` generates a long output, it will be truncated and marked with `<response clipped>`
 * The `undo_edit` command will revert the last edit made to the file at `path`
 
@@ -78,6 +80,11 @@ class StrReplaceEditor(BaseTool):
                 "description": "Required parameter of `create` command, with the content of the file to be created.",
                 "type": "string",
             },
+            "files": {
+                "description": "Optional parameter of `create` command: an object mapping additional absolute file paths to their contents, created together with `path` in one batch.",
+                "type": "object",
+                "additionalProperties": {"type": "string"},
+            },
             "old_str": {
                 "description": "Required parameter of `str_replace` command containing the string in `path` to replace.",
                 "type": "string",
@@ -102,6 +109,10 @@ class StrReplaceEditor(BaseTool):
     _local_operator: LocalFileOperator = LocalFileOperator()
     _sandbox_operator: SandboxFileOperator = SandboxFileOperator()
 
+    def is_concurrency_safe(self, **kwargs) -> bool:
+        """Only read-only `view` commands may run alongside other tool calls."""
+        return kwargs.get("command") == "view"
+
     # def _get_operator(self, use_sandbox: bool) -> FileOperator:
     def _get_operator(self) -> FileOperator:
         """Get the appropriate file operator based on execution mode."""
@@ -117,6 +128,7 @@ class StrReplaceEditor(BaseTool):
         command: Command,
         path: str,
         file_text: str | None = None,
+        files: Dict[str, str] | None = None,
         view_range: list[int] | None = None,
         old_str: str | None = None,
         new_str: str | None = None,
@@ -137,9 +149,12 @@ class StrReplaceEditor(BaseTool):
         elif command == "create":
             if file_text is None:
                 raise ToolError("Parameter `file_text` is required for command: create")
-            await operator.write_file(path, file_text)
-            self._file_history[path].append(file_text)
-            result = ToolResult(output=f"File created successfully at: {path}")
+            if files:
+                result = await self.create_many({path: file_text, **files}, operator)
+            else:
+                await operator.write_file(path, file_text)
+                self._file_history[path].append(file_text)
+                result = ToolResult(output=f"File created successfully at: {path}")
         elif command == "str_replace":
             if old_str is None:
                 raise ToolError(
@@ -194,6 +209,31 @@ class StrReplaceEditor(BaseTool):
                     f"File already exists at: {path}. Cannot overwrite files using command `create`."
                 )
 
+    async def create_many(
+        self, files: Dict[str, str], operator: FileOperator = None
+    ) -> ToolResult:
+        """Create several new files with a single batched write."""
+        for file_path in files:
+            if not Path(file_path).is_absolute():
+                raise ToolError(f"The path {file_path} is not an absolute path")
+
+        # One existence check for the whole batch instead of a round trip per file
+        quoted = " ".join(shlex.quote(str(file_path)) for file_path in files)
+        _, stdout, _ = await operator.run_command(f"ls -d -- {quoted} 2>/dev/null")
+        existing = [line for line in stdout.splitlines() if line.strip()]
+        if existing:
+            raise ToolError(
+                f"Files already exist at: {', '.join(existing)}. Cannot overwrite files using command `create`."
+            )
+
+        await operator.write_files(files)
+        for file_path, content in files.items():
+            self._file_history[file_path].append(content)
+
+        return ToolResult(
+            output=f"{len(files)} files created successfully at: {', '.join(files)}"
+        )
+
     async def view(
         self,
         path: PathLike,
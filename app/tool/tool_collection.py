@@ -1,11 +1,15 @@
 """Collection classes for managing multiple tools."""
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 from app.exceptions import ToolError
 from app.logger import logger
 from app.tool.base import BaseTool, ToolFailure, ToolResult
 
 
+if TYPE_CHECKING:
+    from app.llm import TokenCounter
+
+
 class ToolCollection:
     """A collection of defined tools."""
 
@@ -13,14 +17,68 @@ class ToolCollection:
         arbitrary_types_allowed = True
 
     def __init__(self, *tools: BaseTool):
-        self.tools = tools
+        # Bumped whenever the tools change, so callers can cache per version
+        self.version = 0
         self.tool_map = {tool.name: tool for tool in tools}
+        self.tools = tools
+
+    @property
+    def tools(self) -> Tuple[BaseTool, ...]:
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools: Iterable[BaseTool]) -> None:
+        # Subclasses such as MCPClients replace the tuple directly on refresh
+        self._tools = tuple(tools)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached tool schemas, e.g. after a tool was changed in place."""
+        self._params: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+        self._token_counts: Dict[int, Dict[str, int]] = {}
+        self.version += 1
 
     def __iter__(self):
         return iter(self.tools)
 
-    def to_params(self) -> List[Dict[str, Any]]:
-        return [tool.to_param() for tool in self.tools]
+    def _named_params(self) -> List[Tuple[str, Dict[str, Any]]]:
+        if self._params is None:
+            self._params = [(tool.name, tool.to_param()) for tool in self._tools]
+        return self._params
+
+    def to_params(self, names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Return the tool schemas, serialized once until the tools change.
+
+        Args:
+            names: Only include the tools with these names, in collection
+                order; all tools if None
+
+        The returned dicts are shared with the cache and must not be mutated.
+        """
+        params = self._named_params()
+        if names is None:
+            return [param for _, param in params]
+        wanted = set(names)
+        return [param for name, param in params if name in wanted]
+
+    def token_cost(
+        self, counter: "TokenCounter", names: Optional[Iterable[str]] = None
+    ) -> int:
+        """Return the prompt tokens taken by the (selected) tool schemas.
+
+        Per-tool counts are computed once per token counter until the tools
+        change.
+        """
+        counts = self._token_counts.setdefault(id(counter), {})
+        wanted = None if names is None else set(names)
+        total = 0
+        for name, param in self._named_params():
+            if wanted is not None and name not in wanted:
+                continue
+            if name not in counts:
+                counts[name] = counter.count_tools([param])
+            total += counts[name]
+        return total
 
     async def execute(
         self, *, name: str, tool_input: Dict[str, Any] = None
@@ -57,8 +115,8 @@ class ToolCollection:
             logger.warning(f"Tool {tool.name} already exists in collection, skipping")
             return self
 
-        self.tools += (tool,)
         self.tool_map[tool.name] = tool
+        self.tools += (tool,)
         return self
 
     def add_tools(self, *tools: BaseTool):
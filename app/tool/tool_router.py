@@ -0,0 +1,107 @@
+"""Relevance-based selection of tools from large tool catalogs."""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from app.tool.tool_collection import ToolCollection
+
+
+_CAMEL_BOUNDARY = re.compile(r"([a-z0-9])([A-Z])")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text, tool names included, into lowercase word tokens."""
+    return _WORD.findall(_CAMEL_BOUNDARY.sub(r"\1 \2", text).lower())
+
+
+class ToolRouter:
+    """Ranks the tools of a collection against a query with Okapi BM25.
+
+    Each tool is indexed by its name (weighted double), description and
+    parameter names and descriptions. The index is built once per collection
+    version, i.e. again only after tools were added or MCP servers changed.
+    """
+
+    k1 = 1.5
+    b = 0.75
+    NAME_WEIGHT = 2
+
+    def __init__(self, collection: ToolCollection):
+        self.collection = collection
+        self._version: Optional[int] = None
+        self._names: List[str] = []
+        self._term_freqs: List[Counter] = []
+        self._lengths: List[int] = []
+        self._idf: Dict[str, float] = {}
+        self._avg_length = 0.0
+
+    @classmethod
+    def _document(cls, tool) -> List[str]:
+        terms = tokenize(tool.name) * cls.NAME_WEIGHT
+        terms += tokenize(tool.description or "")
+        properties = (tool.parameters or {}).get("properties", {})
+        for name, spec in properties.items():
+            terms += tokenize(name)
+            if isinstance(spec, dict):
+                terms += tokenize(str(spec.get("description", "")))
+        return terms
+
+    def _ensure_index(self) -> None:
+        if self._version == self.collection.version:
+            return
+        documents = [self._document(tool) for tool in self.collection.tools]
+        self._names = [tool.name for tool in self.collection.tools]
+        self._term_freqs = [Counter(document) for document in documents]
+        self._lengths = [len(document) for document in documents]
+        self._avg_length = sum(self._lengths) / len(documents) if documents else 0.0
+
+        document_freqs = Counter()
+        for term_freqs in self._term_freqs:
+            document_freqs.update(term_freqs.keys())
+        count = len(documents)
+        self._idf = {
+            term: math.log((count - freq + 0.5) / (freq + 0.5) + 1)
+            for term, freq in document_freqs.items()
+        }
+        self._version = self.collection.version
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """BM25 score of every tool for the query."""
+        self._ensure_index()
+        terms = [term for term in tokenize(query) if term in self._idf]
+        scores = {}
+        for name, term_freqs, length in zip(
+            self._names, self._term_freqs, self._lengths
+        ):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = term_freqs.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            scores[name] = score
+        return scores
+
+    def select(self, query: str, top_k: int, always: Iterable[str] = ()) -> List[str]:
+        """
+        Pick the tools to offer for a query.
+
+        Args:
+            query: Text describing the current step
+            top_k: Number of ranked tools to include
+            always: Tool names included regardless of their score
+
+        Returns:
+            Names of the always-on tools present in the collection followed
+            by the `top_k` best scoring other tools; ties keep collection order
+        """
+        scores = self.scores(query)
+        selected = [name for name in dict.fromkeys(always) if name in scores]
+        ranked = sorted(
+            (name for name in self._names if name not in selected),
+            key=lambda name: -scores[name],
+        )
+        return selected + ranked[:top_k]
@@ -1,12 +1,13 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+import bisect
+import hashlib
+import time
+from typing import Any, ClassVar, Dict, List, Optional
 
-import requests
-from bs4 import BeautifulSoup
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.config import config
+from app.config import PROJECT_ROOT, SearchSettings, config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.search import (
@@ -17,6 +18,9 @@ from app.tool.search import (
     WebSearchEngine,
 )
 from app.tool.search.base import SearchItem
+from app.utils.html_extractor import extract_text_async
+from app.utils.http_fetcher import get_http_fetcher
+from app.utils.sqlite_cache import SQLiteCache
 
 
 class SearchResult(BaseModel):
@@ -103,6 +107,101 @@ class SearchResponse(ToolResult):
         return self
 
 
+class EngineStats:
+    """Latency histogram and outcome counters for one search engine."""
+
+    # Upper bounds (seconds) of the latency histogram buckets; the last is open
+    LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+    # Seconds added to the ranking penalty for an engine that always fails
+    ERROR_PENALTY = 10.0
+    EWMA_ALPHA = 0.3
+
+    def __init__(self):
+        self.histogram = [0] * (len(self.LATENCY_BUCKETS) + 1)
+        self.successes = 0
+        self.empty = 0
+        self.errors = 0
+        self.ewma_latency: Optional[float] = None
+        self.ewma_failure = 0.0
+
+    @property
+    def calls(self) -> int:
+        return self.successes + self.empty + self.errors
+
+    def record(self, latency: float, outcome: str) -> None:
+        """Record one call; outcome is "success", "empty" or "error"."""
+        self.histogram[bisect.bisect_left(self.LATENCY_BUCKETS, latency)] += 1
+        if outcome == "success":
+            self.successes += 1
+        elif outcome == "empty":
+            self.empty += 1
+        else:
+            self.errors += 1
+
+        failed = 0.0 if outcome == "success" else 1.0
+        if self.ewma_latency is None:
+            self.ewma_latency, self.ewma_failure = latency, failed
+        else:
+            a = self.EWMA_ALPHA
+            self.ewma_latency = a * latency + (1 - a) * self.ewma_latency
+            self.ewma_failure = a * failed + (1 - a) * self.ewma_failure
+
+    def penalty(self, default_latency: float) -> float:
+        """Expected cost of trying this engine, used for adaptive ordering."""
+        if self.ewma_latency is None:
+            return default_latency
+        return self.ewma_latency + self.ewma_failure * self.ERROR_PENALTY
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}s" for b in self.LATENCY_BUCKETS]
+        labels.append(f">{self.LATENCY_BUCKETS[-1]}s")
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "empty": self.empty,
+            "errors": self.errors,
+            "ewma_latency": self.ewma_latency,
+            "ewma_failure": self.ewma_failure,
+            "latency_histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+_caches: Dict[str, SQLiteCache] = {}
+
+
+def get_web_cache(kind: str) -> Optional[SQLiteCache]:
+    """Return the on-disk cache for "search" results or "page" contents.
+
+    Returns None when caching is disabled in the [search] config.
+    """
+    settings = config.search_config or SearchSettings()
+    if not settings.cache_enabled:
+        return None
+    if kind not in _caches:
+        path = settings.cache_path or PROJECT_ROOT / ".cache" / "web_search.sqlite3"
+        ttl = settings.cache_ttl if kind == "search" else settings.page_cache_ttl
+        _caches[kind] = SQLiteCache(
+            path,
+            table=f"{kind}_cache",
+            ttl=ttl,
+            max_entries=settings.cache_max_entries,
+        )
+    return _caches[kind]
+
+
+def search_cache_key(
+    engine_name: str,
+    query: str,
+    num_results: int,
+    lang: Optional[str],
+    country: Optional[str],
+) -> str:
+    """Key for a search, insensitive to case and whitespace in the query."""
+    normalized = " ".join(query.lower().split())
+    parts = [engine_name, normalized, str(num_results), lang or "", country or ""]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
 class WebContentFetcher:
     """Utility class for fetching web content."""
 
@@ -118,35 +217,47 @@ class WebContentFetcher:
         Returns:
             Extracted text content or None if fetching fails
         """
-        headers = {
-            "WebSearch": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        cache = get_web_cache("page")
+        cached = (
+            await asyncio.to_thread(cache.get, url, allow_stale=True) if cache else None
+        )
+        if cached and cached.age <= cache.ttl:
+            return cached.value
+
+        # Revalidate a stale copy instead of downloading the page again
+        headers = {}
+        if cached:
+            if "etag" in cached.metadata:
+                headers["If-None-Match"] = cached.metadata["etag"]
+            if "last-modified" in cached.metadata:
+                headers["If-Modified-Since"] = cached.metadata["last-modified"]
 
         try:
-            # Use asyncio to run requests in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: requests.get(url, headers=headers, timeout=timeout)
+            # Shared keep-alive client, so repeated hosts skip DNS/TCP/TLS setup
+            response = await get_http_fetcher().fetch(
+                url, timeout=timeout, headers=headers or None
             )
 
+            if response.status_code == 304 and cached:
+                await asyncio.to_thread(cache.refresh, url)
+                return cached.value
+
             if response.status_code != 200:
                 logger.warning(
                     f"Failed to fetch content from {url}: HTTP {response.status_code}"
                 )
                 return None
 
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
-
-            # Get text content
-            text = soup.get_text(separator="\n", strip=True)
-
-            # Clean up whitespace and limit size (100KB max)
-            text = " ".join(text.split())
-            return text[:10000] if text else None
+            # Streaming extraction in a worker process; stops at the 10k budget
+            text = await extract_text_async(response.text, max_chars=10000)
+            if cache and text:
+                validators = {
+                    name: response.headers[name]
+                    for name in ("etag", "last-modified")
+                    if name in response.headers
+                }
+                await asyncio.to_thread(cache.set, url, text, metadata=validators)
+            return text
 
         except Exception as e:
             logger.warning(f"Error fetching content from {url}: {e}")
@@ -190,12 +301,15 @@ class WebSearch(BaseTool):
         },
         "required": ["query"],
     }
+    concurrency_safe: bool = True
     _search_engine: dict[str, WebSearchEngine] = {
         "google": GoogleSearchEngine(),
         "baidu": BaiduSearchEngine(),
         "duckduckgo": DuckDuckGoSearchEngine(),
         "bing": BingSearchEngine(),
     }
+    # Shared by all instances so every search improves the engine ranking
+    _engine_stats: ClassVar[Dict[str, EngineStats]] = {}
     content_fetcher: WebContentFetcher = WebContentFetcher()
 
     async def execute(
@@ -249,8 +363,15 @@ class WebSearch(BaseTool):
         search_params = {"lang": lang, "country": country}
 
         # Try searching with retries when all engines fail
+        hedged = (
+            getattr(config.search_config, "hedged", False)
+            if config.search_config
+            else False
+        )
+        search = self._race_engines if hedged else self._try_all_engines
+
         for retry_count in range(max_retries + 1):
-            results = await self._try_all_engines(query, num_results, search_params)
+            results = await search(query, num_results, search_params)
 
             if results:
                 # Fetch content if requested
@@ -295,13 +416,13 @@ class WebSearch(BaseTool):
         failed_engines = []
 
         for engine_name in engine_order:
-            engine = self._search_engine[engine_name]
             logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
-            search_items = await self._perform_search_with_engine(
-                engine, query, num_results, search_params
+            search_items = await self._timed_search(
+                engine_name, query, num_results, search_params
             )
 
             if not search_items:
+                failed_engines.append(engine_name)
                 continue
 
             if failed_engines:
@@ -309,23 +430,141 @@ class WebSearch(BaseTool):
                     f"Search successful with {engine_name.capitalize()} after trying: {', '.join(failed_engines)}"
                 )
 
-            # Transform search items into structured results
-            return [
-                SearchResult(
-                    position=i + 1,
-                    url=item.url,
-                    title=item.title
-                    or f"Result {i+1}",  # Ensure we always have a title
-                    description=item.description or "",
-                    source=engine_name,
-                )
-                for i, item in enumerate(search_items)
-            ]
+            return self._to_search_results(engine_name, search_items)
 
         if failed_engines:
             logger.error(f"All search engines failed: {', '.join(failed_engines)}")
         return []
 
+    async def _race_engines(
+        self, query: str, num_results: int, search_params: Dict[str, Any]
+    ) -> List[SearchResult]:
+        """Hedged search: start the engines one by one, first result wins.
+
+        The next engine is started when the running ones have not answered
+        within `hedge_delay`, or right away when one of them comes back empty.
+        The first non-empty result is returned and the other searches are
+        cancelled.
+        """
+        engine_order = self._get_engine_order()
+        hedge_delay = self._hedge_delay()
+        pending: Dict[asyncio.Task, str] = {}
+        next_engine = 0
+        launch_next = True
+
+        try:
+            while True:
+                if launch_next and next_engine < len(engine_order):
+                    engine_name = engine_order[next_engine]
+                    next_engine += 1
+                    logger.info(f"🔎 Racing search with {engine_name.capitalize()}...")
+                    task = asyncio.create_task(
+                        self._timed_search(
+                            engine_name, query, num_results, search_params
+                        )
+                    )
+                    pending[task] = engine_name
+                    launch_next = False
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if next_engine < len(engine_order) else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                # Either the hedge delay passed or an engine came back empty:
+                # both mean the next engine should start now
+                launch_next = True
+                for task in done:
+                    engine_name = pending.pop(task)
+                    search_items = task.result()
+                    if search_items:
+                        logger.info(
+                            f"Search won by {engine_name.capitalize()}, cancelling {len(pending)} other engine(s)"
+                        )
+                        return self._to_search_results(engine_name, search_items)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        logger.error(f"All search engines failed: {', '.join(engine_order)}")
+        return []
+
+    async def _timed_search(
+        self,
+        engine_name: str,
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+    ) -> List[SearchItem]:
+        """Run one engine, recording its latency and outcome.
+
+        Results are served from the search cache when available; only
+        non-empty results are cached.
+        """
+        cache = get_web_cache("search")
+        key = search_cache_key(
+            engine_name,
+            query,
+            num_results,
+            search_params.get("lang"),
+            search_params.get("country"),
+        )
+        cached = await asyncio.to_thread(cache.get, key) if cache else None
+        if cached:
+            logger.info(f"Using cached {engine_name.capitalize()} results")
+            return [SearchItem(**item) for item in cached.value]
+
+        stats = self._engine_stats.setdefault(engine_name, EngineStats())
+        start = time.monotonic()
+        try:
+            search_items = await self._perform_search_with_engine(
+                self._search_engine[engine_name], query, num_results, search_params
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.record(time.monotonic() - start, "error")
+            logger.warning(f"{engine_name.capitalize()} search failed: {e}")
+            return []
+        stats.record(time.monotonic() - start, "success" if search_items else "empty")
+        if cache and search_items:
+            await asyncio.to_thread(
+                cache.set, key, [item.model_dump() for item in search_items]
+            )
+        return search_items
+
+    @staticmethod
+    def _to_search_results(
+        engine_name: str, search_items: List[SearchItem]
+    ) -> List[SearchResult]:
+        """Transform search items into structured results."""
+        return [
+            SearchResult(
+                position=i + 1,
+                url=item.url,
+                title=item.title or f"Result {i+1}",  # Ensure we always have a title
+                description=item.description or "",
+                source=engine_name,
+            )
+            for i, item in enumerate(search_items)
+        ]
+
+    @classmethod
+    def engine_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """Per-engine latency histograms and outcome counters."""
+        return {name: stats.snapshot() for name, stats in cls._engine_stats.items()}
+
+    @staticmethod
+    def _hedge_delay() -> float:
+        return (
+            getattr(config.search_config, "hedge_delay", 1.5)
+            if config.search_config
+            else 1.5
+        )
+
     async def _fetch_content_for_results(
         self, results: List[SearchResult]
     ) -> List[SearchResult]:
@@ -382,6 +621,21 @@ class WebSearch(BaseTool):
         )
         engine_order.extend([e for e in self._search_engine if e not in engine_order])
 
+        adaptive = (
+            getattr(config.search_config, "adaptive_order", False)
+            if config.search_config
+            else False
+        )
+        if adaptive:
+            # Stable sort: engines without history keep their configured place,
+            # assumed to answer within the hedge delay
+            default_latency = self._hedge_delay()
+            engine_order.sort(
+                key=lambda name: self._engine_stats.setdefault(
+                    name, EngineStats()
+                ).penalty(default_latency)
+            )
+
         return engine_order
 
     @retry(
@@ -0,0 +1,252 @@
+"""Structured tracing of agent runs.
+
+Spans nest as run -> step -> think/act -> LLM request / tool execution /
+sandbox operation and carry monotonic timings, attributes and counters such
+as tokens and bytes moved. Finished spans are appended to a JSON lines file,
+either as flat records or as OTLP/JSON export requests that OpenTelemetry
+collectors can read. When tracing is disabled, `tracer.span()` returns a
+shared no-op span, so instrumented code only pays for one attribute check.
+"""
+
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from app.config import PROJECT_ROOT, TracingSettings, config
+
+
+TRACE_FILE_ENV = "OPENMANUS_TRACE"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes and counters.
+
+    Used as a context manager, the span becomes the parent of spans started
+    inside it, also in tasks created there. Counters are summed into the
+    parent when the span ends, so run and step spans carry the token and
+    byte totals of everything below them.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent",
+        "attributes",
+        "counters",
+        "error",
+        "start_ns",
+        "end_ns",
+        "_tracer",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        parent: Optional["Span"],
+        attributes: Dict[str, Any],
+    ):
+        self._tracer = tracer
+        self._token = None
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.counters: Dict[str, Union[int, float]] = {}
+        self.error: Optional[str] = None
+        self.start_ns = time.monotonic_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Duration in seconds, once ended."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set(self, **attributes: Any) -> None:
+        """Set attributes of the span."""
+        self.attributes.update(attributes)
+
+    def add(self, **counters: Union[int, float]) -> None:
+        """Add to counters of the span, e.g. tokens or bytes."""
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """End the span and export it; later calls are ignored."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.monotonic_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self.parent is not None and self.parent.end_ns is None:
+            self.parent.add(**self.counters)
+        self._tracer.export(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        _current_span.reset(self._token)
+        self.end(exc_value)
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    name = ""
+    duration = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, **counters: Union[int, float]) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and writes finished ones to the trace file."""
+
+    def __init__(self, settings: Optional[TracingSettings] = None):
+        self._lock = threading.Lock()
+        self._file = None
+        # Wall clock at a monotonic instant, to export absolute timestamps
+        self._wall_anchor_ns = time.time_ns()
+        self._monotonic_anchor_ns = time.monotonic_ns()
+        self.configure(settings)
+
+    def configure(self, settings: Optional[TracingSettings] = None) -> None:
+        """Apply settings; the OPENMANUS_TRACE variable enables tracing to a file."""
+        self.close()
+        settings = settings or TracingSettings()
+        env_path = os.environ.get(TRACE_FILE_ENV)
+        self.enabled = bool(env_path) or settings.enabled
+        self.format = settings.format
+        path = env_path or settings.path
+        if path:
+            path = Path(path)
+            self.path = path if path.is_absolute() else PROJECT_ROOT / path
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            self.path = PROJECT_ROOT / "logs" / f"trace_{timestamp}.jsonl"
+
+    def span(self, name: str, **attributes: Any) -> Union[Span, _NoopSpan]:
+        """Start a span under the current one; end it with `with` or end()."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, _current_span.get(), attributes)
+
+    def current(self) -> Union[Span, _NoopSpan]:
+        """The innermost span entered in this context."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return _current_span.get() or NOOP_SPAN
+
+    def export(self, span: Span) -> None:
+        record = self._otlp(span) if self.format == "otlp" else self._record(span)
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _unix_ns(self, monotonic_ns: int) -> int:
+        return self._wall_anchor_ns + monotonic_ns - self._monotonic_anchor_ns
+
+    def _record(self, span: Span) -> Dict[str, Any]:
+        return {
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent.span_id if span.parent else None,
+            "name": span.name,
+            "start": self._unix_ns(span.start_ns) / 1e9,
+            "duration": span.duration,
+            "attributes": span.attributes,
+            "counters": span.counters,
+            "error": span.error,
+        }
+
+    @staticmethod
+    def _otlp_value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def _otlp(self, span: Span) -> Dict[str, Any]:
+        attributes = {**span.attributes, **span.counters}
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self._unix_ns(span.start_ns)),
+            "endTimeUnixNano": str(self._unix_ns(span.end_ns)),
+            "attributes": [
+                {"key": key, "value": self._otlp_value(value)}
+                for key, value in attributes.items()
+                if value is not None
+            ],
+            "status": (
+                {"code": 2, "message": span.error} if span.error else {"code": 1}
+            ),
+        }
+        if span.parent is not None:
+            otlp_span["parentSpanId"] = span.parent.span_id
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": "openmanus"},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "app.tracing"}, "spans": [otlp_span]}
+                    ],
+                }
+            ]
+        }
+
+
+tracer = Tracer(config.tracing_config)
@@ -0,0 +1,116 @@
+"""Streaming HTML-to-text extraction that runs off the event loop."""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from lxml import etree
+
+from app.logger import logger
+
+
+# Elements whose content is boilerplate rather than page text
+SKIP_TAGS = frozenset({"script", "style", "header", "footer", "nav", "noscript"})
+
+# How much markup is fed to the parser between budget checks
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+class _TextCollector:
+    """lxml parser target that collects whitespace-collapsed text.
+
+    Receives parse events in document order and never builds a tree. Text
+    inside SKIP_TAGS is dropped; every element boundary separates words.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.words: List[str] = []
+        self.length = 0
+        self._pending: List[str] = []
+        self._skip_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.max_chars
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+        for word in text.split():
+            if self.full:
+                return
+            self.length += len(word) + (1 if self.words else 0)
+            self.words.append(word)
+
+    def start(self, tag, attrib) -> None:
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag) -> None:
+        self._flush()
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data) -> None:
+        if not self._skip_depth and not self.full:
+            self._pending.append(data)
+
+    def close(self) -> str:
+        self._flush()
+        return " ".join(self.words)[: self.max_chars]
+
+
+def extract_text(html: str, max_chars: int = 10000) -> Optional[str]:
+    """
+    Extract the visible text of an HTML page, collapsed to single spaces.
+
+    Parsing stops as soon as `max_chars` characters have been collected.
+
+    Args:
+        html: The page markup
+        max_chars: Maximum length of the returned text
+
+    Returns:
+        The extracted text, or None if the page has no text
+    """
+    collector = _TextCollector(max_chars)
+    parser = etree.HTMLParser(target=collector, remove_comments=True)
+    for offset in range(0, len(html), FEED_CHUNK_SIZE):
+        parser.feed(html[offset : offset + FEED_CHUNK_SIZE])
+        if collector.full:
+            break
+    try:
+        text = parser.close()
+    except etree.LxmlError:
+        text = collector.close()
+    return text or None
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    return _process_pool
+
+
+async def extract_text_async(html: str, max_chars: int = 10000) -> Optional[str]:
+    """Run extract_text in the shared process pool, keeping the loop free."""
+    global _process_pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _get_process_pool(), extract_text, html, max_chars
+        )
+    except BrokenProcessPool:
+        logger.warning("HTML extraction pool broke, restarting it")
+        _process_pool = None
+        return await asyncio.to_thread(extract_text, html, max_chars)
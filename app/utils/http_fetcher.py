@@ -0,0 +1,160 @@
+"""Shared pooled async HTTP fetcher used by the web tools."""
+
+import asyncio
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import BaseModel, Field
+
+from app.logger import logger
+
+
+try:  # HTTP/2 needs the optional `h2` package (httpx[http2])
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+
+class FetchResponse(BaseModel):
+    """A fetched page, with the body cut at the fetcher's byte limit."""
+
+    url: str = Field(description="Final URL after redirects")
+    status_code: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    text: str = ""
+    truncated: bool = Field(
+        default=False, description="Whether the body exceeded the byte limit"
+    )
+
+
+class HttpFetcher:
+    """Async fetcher built on a single pooled, keep-alive httpx client.
+
+    Concurrency is capped globally and per host; bodies are streamed and
+    reading stops once `max_bytes` have been received.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        max_connections_per_host: int = 4,
+        max_concurrency: int = 16,
+        max_bytes: int = 2 * 1024 * 1024,
+        timeout: float = 10.0,
+        http2: bool = HTTP2_AVAILABLE,
+    ):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.max_concurrency = max_concurrency
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            # Connections and semaphores are bound to the loop they were made on
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                follow_redirects=True,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._host_semaphores = {}
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                self.max_connections_per_host
+            )
+        return self._host_semaphores[host]
+
+    async def fetch(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> FetchResponse:
+        """
+        Fetch a URL, reading at most `max_bytes` of the body.
+
+        Args:
+            url: The URL to fetch
+            timeout: Request timeout in seconds (defaults to the fetcher's)
+            headers: Extra request headers
+
+        Returns:
+            The response with its (possibly truncated) decoded body
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        client = self._get_client()
+        async with self._semaphore, self._host_semaphore(url):
+            async with client.stream(
+                "GET", url, headers=headers, timeout=timeout or self.timeout
+            ) as response:
+                body = bytearray()
+                truncated = False
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) > self.max_bytes:
+                        truncated = True
+                        del body[self.max_bytes :]
+                        break
+
+                if truncated:
+                    logger.debug(f"Truncated {url} at {self.max_bytes} bytes")
+                return FetchResponse(
+                    url=str(response.url),
+                    status_code=response.status_code,
+                    headers=dict(response.headers),
+                    text=self._decode(bytes(body), response.charset_encoding),
+                    truncated=truncated,
+                )
+
+    @staticmethod
+    def _decode(body: bytes, encoding: Optional[str]) -> str:
+        try:
+            return body.decode(encoding or "utf-8", errors="replace")
+        except LookupError:  # unknown charset announced by the server
+            return body.decode("utf-8", errors="replace")
+
+    async def aclose(self) -> None:
+        """Close the pooled client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_http_fetcher: Optional[HttpFetcher] = None
+
+
+def get_http_fetcher() -> HttpFetcher:
+    """Return the process-wide shared fetcher."""
+    global _http_fetcher
+    if _http_fetcher is None:
+        _http_fetcher = HttpFetcher()
+    return _http_fetcher
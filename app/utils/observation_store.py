@@ -0,0 +1,90 @@
+"""Content-addressed files for large tool observations and images of agents."""
+
+import base64
+import binascii
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from app.logger import logger
+from app.schema import Message, Role
+
+
+class ObservationStore:
+    """Spills large message payloads to files and leaves a reference in memory.
+
+    Tool observations longer than `max_chars` are replaced by their head and
+    tail plus the path of the file holding the full text, which the agent can
+    read with its file tools when it needs more. Images are saved as files
+    and only loaded again when a request is sent (see LLM.format_messages).
+    Files are named by the hash of their content, so repeated outputs and
+    unchanged screenshots are stored once.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_chars: Optional[int] = 16000,
+        head_chars: int = 2000,
+        tail_chars: int = 1000,
+        offload_images: bool = True,
+    ):
+        self.root = Path(root)
+        self.max_chars = max_chars
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.offload_images = offload_images
+
+    def save(self, data: bytes, suffix: str) -> Path:
+        """Store data under its content hash and return the file path."""
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        path = self.root / f"{digest}{suffix}"
+        if not path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        return path
+
+    def offload(self, message: Message) -> Message:
+        """Return the message with oversized payloads replaced by file references."""
+        update = {}
+        try:
+            if self.offload_images and message.base64_image:
+                path = self.save(base64.b64decode(message.base64_image), ".jpg")
+                update.update(base64_image=None, image_path=str(path))
+            content = message.content
+            if (
+                self.max_chars
+                and message.role == Role.TOOL
+                and isinstance(content, str)
+                and len(content) > self.max_chars
+            ):
+                path = self.save(content.encode("utf-8"), ".txt")
+                update["content"] = self.preview(content, path, message.name)
+        except (OSError, binascii.Error) as e:
+            logger.warning(f"Keeping observation in memory, offloading failed: {e}")
+            return message
+        return message.model_copy(update=update) if update else message
+
+    def preview(self, text: str, path: Path, name: Optional[str] = None) -> str:
+        """Compact reference to an offloaded text with its head and tail."""
+        source = f"`{name}` output" if name else "Output"
+        omitted = len(text) - self.head_chars - self.tail_chars
+        return (
+            f"[{source} of {len(text)} characters saved to {path};"
+            " read the file for the omitted part.]\n"
+            f"{text[:self.head_chars]}\n"
+            f"[... {omitted} characters omitted ...]\n"
+            f"{text[-self.tail_chars:] if self.tail_chars else ''}"
+        )
+
+    @staticmethod
+    def load_image(path: Union[str, Path]) -> Optional[str]:
+        """Read an offloaded image back as a base64 string."""
+        try:
+            return base64.b64encode(Path(path).read_bytes()).decode("ascii")
+        except OSError as e:
+            logger.warning(f"Offloaded image {path} could not be read: {e}")
+            return None
@@ -0,0 +1,179 @@
+"""Small persistent key/value cache with TTL and LRU eviction on SQLite."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from app.logger import logger
+
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class CacheEntry(BaseModel):
+    """A cached value with its metadata and storage time."""
+
+    value: Any
+    metadata: Dict[str, str] = Field(default_factory=dict)
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class SQLiteCache:
+    """JSON value cache stored in one table of a SQLite database.
+
+    Entries older than `ttl` seconds are expired and the least recently used
+    entries are evicted beyond `max_entries`. Several caches can share one
+    database file by using different tables. Storage errors are logged and
+    turn the cache into a no-op rather than failing the caller.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        table: str = "cache",
+        ttl: float = 3600,
+        max_entries: int = 1000,
+    ):
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = Path(path)
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._disabled:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(
+                    self.path, check_same_thread=False, isolation_level=None
+                )
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, metadata TEXT,"
+                    " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_accessed"
+                    f" ON {self.table} (accessed_at)"
+                )
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning(f"Disabling cache {self.path}: {e}")
+                self._disabled = True
+        return self._conn
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Look up an entry and mark it as recently used.
+
+        Args:
+            key: Cache key
+            allow_stale: Return entries older than the TTL as well, e.g. for
+                revalidation against the origin
+
+        Returns:
+            The entry, or None on a miss
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    f"SELECT value, metadata, stored_at FROM {self.table}"
+                    " WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if not allow_stale and now - row[2] > self.ttl:
+                    conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    return None
+                conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Cache lookup failed: {e}")
+                return None
+        return CacheEntry(
+            value=json.loads(row[0]),
+            metadata=json.loads(row[1] or "{}"),
+            stored_at=row[2],
+        )
+
+    def set(
+        self, key: str, value: Any, metadata: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Store a JSON-serializable value, evicting old entries if needed."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(value), json.dumps(metadata or {}), now, now),
+                )
+                self._evict(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Cache store failed: {e}")
+
+    def refresh(self, key: str) -> None:
+        """Restart the TTL of an entry, e.g. after a successful revalidation."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    f"UPDATE {self.table} SET stored_at = ?, accessed_at = ?"
+                    " WHERE key = ?",
+                    (now, now, key),
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Cache refresh failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Stale entries are kept as long as there is room: they can still be
+        # revalidated instead of refetched
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM"
+                f" {self.table} ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
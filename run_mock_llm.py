@@ -0,0 +1,7 @@
+# coding: utf-8
+# A shortcut to launch the mock OpenAI-compatible LLM server for offline performance runs.
+from app.mock_llm.server import parse_args, run
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,20 @@
+"""Benchmark suite of the agent hot paths, with baseline regression checks.
+
+    python -m test_perf.bench list
+    python -m test_perf.bench run [--quick] [PATTERN ...]
+    python -m test_perf.bench run --save-baseline
+    python -m test_perf.bench compare RESULTS [BASELINE]
+
+`run` writes a JSON results file to test_perf/results and, when a baseline
+exists (test_perf/bench/baseline.json unless --baseline is given), exits
+with status 1 if a metric regressed beyond --threshold. Baselines are
+machine specific: record one with --save-baseline on the machine that runs
+the comparison. Benchmarks that need Docker are skipped when it is not
+available.
+"""
+
+from . import suites  # noqa: F401  registers the benchmarks
+from .core import BENCHMARKS, Recorder, benchmark, compare, run_benchmarks
+
+
+__all__ = ["BENCHMARKS", "Recorder", "benchmark", "compare", "run_benchmarks"]
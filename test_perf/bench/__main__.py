@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from . import BENCHMARKS
+from .core import Report, compare, load, run_benchmarks, save, select
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR.parent / "results"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def print_entry(name: str, entry: dict) -> None:
+    if entry["status"] == "skipped":
+        print(f"{name}: skipped ({entry['reason']})")
+        return
+    if entry["status"] == "error":
+        print(f"{name}: error ({entry['error']})")
+    else:
+        print(f"{name}: {entry['duration']:.2f}s")
+    for metric, stats in entry.get("metrics", {}).items():
+        print(
+            f"  {metric:<16} median {stats['median'] * 1000:10.3f}ms"
+            f"  p95 {stats['p95'] * 1000:10.3f}ms  n={stats['n']}"
+        )
+
+
+def print_report(report: Report, threshold: float) -> None:
+    for c in report.comparisons:
+        mark = "REGRESSION" if c.regressed else ""
+        print(
+            f"  {c.benchmark + '/' + c.metric:<36}"
+            f" {c.baseline * 1000:10.3f}ms -> {c.current * 1000:10.3f}ms"
+            f" {c.change:+8.1%} {mark}"
+        )
+    for name in report.failures:
+        print(f"  {name}: failed, but ran in the baseline")
+    if report.ok:
+        print(f"No regressions beyond {threshold:.0%}")
+    else:
+        print(
+            f"{len(report.regressions)} regression(s) beyond {threshold:.0%}, "
+            f"{len(report.failures)} failed benchmark(s)"
+        )
+
+
+def check(results: dict, baseline_path: Path, args) -> int:
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; record one with --save-baseline")
+        return 0
+    print(f"\nCompared with {baseline_path} ({args.statistic}):")
+    report = compare(
+        results,
+        load(baseline_path),
+        threshold=args.threshold,
+        statistic=args.statistic,
+        min_delta=args.min_delta,
+    )
+    print_report(report, args.threshold)
+    return 0 if report.ok else 1
+
+
+def cmd_list(args) -> int:
+    for bench in BENCHMARKS.values():
+        requires = f" [requires {', '.join(bench.requires)}]" if bench.requires else ""
+        print(f"{bench.name:<20} {bench.description}{requires}")
+    return 0
+
+
+def cmd_run(args) -> int:
+    benchmarks = select(args.patterns)
+    results = asyncio.run(
+        run_benchmarks(benchmarks, quick=args.quick, on_result=print_entry)
+    )
+
+    output = args.output or RESULTS_DIR / (
+        f"bench_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+    )
+    save(results, output)
+    print(f"\nSaved: {output}")
+
+    errors = [n for n, e in results["benchmarks"].items() if e["status"] == "error"]
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.save_baseline:
+        save(results, baseline_path)
+        print(f"Saved baseline: {baseline_path}")
+        return 1 if errors else 0
+    return max(check(results, baseline_path, args), 1 if errors else 0)
+
+
+def cmd_compare(args) -> int:
+    return check(load(args.results), args.baseline or DEFAULT_BASELINE, args)
+
+
+def add_compare_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--baseline", type=Path, help=f"Baseline results (default: {DEFAULT_BASELINE})"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown per metric (default: 0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--statistic",
+        choices=["median", "mean", "p95", "min", "max"],
+        default="median",
+        help="Statistic compared with the baseline (default: median)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=1e-4,
+        help="Slowdowns below this many seconds are ignored (default: 0.0001)",
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m test_perf.bench", description="Agent hot path benchmarks"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List the benchmarks").set_defaults(
+        func=cmd_list
+    )
+
+    run_parser = subparsers.add_parser("run", help="Run benchmarks")
+    run_parser.add_argument(
+        "patterns", nargs="*", help="Glob patterns of benchmark names (default: all)"
+    )
+    run_parser.add_argument(
+        "--quick", action="store_true", help="Fewer iterations and smaller files"
+    )
+    run_parser.add_argument("--output", type=Path, help="Results file to write")
+    run_parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the baseline instead of comparing",
+    )
+    add_compare_options(run_parser)
+    run_parser.set_defaults(func=cmd_run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compare a results file with the baseline"
+    )
+    compare_parser.add_argument("results", type=Path, help="Results file")
+    add_compare_options(compare_parser)
+    compare_parser.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
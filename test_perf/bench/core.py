@@ -0,0 +1,260 @@
+"""Benchmark registry, timing, result files and baseline comparison."""
+
+import asyncio
+import fnmatch
+import inspect
+import json
+import math
+import platform
+import subprocess
+import time
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from statistics import mean, median, stdev
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[["Recorder"], Awaitable[None]]
+    description: str
+    requires: Sequence[str] = ()
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+# Checks for the resources benchmarks can require; each returns None when the
+# resource is usable, or the reason to skip
+REQUIREMENTS: Dict[str, Callable[[], Optional[str]]] = {}
+
+
+def benchmark(name: str, requires: Sequence[str] = ()):
+    """Register an async benchmark function taking a Recorder."""
+
+    def decorator(func):
+        description = (inspect.getdoc(func) or "").split("\n")[0]
+        BENCHMARKS[name] = Benchmark(name, func, description, tuple(requires))
+        return func
+
+    return decorator
+
+
+def requirement(name: str):
+    """Register the check of a resource named in `requires`."""
+
+    def decorator(func):
+        REQUIREMENTS[name] = func
+        return func
+
+    return decorator
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summary statistics of timing samples, in seconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    return {
+        "n": len(ordered),
+        "mean": mean(ordered),
+        "median": median(ordered),
+        "p95": p95,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "stdev": stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+class Recorder:
+    """Collects the timing samples of one benchmark, per metric.
+
+    In quick mode benchmarks should use `iterations()` to scale their loops
+    down, so a full suite run stays short enough for CI.
+    """
+
+    def __init__(self, quick: bool = False):
+        self.quick = quick
+        self.samples: Dict[str, List[float]] = {}
+
+    def iterations(self, full: int, quick: int) -> int:
+        return quick if self.quick else full
+
+    def add(self, metric: str, seconds: float) -> None:
+        self.samples.setdefault(metric, []).append(seconds)
+
+    async def measure(
+        self, metric: str, fn: Callable[[], Any], iterations: int, warmup: int = 1
+    ) -> None:
+        """Time `iterations` calls of fn, a function or coroutine function."""
+        for i in range(warmup + iterations):
+            start = time.perf_counter()
+            result = fn()
+            if inspect.isawaitable(result):
+                await result
+            elapsed = time.perf_counter() - start
+            if i >= warmup:
+                self.add(metric, elapsed)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        return {
+            metric: summarize(samples)
+            for metric, samples in self.samples.items()
+            if samples
+        }
+
+
+def select(patterns: Sequence[str]) -> List[Benchmark]:
+    """Benchmarks whose names match any of the glob patterns, or all."""
+    if not patterns:
+        return list(BENCHMARKS.values())
+    selected = [
+        bench
+        for bench in BENCHMARKS.values()
+        if any(fnmatch.fnmatch(bench.name, pattern) for pattern in patterns)
+    ]
+    if not selected:
+        raise ValueError(f"No benchmark matches {', '.join(patterns)}")
+    return selected
+
+
+async def run_benchmark(bench: Benchmark, quick: bool = False) -> Dict[str, Any]:
+    """Run one benchmark and return its result entry."""
+    for name in bench.requires:
+        reason = await asyncio.to_thread(REQUIREMENTS[name])
+        if reason:
+            return {"status": "skipped", "reason": reason}
+
+    recorder = Recorder(quick=quick)
+    started = time.perf_counter()
+    try:
+        await bench.func(recorder)
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+            "metrics": recorder.metrics(),
+        }
+    return {
+        "status": "ok",
+        "duration": time.perf_counter() - started,
+        "metrics": recorder.metrics(),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(
+    benchmarks: Sequence[Benchmark],
+    quick: bool = False,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run benchmarks one after another and return the results document."""
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "benchmarks": {},
+    }
+    for bench in benchmarks:
+        entry = await run_benchmark(bench, quick=quick)
+        results["benchmarks"][bench.name] = entry
+        if on_result:
+            on_result(bench.name, entry)
+    return results
+
+
+def save(results: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+
+def load(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+@dataclass
+class Comparison:
+    """Change of one metric statistic against the baseline."""
+
+    benchmark: str
+    metric: str
+    baseline: float
+    current: float
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else math.inf
+
+
+@dataclass
+class Report:
+    comparisons: List[Comparison] = field(default_factory=list)
+    # Benchmarks that ran in the baseline but failed now
+    failures: List[str] = field(default_factory=list)
+
+    @property
+    def regressions(self) -> List[Comparison]:
+        return [c for c in self.comparisons if c.regressed]
+
+    @property
+    def ok(self) -> bool:
+        return not self.regressions and not self.failures
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.2,
+    statistic: str = "median",
+    min_delta: float = 1e-4,
+) -> Report:
+    """
+    Compare results with a baseline; all metrics are times, lower is better.
+
+    Args:
+        results: Results document of the current run
+        baseline: Results document stored as the baseline
+        threshold: Allowed relative slowdown, 0.2 = 20%
+        statistic: Summary statistic compared, e.g. "median" or "p95"
+        min_delta: Slowdowns below this many seconds are never regressions,
+            so microsecond-scale metrics do not fail on timer noise
+
+    Returns:
+        Report of the metrics present in both, and of benchmarks that
+        failed although they ran in the baseline
+    """
+    report = Report()
+    current_benchmarks = results.get("benchmarks", {})
+    for name, base_entry in baseline.get("benchmarks", {}).items():
+        entry = current_benchmarks.get(name)
+        if base_entry.get("status") != "ok" or entry is None:
+            continue
+        if entry["status"] == "error":
+            report.failures.append(name)
+            continue
+        for metric, base_stats in base_entry["metrics"].items():
+            stats = entry.get("metrics", {}).get(metric)
+            if stats is None:
+                continue
+            before, after = base_stats[statistic], stats[statistic]
+            regressed = after > before * (1 + threshold) and after - before > min_delta
+            report.comparisons.append(
+                Comparison(name, metric, before, after, regressed)
+            )
+    return report
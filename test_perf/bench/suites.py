@@ -0,0 +1,245 @@
+"""The benchmarks of agent hot paths; all metrics are wall times in seconds."""
+
+import asyncio
+import tempfile
+
+import tiktoken
+
+from app.config import LLMSettings, MockLLMSettings
+from app.llm import LLM, TokenCounter
+from app.mock_llm import MockBackend, MockClient, MockScript
+
+from .core import Recorder, benchmark, requirement
+
+
+# Write sizes of test_perf/io/test_sandbox_io_perf.py; quick runs stop at 1 MB
+SIZES = [
+    1 * 1024,  # 1 KB
+    4 * 1024,  # 4 KB
+    8 * 1024,  # 8 KB
+    16 * 1024,  # 16 KB
+    32 * 1024,  # 32 KB
+    64 * 1024,  # 64 KB
+    128 * 1024,  # 128 KB
+    256 * 1024,  # 256 KB
+    512 * 1024,  # 512 KB
+    1 * 1024 * 1024,  # 1 MB
+    2 * 1024 * 1024,  # 2 MB
+    4 * 1024 * 1024,  # 4 MB
+    8 * 1024 * 1024,  # 8 MB
+    16 * 1024 * 1024,  # 16 MB
+    32 * 1024 * 1024,  # 32 MB
+    64 * 1024 * 1024,  # 64 MB
+    128 * 1024 * 1024,  # 128 MB
+    256 * 1024 * 1024,  # 256 MB
+]
+QUICK_MAX_SIZE = 1024 * 1024
+
+TERMINAL_COMMANDS = {
+    "true": "true",
+    "echo": "echo hello",
+    "mkdir": "mkdir -p /tmp/bash_latency",
+}
+
+
+def human_size(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / (1024*1024):.2f}MB"
+    if n >= 1024:
+        return f"{n / 1024:.2f}KB"
+    return f"{n}B"
+
+
+@requirement("docker")
+def docker_available():
+    try:
+        import docker
+
+        docker.from_env().ping()
+    except Exception as e:
+        return f"Docker is not available: {e}"
+    return None
+
+
+def _sandbox():
+    from app.config import SandboxSettings
+    from app.sandbox.core.sandbox import DockerSandbox
+
+    return DockerSandbox(SandboxSettings())
+
+
+@benchmark("sandbox.lifecycle", requires=["docker"])
+async def sandbox_lifecycle(recorder: Recorder):
+    """Create and clean up a Docker sandbox."""
+    for _ in range(recorder.iterations(5, 1)):
+        sandbox = _sandbox()
+        await recorder.measure("create", sandbox.create, 1, warmup=0)
+        await recorder.measure("cleanup", sandbox.cleanup, 1, warmup=0)
+
+
+@benchmark("sandbox.io", requires=["docker"])
+async def sandbox_io(recorder: Recorder):
+    """Write and read files of each size in a Docker sandbox."""
+    sizes = [s for s in SIZES if not recorder.quick or s <= QUICK_MAX_SIZE]
+    iterations = recorder.iterations(3, 1)
+    sandbox = _sandbox()
+    await sandbox.create()
+    try:
+        for size in sizes:
+            path = f"/tmp/bench_io_{size}.bin"
+            content = "A" * size
+            label = human_size(size)
+            await recorder.measure(
+                f"write_{label}", lambda: sandbox.write_file(path, content), iterations
+            )
+            await recorder.measure(
+                f"read_{label}", lambda: sandbox.read_file(path), iterations
+            )
+    finally:
+        await sandbox.cleanup()
+
+
+@benchmark("sandbox.terminal", requires=["docker"])
+async def sandbox_terminal(recorder: Recorder):
+    """Run short commands in the terminal of a Docker sandbox."""
+    iterations = recorder.iterations(50, 5)
+    sandbox = _sandbox()
+    await sandbox.create()
+    try:
+        for metric, command in TERMINAL_COMMANDS.items():
+            await recorder.measure(
+                metric, lambda: sandbox.run_command(command), iterations
+            )
+    finally:
+        await sandbox.cleanup()
+
+
+async def _stop_bash(bash) -> None:
+    if bash._session:
+        # closing stdin makes the shell exit on EOF
+        bash._session._process.stdin.close()
+        await bash._session._process.wait()
+
+
+@benchmark("terminal.latency")
+async def terminal_latency(recorder: Recorder):
+    """Run short commands through the local Bash tool."""
+    from app.tool.bash import Bash
+
+    iterations = recorder.iterations(100, 10)
+    bash = Bash()
+    try:
+        for metric, command in TERMINAL_COMMANDS.items():
+            await recorder.measure(metric, lambda: bash.execute(command), iterations)
+    finally:
+        await _stop_bash(bash)
+
+
+def _history():
+    from test_perf.test_message_format_perf import synthetic_history
+
+    return synthetic_history(count=100, observation_chars=2000)
+
+
+@benchmark("tokens.count")
+async def tokens_count(recorder: Recorder):
+    """Count the tokens of a 100-message agent history."""
+    iterations = recorder.iterations(200, 20)
+    encoding = tiktoken.get_encoding("cl100k_base")
+    messages = LLM.format_messages(_history())
+    plain = [dict(message) for message in messages]
+
+    counter = TokenCounter(encoding)
+    # As in an agent step: the history was counted before
+    await recorder.measure(
+        "count_cached", lambda: counter.count_message_tokens(messages), iterations
+    )
+    # Nothing counted before, as for a new agent or a restored history
+    await recorder.measure(
+        "count_cold",
+        lambda: TokenCounter(encoding).count_message_tokens(plain),
+        recorder.iterations(20, 3),
+    )
+
+
+@benchmark("messages.format")
+async def messages_format(recorder: Recorder):
+    """Format a 100-message agent history for a request."""
+    iterations = recorder.iterations(200, 20)
+    history = _history()
+    await recorder.measure("format", lambda: LLM.format_messages(history), iterations)
+    await recorder.measure(
+        "to_dict",
+        lambda: [message.to_dict() for message in history],
+        iterations,
+    )
+
+
+def mock_llm(name: str, steps: int, command: str, **timing) -> LLM:
+    """An LLM answered in-process: `steps` bash calls, then terminate."""
+    script = MockScript(
+        [
+            {"tool_calls": [{"name": "bash", "arguments": {"command": command}}]}
+            for _ in range(steps)
+        ],
+        mode="conversation",
+    )
+    settings = LLMSettings(
+        model="mock",
+        base_url="",
+        api_key="",
+        api_type="mock",
+        api_version="",
+    )
+    llm = LLM(config_name=name, llm_config={"default": settings})
+    llm.client = MockClient(MockBackend(script, MockLLMSettings(**timing)))
+    return llm
+
+
+async def _run_bash_agent(llm: LLM, steps: int) -> None:
+    from app.agent.toolcall import ToolCallAgent
+    from app.tool import Terminate, ToolCollection
+    from app.tool.bash import Bash
+
+    bash = Bash()
+    agent = ToolCallAgent(
+        llm=llm,
+        available_tools=ToolCollection(bash, Terminate()),
+        max_steps=steps + 2,
+    )
+    try:
+        await agent.run("Write the step files")
+    finally:
+        await _stop_bash(bash)
+
+
+@benchmark("agent.loop")
+async def agent_loop(recorder: Recorder):
+    """Run a ToolCallAgent for 10 bash steps against an instant mock LLM."""
+    steps = 10
+    with tempfile.TemporaryDirectory() as workdir:
+        llm = mock_llm("bench", steps, command=f"cd {workdir} && date > step.txt")
+        await recorder.measure(
+            "run", lambda: _run_bash_agent(llm, steps), recorder.iterations(5, 2)
+        )
+
+
+@benchmark("agent.concurrent")
+async def agent_concurrent(recorder: Recorder):
+    """Run 8 ToolCallAgents at once against a mock LLM with provider latency."""
+    steps, agents = 5, 8
+    with tempfile.TemporaryDirectory() as workdir:
+        llm = mock_llm(
+            "bench_concurrent",
+            steps,
+            command=f"cd {workdir} && date >> steps.txt",
+            first_token_latency=0.05,
+            tokens_per_second=500,
+        )
+        await recorder.measure(
+            "run",
+            lambda: asyncio.gather(
+                *(_run_bash_agent(llm, steps) for _ in range(agents))
+            ),
+            recorder.iterations(3, 1),
+        )
@@ -1,51 +1,62 @@
-import re
 import csv
+import json
+from collections import defaultdict
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import numpy as np
 
-# 输入日志文件
-LOG_FILE = "/home/zhangsiyi/AgenticAI/OpenManus/test_perf/io/20251021124312.log"
-CSV_FILE = "/home/zhangsiyi/AgenticAI/OpenManus/test_perf/io/sandbox_io_perf.csv"
-PLT_FILE = "/home/zhangsiyi/AgenticAI/OpenManus/test_perf/io/sandbox_perf_bar.png"
-PLT_STACKED = "/home/zhangsiyi/AgenticAI/OpenManus/test_perf/io/sandbox_perf_stacked.png"
-
-# 用于提取数据的正则
-pattern_size = re.compile(r"Testing write size ([\d.]+)([KMG]B)")
-pattern_times = {
-    "mkdir_time": re.compile(r"mkdir_time=([\d.]+)s"),
-    "tar_prep_time": re.compile(r"tar_prep_time=([\d.]+)s"),
-    "put_archive_time": re.compile(r"put_archive_time=([\d.]+)s"),
-    "total_time": re.compile(r"total_write_time=([\d.]+)s"),
+# 输入 trace 文件：运行 test_sandbox_io_perf.py 时设置 OPENMANUS_TRACE=<TRACE_FILE>
+IO_DIR = Path(__file__).resolve().parent
+TRACE_FILE = IO_DIR / "sandbox_io_trace.jsonl"
+CSV_FILE = IO_DIR / "sandbox_io_perf.csv"
+PLT_FILE = IO_DIR / "sandbox_perf_bar.png"
+PLT_STACKED = IO_DIR / "sandbox_perf_stacked.png"
+
+# write_file 各阶段对应的子 span
+STAGE_SPANS = {
+    "mkdir_time": "sandbox.run_command",
+    "tar_prep_time": "sandbox.tar",
+    "put_archive_time": "sandbox.put_archive",
 }
 
-def parse_log(filepath):
-    results = []
-    current = {}
 
-    def finalize():
-        if current and all(k in current for k in ["file_size", "mkdir_time", "tar_prep_time", "put_archive_time", "total_time"]):
-            results.append(current.copy())
+def human_size(n: int) -> str:
+    if n >= 1024 * 1024:
+        return f"{n / (1024*1024):.2f}MB"
+    if n >= 1024:
+        return f"{n / 1024:.2f}KB"
+    return f"{n}B"
+
 
+def parse_trace(filepath):
+    """Read the sandbox.write_file spans and their stage timings from a trace."""
+    spans = []
     with open(filepath, "r", encoding="utf-8") as f:
         for line in f:
-            # 检测新测试块开头
-            m_size = pattern_size.search(line)
-            if m_size:
-                # 保存上一个测试
-                finalize()
-                size_val, size_unit = m_size.groups()
-                current = {"file_size": f"{size_val}{size_unit}"}
-                continue
-
-            # 匹配各个阶段的时间
-            for key, ptn in pattern_times.items():
-                m = ptn.search(line)
-                if m:
-                    current[key] = float(m.group(1))
-                    break
-
-    # 保存最后一个
-    finalize()
+            if line.strip():
+                spans.append(json.loads(line))
+
+    children = defaultdict(list)
+    for span in spans:
+        if span["parent_id"]:
+            children[span["parent_id"]].append(span)
+
+    results = []
+    for span in spans:
+        if span["name"] != "sandbox.write_file" or span["error"]:
+            continue
+        row = {
+            "file_size": human_size(span["counters"].get("bytes_written", 0)),
+            "total_time": span["duration"],
+        }
+        for key, name in STAGE_SPANS.items():
+            row[key] = sum(
+                child["duration"]
+                for child in children[span["span_id"]]
+                if child["name"] == name
+            )
+        results.append(row)
     return results
 
 
@@ -111,7 +122,7 @@ def plot_data(data):
 
 
 if __name__ == "__main__":
-    data = parse_log(LOG_FILE)
+    data = parse_trace(TRACE_FILE)
     save_csv(data, CSV_FILE)
     plot_data(data)
     print("✅ 日志解析与可视化完成！")
@@ -3,7 +3,8 @@ import time
 import os
 import json
 import re
-from typing import Dict, Any
+from collections import defaultdict
+from typing import Dict, Any, Optional
 
 try:
     import psutil
@@ -11,6 +12,8 @@ except Exception:
     psutil = None
 
 OUTPUT_DIR = "test_perf/results"
+# LLM_MODE=mock 时用这里的脚本代替真实模型（见 [mock_llm]），没有脚本的任务跳过
+MOCK_SCRIPT_DIR = "test_perf/mock_scripts"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 TASKS = [
@@ -53,6 +56,28 @@ def parse_metrics_from_log(text: str) -> Dict[str, Any]:
     return metrics
 
 
+def summarize_trace(path: str) -> Dict[str, Any]:
+    """Per span name count and total seconds, plus the token totals of the runs."""
+    spans: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"count": 0, "total_time": 0.0})
+    runs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            stats = spans[record["name"]]
+            stats["count"] += 1
+            stats["total_time"] += record["duration"] or 0.0
+            if record["name"] == "agent.run":
+                runs.append(record["counters"])
+
+    token_usage: Dict[str, int] = defaultdict(int)
+    for counters in runs:
+        for key in ("input_tokens", "completion_tokens", "cached_input_tokens"):
+            token_usage[key] += counters.get(key, 0)
+    return {"spans": dict(spans), "token_usage": dict(token_usage)}
+
+
 def capture_process_snapshot(pid: int) -> Dict[str, Any]:
     if not psutil:
         return {}
@@ -67,10 +92,23 @@ def capture_process_snapshot(pid: int) -> Dict[str, Any]:
         return {}
 
 
-def run_prompt(prompt: str, timeout: int = 300) -> Dict[str, Any]:
+def run_prompt(
+    prompt: str,
+    timeout: int = 300,
+    trace_path: Optional[str] = None,
+    mock_script: Optional[str] = None,
+) -> Dict[str, Any]:
     # run main.py and provide prompt via stdin
+    env = dict(os.environ)
+    if mock_script:
+        env["OPENMANUS_MOCK_LLM"] = os.path.abspath(mock_script)
+    if trace_path:
+        # 每个任务单独写一个 trace 文件
+        if os.path.exists(trace_path):
+            os.remove(trace_path)
+        env["OPENMANUS_TRACE"] = os.path.abspath(trace_path)
     start = time.time()
-    proc = subprocess.run(["python", "main.py"], input=prompt, text=True, capture_output=True)
+    proc = subprocess.run(["python", "main.py"], input=prompt, text=True, capture_output=True, env=env)
     duration = time.time() - start
 
     stdout = proc.stdout or ""
@@ -82,6 +120,11 @@ def run_prompt(prompt: str, timeout: int = 300) -> Dict[str, Any]:
         "duration": duration,
         "returncode": proc.returncode,
     })
+    if trace_path and os.path.exists(trace_path):
+        trace = summarize_trace(trace_path)
+        metrics["spans"] = trace["spans"]
+        # 以 trace 中 agent.run 汇总的 token 为准
+        metrics["token_usage"] = trace["token_usage"]
 
     return {
         "stdout": stdout,
@@ -92,10 +135,21 @@ def run_prompt(prompt: str, timeout: int = 300) -> Dict[str, Any]:
 
 if __name__ == "__main__":
     mode = os.environ.get("TEST_MODE", "sandbox")  # user can set env to 'nosandbox' to indicate mode
+    llm_mode = os.environ.get("LLM_MODE", "live")  # 'mock' replays test_perf/mock_scripts offline
     for name, prompt in TASKS:
-        print(f"Running {name} (mode={mode})...")
-        res = run_prompt(prompt)
-        outname = f"{name}_{mode}"
+        mock_script = None
+        if llm_mode == "mock":
+            mock_script = os.path.join(MOCK_SCRIPT_DIR, name + ".jsonl")
+            if not os.path.exists(mock_script):
+                print(f"Skipping {name}: no mock script {mock_script}")
+                continue
+        print(f"Running {name} (mode={mode}, llm={llm_mode})...")
+        outname = f"{name}_{mode}" if llm_mode == "live" else f"{name}_{mode}_{llm_mode}"
+        res = run_prompt(
+            prompt,
+            trace_path=os.path.join(OUTPUT_DIR, outname + ".trace.jsonl"),
+            mock_script=mock_script,
+        )
         json_path = os.path.join(OUTPUT_DIR, outname + ".json")
         txt_path = os.path.join(OUTPUT_DIR, outname + ".txt")
         with open(json_path, "w") as f:
@@ -0,0 +1,49 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from statistics import mean, median
+
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.tool.bash import Bash
+
+
+ITERATIONS = 100
+COMMANDS = ["true", "echo hello", "mkdir -p /tmp/bash_latency"]
+
+
+async def measure(bash: Bash, command: str, iterations: int) -> list:
+    """Run a command repeatedly, returning wall times (s) and the last result's info."""
+    times = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        result = await bash.execute(command)
+        times.append(time.perf_counter() - t0)
+    return times, result.system
+
+
+async def main():
+    bash = Bash()
+    await bash.execute("true")  # start the shell outside the measurement
+
+    print(f"Bash tool latency: {ITERATIONS} runs per command\n")
+    for command in COMMANDS:
+        times, last_system = await measure(bash, command, ITERATIONS)
+        print(f"{command!r}")
+        print(f"  Total:   {sum(times):.3f}s")
+        print(f"  Average: {mean(times) * 1000:.2f}ms")
+        print(f"  Median:  {median(times) * 1000:.2f}ms")
+        print(f"  Max:     {max(times) * 1000:.2f}ms")
+        print(f"  Last run: {last_system}\n")
+
+    # closing stdin makes the shell exit on EOF
+    bash._session._process.stdin.close()
+    await bash._session._process.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Optional
+
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from bs4 import BeautifulSoup
+
+from app.utils.html_extractor import extract_text, extract_text_async
+
+
+MAX_CHARS = 10000
+
+
+def bs4_extract(html: str, max_chars: int = MAX_CHARS) -> Optional[str]:
+    """The previous WebContentFetcher extraction, kept for comparison."""
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup(["script", "style", "header", "footer", "nav"]):
+        script.extract()
+    text = soup.get_text(separator="\n", strip=True)
+    text = " ".join(text.split())
+    return text[:max_chars] if text else None
+
+
+def synthetic_corpus(count: int, seed: int = 0) -> List[str]:
+    """Generate pages resembling real articles: boilerplate plus long bodies."""
+    rng = random.Random(seed)
+    words = ["search", "agent", "python", "data", "model", "sandbox", "tool", "web"]
+    pages = []
+    for _ in range(count):
+        paragraphs = "".join(
+            f"<p>{' '.join(rng.choice(words) for _ in range(rng.randint(20, 120)))}"
+            f" <a href='#'>link</a></p>"
+            for _ in range(rng.randint(20, 400))
+        )
+        pages.append(
+            "<html><head><title>Page</title>"
+            f"<script>{'var x = 1;' * rng.randint(100, 2000)}</script>"
+            "<style>body { color: black; }</style></head><body>"
+            f"<nav>{'<a>menu</a>' * 50}</nav><header>Site</header>"
+            f"<div class='content'>{paragraphs}</div>"
+            "<footer>Copyright</footer></body></html>"
+        )
+    return pages
+
+
+def load_corpus(directory: Optional[str], count: int) -> List[str]:
+    if directory:
+        files = sorted(Path(directory).glob("**/*.htm*"))
+        return [f.read_text(encoding="utf-8", errors="replace") for f in files]
+    return synthetic_corpus(count)
+
+
+def measure(name: str, fn: Callable[[str, int], Optional[str]], pages: List[str]):
+    start = time.perf_counter()
+    for page in pages:
+        fn(page, MAX_CHARS)
+    elapsed = time.perf_counter() - start
+
+    peaks = []
+    for page in pages[:20]:
+        tracemalloc.start()
+        fn(page, MAX_CHARS)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    print(f"{name}")
+    print(f"  Throughput:       {len(pages) / elapsed:.1f} pages/s")
+    print(f"  Average Time:     {elapsed / len(pages) * 1000:.2f}ms")
+    print(f"  Peak Memory (avg):{sum(peaks) / len(peaks) / 1024:.1f}KB")
+    print()
+
+
+async def measure_pool(pages: List[str]):
+    await extract_text_async(pages[0])  # start the worker processes
+    start = time.perf_counter()
+    await asyncio.gather(*(extract_text_async(page) for page in pages))
+    elapsed = time.perf_counter() - start
+    print("lxml streaming (process pool, concurrent)")
+    print(f"  Throughput:       {len(pages) / elapsed:.1f} pages/s")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML extraction benchmark")
+    parser.add_argument("--corpus", help="Directory of saved .html pages")
+    parser.add_argument("--count", type=int, default=100, help="Synthetic pages")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, args.count)
+    total = sum(len(p) for p in pages)
+    print(f"Corpus: {len(pages)} pages, {total / 1024 / 1024:.2f}MB of HTML\n")
+
+    mismatches = sum(bs4_extract(p) != extract_text(p) for p in pages)
+    print(f"Pages whose extracted text differs from BeautifulSoup: {mismatches}\n")
+
+    measure("BeautifulSoup html.parser (previous)", bs4_extract, pages)
+    measure("lxml streaming (inline)", extract_text, pages)
+    asyncio.run(measure_pool(pages))
+
+
+if __name__ == "__main__":
+    main()
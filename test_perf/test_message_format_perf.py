@@ -0,0 +1,102 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import tiktoken
+
+from app.llm import LLM, TokenCounter
+from app.schema import ROLE_VALUES, Function, Message, ToolCall
+
+
+def synthetic_history(count: int, observation_chars: int, seed: int = 0):
+    """Build an agent history: a task, then tool calls and their observations."""
+    rng = random.Random(seed)
+    words = ["search", "agent", "python", "data", "model", "sandbox", "tool", "web"]
+
+    def text(chars: int) -> str:
+        out = []
+        while sum(len(w) + 1 for w in out) < chars:
+            out.append(rng.choice(words))
+        return " ".join(out)
+
+    messages = [Message.user_message("Collect and summarize the results")]
+    while len(messages) < count:
+        call_id = f"call_{len(messages)}"
+        call = ToolCall(
+            id=call_id,
+            function=Function(name="web_search", arguments='{"query": "python"}'),
+        )
+        messages.append(Message(role="assistant", content=text(200), tool_calls=[call]))
+        messages.append(
+            Message.tool_message(
+                text(observation_chars), name="web_search", tool_call_id=call_id
+            )
+        )
+    return messages[:count]
+
+
+def previous_format(messages: List[Message]) -> List[dict]:
+    """The previous LLM.format_messages for text messages, kept for comparison."""
+    formatted = []
+    for message in messages:
+        message = message._build_dict()
+        if "content" in message or "tool_calls" in message:
+            formatted.append(message)
+    for msg in formatted:
+        if msg["role"] not in ROLE_VALUES:
+            raise ValueError(f"Invalid role: {msg['role']}")
+    return formatted
+
+
+def measure(name: str, fn: Callable[[], object], steps: int):
+    fn()  # warm up caches, as after the first agent step
+    start = time.perf_counter()
+    for _ in range(steps):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name}")
+    print(f"  Average Time:     {elapsed / steps * 1000:.3f}ms per step")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Message format/count benchmark")
+    parser.add_argument("--messages", type=int, default=100, help="History length")
+    parser.add_argument(
+        "--observation-chars", type=int, default=2000, help="Size of tool outputs"
+    )
+    parser.add_argument("--steps", type=int, default=200, help="Agent steps")
+    args = parser.parse_args()
+
+    messages = synthetic_history(args.messages, args.observation_chars)
+    counter = TokenCounter(tiktoken.get_encoding("cl100k_base"))
+    print(
+        f"History: {len(messages)} messages, "
+        f"{counter.count_message_tokens(LLM.format_messages(messages))} tokens\n"
+    )
+    assert previous_format(messages) == LLM.format_messages(messages)
+
+    measure("format (previous)", lambda: previous_format(messages), args.steps)
+    measure("format (cached dicts)", lambda: LLM.format_messages(messages), args.steps)
+    measure(
+        "format + count (previous)",
+        lambda: counter.count_message_tokens(previous_format(messages)),
+        args.steps,
+    )
+    measure(
+        "format + count (cached dicts)",
+        lambda: counter.count_message_tokens(LLM.format_messages(messages)),
+        args.steps,
+    )
+
+
+if __name__ == "__main__":
+    main()
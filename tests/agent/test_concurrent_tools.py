@@ -0,0 +1,111 @@
+"""Tests for concurrent execution of tool calls in ToolCallAgent."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.schema import Function, ToolCall
+from app.tool import ToolCollection
+from app.tool.base import BaseTool
+from app.tool.str_replace_editor import StrReplaceEditor
+
+
+EVENTS = []
+
+
+class _SleepTool(BaseTool):
+    name: str = "sleep"
+    description: str = "Sleep, then echo the label."
+    parameters: dict = {"type": "object", "properties": {}}
+    concurrency_safe: bool = True
+
+    async def execute(self, label: str, delay: float = 0.05) -> str:
+        EVENTS.append(("start", label))
+        await asyncio.sleep(delay)
+        EVENTS.append(("end", label))
+        return label
+
+
+class _Editor(StrReplaceEditor):
+    async def execute(self, command: str, path: str, **kwargs) -> str:
+        EVENTS.append(("start", command))
+        await asyncio.sleep(0.01)
+        EVENTS.append(("end", command))
+        return command
+
+
+def _call(n: int, name: str, **arguments) -> ToolCall:
+    function = Function(name=name, arguments=json.dumps(arguments))
+    return ToolCall(id=f"call_{n}", function=function)
+
+
+def _agent(*calls: ToolCall, **kwargs) -> ToolCallAgent:
+    EVENTS.clear()
+    agent = ToolCallAgent(
+        available_tools=ToolCollection(_SleepTool(), _Editor()),
+        parallel_tool_calls=True,
+        **kwargs,
+    )
+    agent.tool_calls = list(calls)
+    return agent
+
+
+def _max_in_flight() -> int:
+    in_flight = peak = 0
+    for kind, _ in EVENTS:
+        in_flight += 1 if kind == "start" else -1
+        peak = max(peak, in_flight)
+    return peak
+
+
+@pytest.mark.asyncio
+async def test_results_are_recorded_in_call_order():
+    """Later calls finishing first do not reorder the tool messages."""
+    delays = [0.15, 0.1, 0.05, 0.0]
+    agent = _agent(
+        *(_call(n, "sleep", label=str(n), delay=d) for n, d in enumerate(delays))
+    )
+    await agent.act()
+
+    assert [label for kind, label in EVENTS if kind == "end"] == ["3", "2", "1", "0"]
+    assert [m.tool_call_id for m in agent.memory.messages] == [
+        "call_0",
+        "call_1",
+        "call_2",
+        "call_3",
+    ]
+    assert agent.memory.messages[0].content.endswith("\n0")
+
+
+@pytest.mark.asyncio
+async def test_parallelism_is_bounded():
+    agent = _agent(
+        *(_call(n, "sleep", label=str(n)) for n in range(6)),
+        max_parallel_tool_calls=2,
+    )
+    await agent.act()
+    assert _max_in_flight() == 2
+    assert len(agent.memory.messages) == 6
+
+
+@pytest.mark.asyncio
+async def test_unsafe_calls_are_barriers():
+    """An editing command waits for the calls before it, and blocks those after."""
+    agent = _agent(
+        _call(0, "sleep", label="a"),
+        _call(1, "sleep", label="b"),
+        _call(2, "str_replace_editor", command="create", path="/tmp/x"),
+        _call(3, "str_replace_editor", command="view", path="/tmp/x"),
+        _call(4, "sleep", label="c"),
+    )
+    await agent.act()
+
+    assert EVENTS[:2] == [("start", "a"), ("start", "b")]
+    assert EVENTS[4:6] == [("start", "create"), ("end", "create")]
+    # The read-only view runs alongside the following call
+    assert EVENTS[6:8] == [("start", "view"), ("start", "c")]
+    assert [m.tool_call_id for m in agent.memory.messages] == [
+        f"call_{n}" for n in range(5)
+    ]
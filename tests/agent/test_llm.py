@@ -0,0 +1,165 @@
+"""Tests for LLM token counting and request preparation."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.bedrock import ChatCompletions
+from app.llm import LLM, TokenCounter
+from app.tool import Terminate, ToolCollection
+
+
+class _Tokenizer:
+    """Whitespace tokenizer recording how much text was encoded."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text):
+        self.encoded.append(text)
+        return text.split()
+
+
+def _history():
+    call = {"id": "call_0", "type": "function"}
+    call["function"] = {"name": "bash", "arguments": '{"command": "ls"}'}
+    return [
+        {"role": "system", "content": "You are an agent"},
+        {"role": "user", "content": "List the files"},
+        {"role": "assistant", "content": "", "tool_calls": [call]},
+        {"role": "tool", "content": "a.txt b.txt", "tool_call_id": "call_0"},
+    ]
+
+
+def test_repeated_history_hits_the_message_cache():
+    """Each agent step only tokenizes the new and the edited messages."""
+    tokenizer = _Tokenizer()
+    counter = TokenCounter(tokenizer)
+    history = _history()
+    first = counter.count_message_tokens(history)
+    assert counter.cache_stats()["misses"] == 4
+
+    tokenizer.encoded.clear()
+    history.append({"role": "assistant", "content": "Two files"})
+    second = counter.count_message_tokens(history)
+    assert counter.cache_hits == 4 and counter.cache_misses == 5
+    assert tokenizer.encoded == ["assistant", "Two files"]
+    assert second - first == TokenCounter.BASE_MESSAGE_TOKENS + 3
+
+    history[1] = {**history[1], "content": "List all the files"}
+    assert counter.count_message_tokens(history) == second + 1
+    assert counter.cache_misses == 6
+    assert counter.count_message_tokens(history) == TokenCounter(
+        _Tokenizer()
+    ).count_message_tokens(history)
+
+
+def test_tool_schemas_are_counted_once():
+    tools = [
+        {"type": "function", "function": {"name": name, "parameters": {}}}
+        for name in ("bash", "terminate")
+    ]
+    counter = TokenCounter(_Tokenizer())
+    tokens = counter.count_tools(tools)
+    assert tokens > 0 and counter.count_tools(tools) == tokens
+    assert counter.cache_stats() == {
+        "hits": 2,
+        "misses": 2,
+        "message_entries": 0,
+        "tool_entries": 2,
+    }
+    assert counter.count_tools(None) == 0
+
+
+TOOLS = [
+    {"type": "function", "function": {"name": name, "parameters": {}}}
+    for name in ("bash", "terminate")
+]
+MESSAGES = [
+    {"role": "system", "content": "You are an agent"},
+    {"role": "system", "content": [{"type": "text", "text": "Be brief"}]},
+    {"role": "user", "content": "List the files"},
+]
+
+
+def _hints(api_type="openai", model="claude-3-7-sonnet", prompt_cache=True):
+    llm = SimpleNamespace(api_type=api_type, model=model, prompt_cache=prompt_cache)
+    return LLM.apply_cache_hints(llm, MESSAGES, TOOLS)
+
+
+def test_cache_breakpoint_ends_the_system_prompt():
+    """Claude models get cache_control on the last leading system part."""
+    messages, tools = _hints()
+    assert messages[0] is MESSAGES[0] and messages[2] is MESSAGES[2]
+    assert messages[1]["content"] == [
+        {"type": "text", "text": "Be brief", "cache_control": {"type": "ephemeral"}}
+    ]
+    # Tools and inputs are left untouched
+    assert tools is TOOLS
+    assert "cache_control" not in MESSAGES[1]["content"][0]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"model": "gpt-4o"},
+        {"prompt_cache": False},
+        {"api_type": "aws", "prompt_cache": False},
+    ],
+)
+def test_no_hints_without_explicit_caching(kwargs):
+    assert _hints(**kwargs) == (MESSAGES, TOOLS)
+
+
+def test_bedrock_cache_points_follow_system_prompt_and_tools():
+    messages, tools = _hints(api_type="aws", model="anthropic.claude-3-haiku")
+    assert tools[-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in TOOLS[-1] and tools[0] is TOOLS[0]
+
+    bedrock = ChatCompletions(client=None)
+    converted = bedrock._convert_openai_tools_to_bedrock_format(tools)
+    assert [next(iter(entry)) for entry in converted] == [
+        "toolSpec",
+        "toolSpec",
+        "cachePoint",
+    ]
+    system, _ = bedrock._convert_openai_messages_to_bedrock_format(messages)
+    assert system == [{"text": "Be brief"}, {"cachePoint": {"type": "default"}}]
+
+
+@pytest.mark.parametrize(
+    "usage, cached",
+    [
+        (None, 0),
+        ({"prompt_tokens_details": SimpleNamespace(cached_tokens=80)}, 80),
+        ({"prompt_tokens_details": None, "cache_read_input_tokens": 70}, 70),
+        ({"prompt_cache_hit_tokens": 60}, 60),
+        ({"prompt_tokens_details": SimpleNamespace(cached_tokens=None)}, 0),
+    ],
+)
+def test_cached_input_tokens_are_read_from_usage(usage, cached):
+    usage = SimpleNamespace(**usage) if usage is not None else None
+    assert LLM.cached_input_tokens(usage) == cached
+
+
+def test_cached_input_tokens_are_accumulated():
+    llm = SimpleNamespace(
+        total_input_tokens=0, total_completion_tokens=0, total_cached_input_tokens=0
+    )
+    LLM.update_token_count(llm, 100, 10, cached_tokens=80)
+    LLM.update_token_count(llm, 120, 5)
+    assert (llm.total_input_tokens, llm.total_cached_input_tokens) == (220, 80)
+
+
+def test_prompt_prefix_is_reused_until_it_changes():
+    """The same system message and tool schema objects are sent every step."""
+    agent = ToolCallAgent(
+        available_tools=ToolCollection(Terminate()), system_prompt="Be brief"
+    )
+    first = agent._prompt_prefix()
+    assert all(a is b for a, b in zip(first, agent._prompt_prefix()))
+
+    agent.system_prompt = "Be thorough"
+    system_msgs, tools, _ = agent._prompt_prefix()
+    assert system_msgs[0]["content"] == "Be thorough" and tools == first[1]
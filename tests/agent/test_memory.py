@@ -0,0 +1,148 @@
+"""Tests for the token-budgeted agent memory."""
+
+import base64
+from pathlib import Path
+
+import pytest
+
+from app.agent.base import _default_memory
+from app.config import MemorySettings, config
+from app.llm import LLM
+from app.schema import Memory, Message
+from app.utils.observation_store import ObservationStore
+
+
+def _tool_turn(call_id: str, output: str, base64_image: str = None) -> list:
+    call = {
+        "id": call_id,
+        "type": "function",
+        "function": {"name": "lookup", "arguments": "{}"},
+    }
+    return [
+        Message(role="assistant", content="", tool_calls=[call]),
+        Message.tool_message(
+            output, name="lookup", tool_call_id=call_id, base64_image=base64_image
+        ),
+    ]
+
+
+def _assert_no_orphans(memory: Memory):
+    call_ids = {
+        call.id for msg in memory.messages if msg.tool_calls for call in msg.tool_calls
+    }
+    for msg in memory.messages:
+        if msg.role == "tool":
+            assert msg.tool_call_id in call_ids
+
+
+def test_old_tool_outputs_are_elided_first(tmp_path):
+    """Over budget, old tool outputs shrink while recent ones stay intact."""
+    store = ObservationStore(tmp_path, max_chars=None)
+    memory = Memory(max_tokens=700, keep_recent=2, offloader=store.offload)
+    memory.add_message(Message.user_message("Find the answer"))
+    image = base64.b64encode(b"not really a jpeg").decode()
+    for i in range(3):
+        memory.add_messages(_tool_turn(f"call_{i}", "x" * 1000, image))
+
+    assert len(memory.messages) == 7
+    assert memory.total_tokens <= 700
+    assert memory.messages[2].content.startswith(Memory.ELIDED_PREFIX)
+    assert memory.messages[-1].content == "x" * 1000
+    # The offloaded screenshot of an elided output is not sent either
+    elided, recent = LLM.format_messages(
+        [memory.messages[2], memory.messages[-1]], supports_images=True
+    )
+    assert elided["content"] == memory.messages[2].content
+    assert recent["content"][1]["image_url"]["url"].endswith(image)
+
+
+def test_turns_are_dropped_whole_and_task_is_kept():
+    """Dropping never separates tool results from their tool calls."""
+    memory = Memory(max_messages=4)
+    memory.add_message(Message.user_message("Find the answer"))
+    for i in range(3):
+        memory.add_messages(_tool_turn(f"call_{i}", "result"))
+
+    assert memory.messages[0].content == "Find the answer"
+    assert [m.tool_call_id for m in memory.messages[1:]] == [None, "call_2"]
+    _assert_no_orphans(memory)
+
+
+@pytest.mark.asyncio
+async def test_summarize_replaces_older_turns():
+    """Older turns are replaced by one summary; recent turns are kept."""
+    memory = Memory(max_tokens=10_000, keep_recent=2, summarize_at=0.05)
+    memory.add_message(Message.user_message("Find the answer"))
+    for i in range(3):
+        memory.add_messages(_tool_turn(f"call_{i}", "y" * 1000))
+    assert memory.needs_summary
+
+    seen = []
+
+    async def summarizer(messages):
+        seen.extend(messages)
+        return "looked up twice"
+
+    assert await memory.summarize(summarizer)
+    assert len(seen) == 4
+    assert memory.messages[1].content.endswith("looked up twice")
+    assert [m.tool_call_id for m in memory.messages[2:]] == [None, "call_2"]
+    _assert_no_orphans(memory)
+
+
+def test_large_observation_is_offloaded_with_preview(tmp_path):
+    """Memory keeps a head/tail preview; the full output is in the workspace."""
+    store = ObservationStore(tmp_path, max_chars=100, head_chars=10, tail_chars=5)
+    memory = Memory(offloader=store.offload)
+    output = "HEAD" + "x" * 500 + "TAIL"
+    memory.add_messages(_tool_turn("call_0", output))
+
+    content = memory.messages[-1].content
+    assert len(content) < len(output)
+    assert content.split("\n")[1] == output[:10]
+    assert content.endswith(output[-5:])
+    (path,) = tmp_path.glob("*.txt")
+    assert str(path) in content
+    assert path.read_text() == output
+
+
+@pytest.mark.parametrize("use_sandbox", [False, True])
+def test_observations_stay_in_memory_with_sandbox(monkeypatch, use_sandbox):
+    """Sandboxed file tools cannot read host files, so nothing is spilled."""
+    settings = MemorySettings(offload_chars=100, offload_images=False)
+    monkeypatch.setattr(config._config, "memory_config", settings)
+    monkeypatch.setattr(config.sandbox, "use_sandbox", use_sandbox)
+    assert (_default_memory().offloader is None) == use_sandbox
+
+
+def test_images_are_loaded_only_when_sent(tmp_path):
+    """Offloaded images leave memory and are restored in formatted requests."""
+    store = ObservationStore(tmp_path)
+    memory = Memory(offloader=store.offload)
+    image = base64.b64encode(b"not really a jpeg").decode()
+    memory.add_message(Message.user_message("Screenshot:", base64_image=image))
+    memory.add_message(Message.user_message("Same again:", base64_image=image))
+
+    assert all(msg.base64_image is None for msg in memory.messages)
+    assert len(list(tmp_path.glob("*.jpg"))) == 1
+    assert Path(memory.messages[0].image_path).exists()
+
+    (sent,) = LLM.format_messages(memory.messages[:1], supports_images=True)
+    assert sent["content"][1]["image_url"]["url"].endswith(image)
+    (text_only,) = LLM.format_messages(memory.messages[:1])
+    assert text_only == {"role": "user", "content": "Screenshot:"}
+
+
+def test_cached_dict_is_shared_until_edited():
+    """Formatting reuses a read-only dict per message and rebuilds it on edit."""
+    message = Message.user_message("first")
+    (formatted,) = LLM.format_messages([message])
+    assert LLM.format_messages([message])[0] is formatted
+    with pytest.raises(TypeError):
+        formatted["content"] = "changed"
+
+    message.content = "second"
+    assert LLM.format_messages([message])[0]["content"] == "second"
+    copy = message.to_dict()
+    copy["content"] = "mutable"
+    assert message.cached_dict()["content"] == "second"
@@ -0,0 +1,168 @@
+"""Tests for streamed tool-call assembly and tool prefetching in ToolCallAgent."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+
+from app.agent.toolcall import ToolCallAgent
+from app.llm import LLM, StreamUsage, ToolCallStream
+from app.tool import Terminate, ToolCollection
+from app.tool.base import BaseTool
+
+
+def _chunk(content=None, tool_calls=None, usage=None) -> ChatCompletionChunk:
+    choices = [
+        {
+            "index": 0,
+            "delta": {"content": content, "tool_calls": tool_calls},
+            "finish_reason": None,
+        }
+    ]
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chunk",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "test",
+            "choices": [] if usage else choices,
+            "usage": usage,
+        }
+    )
+
+
+def _call_delta(index, arguments, call_id=None, name=None) -> dict:
+    delta = {"index": index, "function": {"arguments": arguments}}
+    if call_id:
+        delta.update(id=call_id, type="function")
+        delta["function"]["name"] = name
+    return delta
+
+
+async def _stream(events, log):
+    """Yield chunks, logging when each one is sent; floats are delays."""
+    for event in events:
+        if isinstance(event, float):
+            await asyncio.sleep(event)
+            continue
+        log.append(("chunk", time.monotonic()))
+        yield event
+
+
+def _two_call_events(delay: float = 0.0):
+    return [
+        _chunk(content="Searching"),
+        _chunk(tool_calls=[_call_delta(0, '{"query": ', "call_1", "lookup")]),
+        _chunk(tool_calls=[_call_delta(0, '"a"}')]),
+        delay,
+        _chunk(tool_calls=[_call_delta(1, '{"query"', "call_2", "lookup")]),
+        _chunk(tool_calls=[_call_delta(1, ': "b"}')]),
+    ]
+
+
+class _UsageLLM:
+    """Records token usage; counts one token per character."""
+
+    cached_input_tokens = staticmethod(LLM.cached_input_tokens)
+
+    def __init__(self):
+        self.recorded = []
+
+    def count_tokens(self, text: str) -> int:
+        return len(text)
+
+    def update_token_count(self, input_tokens, completion_tokens=0, cached_tokens=0):
+        self.recorded.append((input_tokens, completion_tokens, cached_tokens))
+
+
+class _LookupTool(BaseTool):
+    name: str = "lookup"
+    description: str = "Look something up."
+    parameters: dict = {"type": "object", "properties": {"query": {"type": "string"}}}
+    concurrency_safe: bool = True
+    started: list = []
+
+    async def execute(self, query: str) -> str:
+        self.started.append((query, time.monotonic()))
+        return f"found {query}"
+
+
+class _StreamingLLM:
+    def __init__(self, events):
+        self.events = events
+        self.log = []
+        self.token_counter = SimpleNamespace(count_tools=lambda tools: 0)
+
+    async def ask_tool_stream(self, **kwargs) -> ToolCallStream:
+        return ToolCallStream(_stream(self.events, self.log), time.perf_counter())
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_yielded_when_arguments_close():
+    """Each call is yielded as soon as its JSON closes; the message is complete."""
+    log = []
+    stream = ToolCallStream(_stream(_two_call_events(), log), time.perf_counter())
+
+    received = []
+    async for call in stream:
+        received.append((call.id, call.function.arguments, len(log)))
+
+    # The first call is complete after the third chunk, before call 2 starts
+    assert received == [
+        ("call_1", '{"query": "a"}', 3),
+        ("call_2", '{"query": "b"}', 5),
+    ]
+    assert stream.message.content == "Searching"
+    assert [c.id for c in stream.message.tool_calls] == ["call_1", "call_2"]
+    assert stream.ttft is not None
+    assert stream.time_to_first_tool_call >= stream.ttft
+
+
+@pytest.mark.asyncio
+async def test_stream_usage_is_taken_from_the_provider():
+    """Reported usage wins; without it the deltas are counted as they arrive."""
+    usage = {
+        "prompt_tokens": 120,
+        "completion_tokens": 9,
+        "total_tokens": 129,
+        "prompt_tokens_details": {"cached_tokens": 100},
+    }
+    llm = _UsageLLM()
+    events = _two_call_events() + [_chunk(usage=usage)]
+    async for _ in ToolCallStream(_stream(events, []), 0, StreamUsage(llm, 50)):
+        pass
+    assert llm.recorded == [(120, 9, 100)]
+
+    llm = _UsageLLM()
+    events = [_chunk(content="Hi"), _chunk(content=" there")]
+    async for _ in ToolCallStream(_stream(events, []), 0, StreamUsage(llm, 50)):
+        pass
+    assert llm.recorded == [(50, len("Hi there"), 0)]
+
+
+@pytest.mark.asyncio
+async def test_agent_starts_safe_tools_while_streaming():
+    """A concurrency-safe call starts before the model finishes the response."""
+    tool = _LookupTool(started=[])
+    llm = _StreamingLLM(_two_call_events(delay=0.2))
+    agent = ToolCallAgent(
+        available_tools=ToolCollection(tool, Terminate()),
+        stream_tool_calls=True,
+        next_step_prompt="",
+    )
+    agent.llm = llm
+
+    assert await agent.think()
+    last_chunk_at = llm.log[-1][1]
+    assert tool.started[0][0] == "a"
+    assert tool.started[0][1] < last_chunk_at
+
+    observations = await agent.act()
+    assert "found a" in observations and "found b" in observations
+    assert [q for q, _ in tool.started] == ["a", "b"]
+    assert [m.tool_call_id for m in agent.memory.messages[-2:]] == [
+        "call_1",
+        "call_2",
+    ]
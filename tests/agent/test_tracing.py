@@ -0,0 +1,97 @@
+"""Tests for the span tracer of agent runs."""
+
+import json
+
+import pytest
+
+from app.agent.react import ReActAgent
+from app.config import TracingSettings
+from app.tracing import NOOP_SPAN, tracer
+
+
+class _TracedAgent(ReActAgent):
+    name: str = "traced"
+
+    async def think(self) -> bool:
+        with tracer.span("llm.request") as span:
+            span.add(input_tokens=100, completion_tokens=10)
+        return True
+
+    async def act(self) -> str:
+        with tracer.span("tool.execute", tool="lookup") as span:
+            span.add(output_chars=42)
+        return "done"
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENMANUS_TRACE", raising=False)
+
+    def configure(format="jsonl"):
+        path = tmp_path / f"trace.{format}"
+        tracer.configure(TracingSettings(enabled=True, format=format, path=str(path)))
+        return path
+
+    yield configure
+    tracer.configure(TracingSettings())
+
+
+def _read(path):
+    tracer.close()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_run_spans_nest_and_sum_counters(trace_file):
+    """Spans form run -> step -> think/act -> request trees; counters roll up."""
+    path = trace_file()
+    await _TracedAgent(max_steps=2).run("go")
+
+    spans = {}
+    for record in _read(path):
+        spans.setdefault(record["name"], []).append(record)
+    run = spans["agent.run"][0]
+    assert run["attributes"] == {"agent": "traced", "steps": 2, "finished": False}
+    assert run["counters"] == {
+        "input_tokens": 200,
+        "completion_tokens": 20,
+        "output_chars": 84,
+    }
+
+    by_id = {r["span_id"]: r for records in spans.values() for r in records}
+    request = spans["llm.request"][0]
+    think = by_id[request["parent_id"]]
+    step = by_id[think["parent_id"]]
+    assert (think["name"], step["name"]) == ("agent.think", "agent.step")
+    assert step["parent_id"] == run["span_id"]
+    assert by_id[spans["tool.execute"][0]["parent_id"]]["name"] == "agent.act"
+    assert all(r["trace_id"] == run["trace_id"] for r in by_id.values())
+    assert run["duration"] >= step["duration"] >= think["duration"] >= 0
+
+
+def test_spans_export_as_otlp(trace_file):
+    path = trace_file("otlp")
+    with tracer.span("agent.run", agent="traced") as run:
+        with pytest.raises(ValueError):
+            with tracer.span("tool.execute"):
+                raise ValueError("bad input")
+        run.add(input_tokens=5)
+
+    child, parent = (
+        record["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        for record in _read(path)
+    )
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["status"] == {"code": 2, "message": "ValueError: bad input"}
+    assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+    assert {"key": "input_tokens", "value": {"intValue": "5"}} in parent["attributes"]
+    assert "parentSpanId" not in parent
+
+
+def test_disabled_tracer_is_a_noop(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENMANUS_TRACE", raising=False)
+    tracer.configure(TracingSettings(path=str(tmp_path / "trace.jsonl")))
+    with tracer.span("agent.run") as span:
+        span.add(input_tokens=1)
+        assert span is NOOP_SPAN and tracer.current() is NOOP_SPAN
+    assert not (tmp_path / "trace.jsonl").exists()
@@ -0,0 +1,66 @@
+"""Tests for the benchmark runner and the baseline regression check."""
+
+import json
+
+import pytest
+
+from test_perf.bench.__main__ import main
+from test_perf.bench.core import REQUIREMENTS, Benchmark, compare, load, run_benchmark
+
+
+def _results(**medians):
+    return {
+        "benchmarks": {
+            name: {"status": "ok", "metrics": {"run": {"median": value}}}
+            for name, value in medians.items()
+        }
+    }
+
+
+def test_only_slowdowns_beyond_threshold_regress():
+    baseline = _results(fast=0.0001, slow=0.100, steady=0.100, gone=0.1)
+    current = _results(fast=0.00015, slow=0.130, steady=0.110)
+
+    report = compare(current, baseline, threshold=0.2)
+    assert [(c.benchmark, c.regressed) for c in report.comparisons] == [
+        ("fast", False),  # +50%, but within the noise floor
+        ("slow", True),
+        ("steady", False),
+    ]
+    assert report.regressions[0].change == pytest.approx(0.3)
+    assert not report.ok
+
+
+def test_failed_benchmarks_fail_the_check():
+    current = _results()
+    current["benchmarks"]["slow"] = {"status": "error", "error": "boom"}
+    report = compare(current, _results(slow=0.1))
+    assert report.failures == ["slow"] and not report.ok
+
+
+@pytest.mark.asyncio
+async def test_benchmarks_record_metrics_or_skip(monkeypatch):
+    async def bench(recorder):
+        await recorder.measure("noop", lambda: None, recorder.iterations(50, 3))
+
+    entry = await run_benchmark(Benchmark("noop", bench, ""), quick=True)
+    assert entry["status"] == "ok"
+    assert entry["metrics"]["noop"]["n"] == 3
+
+    monkeypatch.setitem(REQUIREMENTS, "missing", lambda: "not here")
+    entry = await run_benchmark(Benchmark("x", bench, "", ("missing",)))
+    assert entry == {"status": "skipped", "reason": "not here"}
+
+
+def test_cli_fails_on_regression(tmp_path):
+    baseline, results = tmp_path / "baseline.json", tmp_path / "results.json"
+    args = ["messages.format", "--quick", "--baseline", str(baseline)]
+
+    assert main(["run", *args, "--output", str(results), "--save-baseline"]) == 0
+    stored = load(baseline)
+    assert stored["benchmarks"]["messages.format"]["status"] == "ok"
+
+    stored["benchmarks"]["messages.format"]["metrics"]["format"]["median"] = 1e-9
+    baseline.write_text(json.dumps(stored))
+    assert main(["run", *args, "--output", str(results), "--min-delta", "0"]) == 1
+    assert main(["compare", str(results), "--baseline", str(results)]) == 0
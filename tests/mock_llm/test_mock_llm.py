@@ -0,0 +1,106 @@
+"""Tests for the scripted mock LLM backend and its OpenAI-compatible server."""
+
+import json
+import time
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionMessage
+
+from app.config import MockLLMSettings
+from app.llm import StreamUsage, ToolCallStream
+from app.mock_llm import MockBackend, MockScript, ResponseRecorder
+from app.mock_llm.server import create_app
+
+
+TOOLS = [
+    {"type": "function", "function": {"name": name, "parameters": {}}}
+    for name in ("bash", "terminate")
+]
+USER = [{"role": "user", "content": "List the files"}]
+
+
+@pytest.mark.asyncio
+async def test_script_replays_recorded_and_scripted_steps(tmp_path):
+    """Recordings and shorthand steps replay in order, then terminate is called."""
+    recorded = ChatCompletionMessage.model_validate(
+        {
+            "role": "assistant",
+            "content": "Looking",
+            "tool_calls": [
+                {
+                    "id": "call_a",
+                    "type": "function",
+                    "function": {"name": "bash", "arguments": '{"command": "ls"}'},
+                }
+            ],
+        }
+    )
+    path = tmp_path / "script.jsonl"
+    ResponseRecorder(path).record(recorded)
+    with path.open("a") as f:
+        f.write("# scripted\n")
+        f.write(
+            '{"tool_calls": [{"name": "bash", "arguments": {"command": "cat {workspace}/a"}}]}\n'
+        )
+    script = MockScript.load(path, variables={"workspace": "/work"})
+    backend = MockBackend(script)
+
+    first = await backend.create(messages=USER, tools=TOOLS)
+    assert first.choices[0].message == recorded
+    # Requests without tools get text and leave the tool steps alone
+    summary = await backend.create(messages=USER)
+    assert summary.choices[0].message.content == MockBackend.DEFAULT_REPLY
+    second = await backend.create(messages=USER, tools=TOOLS)
+    call = second.choices[0].message.tool_calls[0]
+    assert json.loads(call.function.arguments) == {"command": "cat /work/a"}
+    last = await backend.create(messages=USER, tools=TOOLS)
+    assert last.choices[0].message.tool_calls[0].function.name == "terminate"
+    assert last.usage.prompt_tokens > 0 and last.usage.completion_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_server_streams_with_simulated_latency():
+    """The HTTP server works with the OpenAI client, streamed or not."""
+    script = MockScript(
+        [{"content": "Listing", "tool_calls": [{"name": "bash", "arguments": {}}]}],
+        mode="conversation",
+    )
+    backend = MockBackend(script, MockLLMSettings(first_token_latency=0.05))
+    transport = httpx.ASGITransport(app=create_app(backend))
+    client = AsyncOpenAI(
+        api_key="mock",
+        base_url="http://mock/v1",
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+
+    started = time.perf_counter()
+    response = await client.chat.completions.create(
+        model="mock", messages=USER, tools=TOOLS
+    )
+    assert time.perf_counter() - started >= 0.05
+    assert response.choices[0].message.tool_calls[0].function.name == "bash"
+
+    recorded = []
+
+    class _LLM:
+        cached_input_tokens = staticmethod(lambda usage: 0)
+        count_tokens = staticmethod(len)
+
+        def update_token_count(self, *tokens):
+            recorded.append(tokens)
+
+    chunks = await client.chat.completions.create(
+        model="mock",
+        messages=USER,
+        tools=TOOLS,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    stream = ToolCallStream(chunks, started, StreamUsage(_LLM(), 0))
+    calls = [call.function.name async for call in stream]
+    assert calls == ["bash"] and stream.message.content == "Listing"
+    assert recorded == [
+        (response.usage.prompt_tokens, response.usage.completion_tokens, 0)
+    ]
@@ -0,0 +1,89 @@
+"""Latency microbenchmark for short commands run through AsyncDockerizedTerminal."""
+
+import statistics
+import time
+
+import docker
+import pytest
+import pytest_asyncio
+
+from app.sandbox.core.terminal import AsyncDockerizedTerminal
+
+
+ITERATIONS = 50
+
+
+@pytest.fixture(scope="module")
+def docker_client():
+    """Fixture providing a Docker client."""
+    return docker.from_env()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def docker_container(docker_client):
+    """Fixture providing a test Docker container."""
+    container = docker_client.containers.run(
+        "python:3.12-slim",
+        "tail -f /dev/null",
+        name="test_latency_container",
+        detach=True,
+        remove=True,
+    )
+    yield container
+    container.stop()
+
+
+@pytest_asyncio.fixture
+async def terminal(docker_container):
+    """Fixture providing an initialized AsyncDockerizedTerminal instance."""
+    terminal = AsyncDockerizedTerminal(docker_container, working_dir="/workspace")
+    await terminal.init()
+    yield terminal
+    await terminal.close()
+
+
+async def measure(terminal: AsyncDockerizedTerminal, command: str) -> list:
+    """Runs a command repeatedly and returns per-call latencies in milliseconds."""
+    # Warm up the session before timing
+    await terminal.run_command(command)
+
+    latencies = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        await terminal.run_command(command)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(command: str, latencies: list) -> None:
+    """Prints latency percentiles for a command."""
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"\n{command!r}: n={len(ordered)} "
+        f"p50={statistics.median(ordered):.2f}ms p95={p95:.2f}ms "
+        f"max={ordered[-1]:.2f}ms"
+    )
+
+
+class TestTerminalLatency:
+    """Latency checks for the event-driven terminal session."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("command", ["true", "mkdir -p /workspace/bench"])
+    async def test_short_command_latency(self, terminal, command):
+        """Short commands should return well below the old 100 ms poll interval."""
+        latencies = await measure(terminal, command)
+        report(command, latencies)
+        assert statistics.median(latencies) < 50
+
+    @pytest.mark.asyncio
+    async def test_exit_code_and_output(self, terminal):
+        """Output is returned intact and the exit status is recorded."""
+        result = await terminal.run_command("echo 42; false")
+        assert result == "42"
+        assert terminal.session.last_exit_code == 1
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", "-s", __file__])
@@ -1,6 +1,7 @@
 import pytest
 import pytest_asyncio
 
+from app.sandbox.core.exceptions import SandboxTimeoutError
 from app.sandbox.core.sandbox import DockerSandbox, SandboxSettings
 
 
@@ -46,6 +47,41 @@ async def test_sandbox_file_operations(sandbox):
     assert content.strip() == test_content
 
 
+@pytest.mark.asyncio
+async def test_sandbox_batch_file_operations(sandbox, monkeypatch):
+    """Tests batched multi-file write/read operations."""
+    files = {
+        f"/workspace/batch/dir{i % 3}/file{i}.txt": f"content {i}" for i in range(20)
+    }
+    await sandbox.write_files(files)
+
+    # Files are visible to regular commands
+    result = await sandbox.run_command("ls /workspace/batch/dir1")
+    assert "file1.txt" in result
+
+    contents = await sandbox.read_files(list(files))
+    assert contents == files
+
+    # Files spread over the work directory are read from one archive of it
+    spread = {"/workspace/top.txt": "top", "/workspace/batch/dir2/file2.txt": "deep"}
+    await sandbox.write_files(spread)
+    archived = []
+    get_archive = sandbox.container.get_archive
+
+    def recording_get_archive(path):
+        archived.append(path)
+        return get_archive(path)
+
+    monkeypatch.setattr(sandbox.container, "get_archive", recording_get_archive)
+    assert await sandbox.read_files(list(spread)) == spread
+    assert archived == ["/workspace"]
+
+    with pytest.raises(FileNotFoundError):
+        await sandbox.read_files(
+            ["/workspace/batch/dir0/file0.txt", "/workspace/batch/missing.txt"]
+        )
+
+
 @pytest.mark.asyncio
 async def test_sandbox_python_execution(sandbox):
     """Tests Python code execution in sandbox."""
@@ -66,6 +102,26 @@ with open('/workspace/test.txt') as f:
     assert "Hello from file!" in result
 
 
+@pytest.mark.asyncio
+async def test_sandbox_python_kernel(sandbox):
+    """Tests the persistent in-container Python interpreter."""
+    output, success = await sandbox.run_python("x = 41\nprint('ready')")
+    assert success and output.strip() == "ready"
+
+    # State is kept between calls
+    output, success = await sandbox.run_python("print(x + 1)")
+    assert success and output.strip() == "42"
+
+    output, success = await sandbox.run_python("1 / 0")
+    assert not success and "ZeroDivisionError" in output
+
+    # A timed-out run is interrupted without losing the namespace
+    with pytest.raises(SandboxTimeoutError):
+        await sandbox.run_python("import time\nwhile True: time.sleep(0.1)", 1)
+    output, _ = await sandbox.run_python("print(x)")
+    assert output.strip() == "41"
+
+
 @pytest.mark.asyncio
 async def test_sandbox_file_persistence(sandbox):
     """Tests file persistence in sandbox."""
@@ -137,6 +193,29 @@ async def test_sandbox_cleanup(sandbox_config):
     assert not any(c.id == container_id for c in containers)
 
 
+@pytest.mark.asyncio
+async def test_extract_from_tar_streams_until_found():
+    """Archive chunks are consumed only until the requested files were found."""
+    files = {f"batch/file{i}.txt": b"x" * 4096 for i in range(64)}
+    archive = (await DockerSandbox._create_multi_tar_stream(files)).getvalue()
+    consumed = []
+
+    def chunks():
+        for start in range(0, len(archive), 8192):
+            consumed.append(start)
+            yield archive[start : start + 8192]
+
+    found, complete = DockerSandbox._extract_from_tar(chunks(), {"batch/file1.txt"})
+    assert found == {"batch/file1.txt": b"x" * 4096} and complete
+    assert len(consumed) < len(archive) // 8192 // 4
+
+    # Past the limit the archive is given up, and callers read files separately
+    found, complete = DockerSandbox._extract_from_tar(
+        chunks(), {"batch/file63.txt"}, limit=64 * 1024
+    )
+    assert found == {} and not complete
+
+
 @pytest.mark.asyncio
 async def test_sandbox_error_handling():
     """Tests error handling with invalid configuration."""
@@ -134,5 +134,35 @@ async def test_manager_cleanup(manager):
     assert not manager._last_used
 
 
+@pytest.mark.asyncio
+async def test_warm_pool_hit_and_recycle():
+    """Tests handing out and recycling pre-started sandboxes."""
+    manager = SandboxManager(max_sandboxes=2, pool_min_size=1, pool_max_size=2)
+    try:
+        assert await manager.warm_pool() == 1
+
+        sandbox_id = await manager.create_sandbox()
+        stats = manager.get_stats()["pool"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 0
+
+        sandbox = await manager.get_sandbox(sandbox_id)
+        await sandbox.write_file("/workspace/leftover.txt", "data")
+
+        await manager.release_sandbox(sandbox_id)
+        assert sandbox_id not in manager._sandboxes
+        assert manager.get_stats()["pool"]["recycled"] == 1
+
+        # Recycled sandboxes must come back clean
+        sandbox_id = await manager.create_sandbox()
+        sandbox = await manager.get_sandbox(sandbox_id)
+        result = await sandbox.run_command("ls /workspace")
+        assert "leftover.txt" not in result
+    finally:
+        await manager.cleanup()
+
+    assert sum(manager.get_stats()["pool"]["ready"].values()) == 0
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
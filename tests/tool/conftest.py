@@ -0,0 +1,16 @@
+import pytest
+
+from app.tool import web_search
+from app.utils.sqlite_cache import SQLiteCache
+
+
+@pytest.fixture(autouse=True)
+def caches(tmp_path, monkeypatch):
+    """Fixture routing the WebSearch caches to a temporary database, so tests
+    never touch the project's .cache directory."""
+    caches = {
+        "search": SQLiteCache(tmp_path / "cache.sqlite3", "search_cache", ttl=60),
+        "page": SQLiteCache(tmp_path / "cache.sqlite3", "page_cache", ttl=60),
+    }
+    monkeypatch.setattr(web_search, "_caches", caches)
+    return caches
@@ -0,0 +1,24 @@
+"""Tests for the sentinel-driven reads of the Bash tool."""
+
+import pytest
+
+from app.tool.bash import Bash
+
+
+@pytest.mark.asyncio
+async def test_result_reports_exit_code_and_wall_time():
+    bash = Bash()
+    result = await bash.execute("echo hello")
+    assert result.output == "hello"
+    assert result.system.startswith("exit code 0, wall time ")
+
+    result = await bash.execute("echo oops >&2; false")
+    assert result.error == "oops"
+    assert result.system.startswith("exit code 1, wall time ")
+    assert bash._session.last_wall_time < 5
+
+    # Output past the capture limit keeps its tail
+    bash._session._max_output_bytes = 16
+    result = await bash.execute("seq 1000")
+    assert result.output.startswith("[... ") and result.output.endswith("\n1000")
+    bash._session.stop()
@@ -0,0 +1,74 @@
+"""Tests for concurrent crawling and the warm browser of Crawl4aiTool."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.tool.crawl4ai import Crawl4aiTool
+
+
+class _FakeCrawler:
+    """Stands in for AsyncWebCrawler; pages take the delay in their URL."""
+
+    def __init__(self):
+        self.ready = True
+        self.closed = False
+
+    async def arun(self, url, config):
+        await asyncio.sleep(float(url.rsplit("/", 1)[1]))
+        return SimpleNamespace(
+            success=True,
+            markdown=f"page {url}",
+            metadata={"title": url},
+            links=None,
+            media=None,
+            status_code=200,
+        )
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeCrawlerTool(Crawl4aiTool):
+    async def _start_crawler(self) -> None:
+        self._crawler = _FakeCrawler()
+        self.crawler_stats.starts += 1
+
+
+@pytest.mark.asyncio
+async def test_results_stream_as_completed_and_report_in_input_order():
+    tool = _FakeCrawlerTool()
+    urls = [f"https://site{n}.test/{delay}" for n, delay in enumerate([0.1, 0.05, 0])]
+
+    streamed = [index async for index, _ in tool.crawl_stream(urls)]
+    assert streamed == [2, 1, 0]
+
+    result = await tool.execute(urls=urls)
+    lines = result.output.splitlines()
+    assert [line for line in lines if line[:2] in ("1.", "2.", "3.")] == [
+        f"{n}. {url}" for n, url in enumerate(urls, 1)
+    ]
+    await tool.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_browser_is_reused_closed_when_idle_and_restarted():
+    tool = _FakeCrawlerTool(idle_timeout=0.05)
+    await tool.execute(urls=["https://a.test/0"])
+    first = tool._crawler
+    await tool.execute(urls=["https://a.test/0"])
+    assert tool._crawler is first
+    assert (tool.crawler_stats.starts, tool.crawler_stats.reused_calls) == (1, 1)
+
+    await asyncio.sleep(0.1)
+    assert first.closed and tool._crawler is None
+    await tool.execute(urls=["https://a.test/0"])
+    assert tool.crawler_stats.starts == 2
+
+    # A browser that died between calls is replaced
+    tool._crawler.ready = False
+    await tool.execute(urls=["https://a.test/0"])
+    assert tool._crawler.ready
+    assert (tool.crawler_stats.starts, tool.crawler_stats.restarts) == (3, 1)
+    await tool.cleanup()
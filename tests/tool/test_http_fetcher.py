@@ -0,0 +1,118 @@
+"""Tests for the pooled HttpFetcher against a local HTTP stand-in server."""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import pytest_asyncio
+
+from app.tool.web_search import WebContentFetcher
+from app.utils.http_fetcher import HttpFetcher
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        stats = self.server.stats
+        with stats["lock"]:
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path.startswith("/big"):
+                body = b"x" * 100_000
+            elif self.path.startswith("/page"):
+                body = (
+                    b"<html><head><script>var a = 1;</script></head>"
+                    b"<body><nav>menu</nav><p>Hello   stand-in</p></body></html>"
+                )
+            else:
+                body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with stats["lock"]:
+                stats["in_flight"] -= 1
+
+    def setup(self):
+        super().setup()
+        with self.server.stats["lock"]:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Fixture providing a local HTTP server with request statistics."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    httpd.daemon_threads = True
+    httpd.stats = {
+        "lock": threading.Lock(),
+        "connections": 0,
+        "in_flight": 0,
+        "max_in_flight": 0,
+    }
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+@pytest.fixture
+def base_url(server):
+    """Fixture providing the server URL with fresh statistics."""
+    server.stats.update(connections=0, in_flight=0, max_in_flight=0)
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest_asyncio.fixture
+async def fetcher():
+    """Fixture providing a fetcher that is closed after the test."""
+    fetcher = HttpFetcher(max_connections_per_host=2, max_bytes=10_000)
+    yield fetcher
+    await fetcher.aclose()
+
+
+@pytest.mark.asyncio
+async def test_connections_are_reused(fetcher, server, base_url):
+    """Sequential requests to one host share a keep-alive connection."""
+    for _ in range(5):
+        response = await fetcher.fetch(f"{base_url}/")
+        assert response.status_code == 200
+        assert response.text == "ok"
+    assert server.stats["connections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_body_is_cut_at_byte_limit(fetcher, base_url):
+    """Large bodies are truncated to max_bytes."""
+    response = await fetcher.fetch(f"{base_url}/big")
+    assert response.truncated
+    assert len(response.text) == 10_000
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit(fetcher, server, base_url):
+    """No more than max_connections_per_host requests run against one host."""
+    await asyncio.gather(*(fetcher.fetch(f"{base_url}/slow") for _ in range(6)))
+    assert server.stats["max_in_flight"] == 2
+
+
+@pytest.mark.asyncio
+async def test_web_content_fetcher_extracts_text(base_url):
+    """WebContentFetcher returns the page text without scripts or navigation."""
+    content = await WebContentFetcher.fetch_content(f"{base_url}/page")
+    assert content == "Hello stand-in"
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
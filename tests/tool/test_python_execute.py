@@ -0,0 +1,83 @@
+"""Tests for the warm worker pool behind PythonExecute."""
+
+import pytest
+
+import app.tool.python_execute as python_execute
+from app.config import config
+from app.tool.python_execute import PythonExecute, _PythonWorkerPool
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = _PythonWorkerPool(size=1)
+    monkeypatch.setattr(python_execute, "_WORKER_POOL", pool)
+    monkeypatch.setattr(config.sandbox, "use_sandbox", False)
+    yield pool
+    for worker in [*pool._idle, *pool._pinned.values()]:
+        worker.kill()
+
+
+def test_timed_out_worker_is_killed_and_replaced(pool):
+    worker = pool._idle[0]
+    result = pool.run("while True: pass", timeout=1)
+    assert result == {
+        "observation": "Execution timeout after 1 seconds",
+        "success": False,
+    }
+    assert not worker.is_alive()
+    assert len(pool._idle) == 1 and pool._idle[0] is not worker
+
+    assert pool.run("print(1 + 1)", timeout=30) == {
+        "observation": "2\n",
+        "success": True,
+    }
+
+
+@pytest.mark.parametrize("namespace", [None, "ns"])
+def test_exited_worker_is_replaced(pool, namespace):
+    """exit() only ends the snippet; a worker that dies is not reused."""
+    assert pool.run("x = 1", timeout=30, namespace=namespace)["success"]
+    assert pool.run("print('bye'); exit(3)", timeout=30, namespace=namespace) == {
+        "observation": "bye\nSystemExit: 3",
+        "success": False,
+    }
+    assert pool.run("exit()", timeout=30, namespace=namespace)["success"]
+    if namespace:
+        assert pool.run("print(x)", timeout=30, namespace=namespace)["success"]
+
+    result = pool.run("import os; os._exit(1)", timeout=30, namespace=namespace)
+    assert result["observation"].startswith("Python worker exited")
+    assert pool._pinned == {}
+    assert all(worker.is_alive() for worker in pool._idle)
+    assert pool.run("print(1)", timeout=30, namespace=namespace) == {
+        "observation": "1\n",
+        "success": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_persistent_namespace_is_pinned_until_cleanup(pool):
+    tool = PythonExecute(persistent_namespace=True)
+    assert (await tool.execute("x = 41", timeout=30))["success"]
+    assert await tool.execute("print(x + 1)", timeout=30) == {
+        "observation": "42\n",
+        "success": True,
+    }
+    worker = pool._pinned[tool._namespace_id]
+    # The pinned worker was replaced in the pool, and others get a fresh namespace
+    assert len(pool._idle) == 1 and pool._idle[0] is not worker
+    result = await PythonExecute().execute("print('x' in dir())", timeout=30)
+    assert result["observation"] == "False\n"
+
+    await tool.cleanup()
+    assert pool._pinned == {} and not worker.is_alive()
+
+
+def test_timeout_resets_persistent_namespace(pool):
+    assert pool.run("x = 1", timeout=30, namespace="ns")["success"]
+    result = pool.run("while True: pass", timeout=1, namespace="ns")
+    assert result["observation"].endswith("the persistent namespace was reset")
+    assert pool.run("print('x' in dir())", timeout=30, namespace="ns") == {
+        "observation": "False\n",
+        "success": True,
+    }
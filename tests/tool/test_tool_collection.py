@@ -0,0 +1,65 @@
+"""Tests for the cached tool schemas of ToolCollection."""
+
+from app.tool.base import BaseTool
+from app.tool.tool_collection import ToolCollection
+
+
+class _CountingTool(BaseTool):
+    description: str = "A tool that counts schema builds."
+    builds: int = 0
+
+    async def execute(self) -> str:
+        return self.name
+
+    def to_param(self) -> dict:
+        self.builds += 1
+        return super().to_param()
+
+
+class _Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def count_tools(self, tools):
+        self.calls += 1
+        return 10 * len(tools)
+
+
+def test_params_are_built_once_until_tools_change():
+    """Schemas are reused across calls and rebuilt after add_tool."""
+    first, second = _CountingTool(name="first"), _CountingTool(name="second")
+    collection = ToolCollection(first)
+    assert collection.to_params() == collection.to_params()
+    assert first.builds == 1
+
+    version = collection.version
+    collection.add_tool(second)
+    assert collection.version > version
+    assert [p["function"]["name"] for p in collection.to_params()] == [
+        "first",
+        "second",
+    ]
+    assert (first.builds, second.builds) == (2, 1)
+
+
+def test_direct_tools_assignment_invalidates():
+    """MCPClients-style reassignment of `tools` drops the cached schemas."""
+    collection = ToolCollection(_CountingTool(name="first"))
+    collection.to_params()
+    replacement = _CountingTool(name="replacement")
+    collection.tool_map = {replacement.name: replacement}
+    collection.tools = tuple(collection.tool_map.values())
+    assert [p["function"]["name"] for p in collection.to_params()] == ["replacement"]
+
+
+def test_subset_and_token_cost():
+    """Subsets keep collection order and token costs are counted once."""
+    collection = ToolCollection(*(_CountingTool(name=n) for n in ("a", "b", "c")))
+    counter = _Counter()
+    subset = collection.to_params(["c", "a"])
+    assert [p["function"]["name"] for p in subset] == ["a", "c"]
+
+    assert collection.token_cost(counter, ["c", "a"]) == 20
+    assert collection.token_cost(counter) == 30
+    assert collection.token_cost(counter) == 30
+    assert counter.calls == 3
@@ -0,0 +1,72 @@
+"""Tests for BM25 tool routing over large tool collections."""
+
+from types import SimpleNamespace
+
+from app.agent.toolcall import ToolCallAgent
+from app.schema import Message
+from app.tool import Terminate
+from app.tool.base import BaseTool
+from app.tool.tool_collection import ToolCollection
+from app.tool.tool_router import ToolRouter, tokenize
+
+
+class _McpLikeTool(BaseTool):
+    async def execute(self, **kwargs) -> str:
+        return self.name
+
+
+def _catalog() -> ToolCollection:
+    specs = {
+        "mcp_github_createIssue": "Create a new issue in a GitHub repository",
+        "mcp_github_listPullRequests": "List open pull requests of a repository",
+        "mcp_weather_forecast": "Get the weather forecast for a city",
+        "mcp_maps_geocode": "Convert a street address into coordinates",
+        "mcp_slack_postMessage": "Post a message to a Slack channel",
+        "mcp_files_readFile": "Read the contents of a file",
+    }
+    tools = [_McpLikeTool(name=n, description=d) for n, d in specs.items()]
+    return ToolCollection(*tools, Terminate())
+
+
+def test_tokenize_splits_tool_names():
+    """Tool names are split on underscores and camel case."""
+    assert tokenize("mcp_github_createIssue") == ["mcp", "github", "create", "issue"]
+
+
+def test_router_ranks_relevant_tools_first():
+    """The best matching tools are selected, after the always-on ones."""
+    router = ToolRouter(_catalog())
+    selected = router.select(
+        "what is the weather forecast in Paris", 1, always=["terminate"]
+    )
+    assert selected == ["terminate", "mcp_weather_forecast"]
+
+    selected = router.select("open an issue on the github repository", 2)
+    assert selected == ["mcp_github_createIssue", "mcp_github_listPullRequests"]
+
+
+def test_index_is_rebuilt_when_tools_change():
+    """Tools added after the index was built can be selected."""
+    collection = _catalog()
+    router = ToolRouter(collection)
+    router.select("weather", 1)
+    collection.add_tool(
+        _McpLikeTool(name="mcp_db_query", description="Run an SQL query")
+    )
+    assert router.select("run a sql query", 1) == ["mcp_db_query"]
+
+
+def test_agent_offers_top_k_and_tracks_saved_tokens():
+    """The agent sends the routed subset and counts the schema tokens saved."""
+    agent = ToolCallAgent(available_tools=_catalog(), tool_router_top_k=2)
+    agent.llm = SimpleNamespace(
+        token_counter=SimpleNamespace(count_tools=lambda tools: 100 * len(tools))
+    )
+    agent.memory.add_message(Message.user_message("Post a message on Slack"))
+
+    _, tools, tool_tokens = agent._prompt_prefix()
+    names = [tool["function"]["name"] for tool in tools]
+    assert "terminate" in names and "mcp_slack_postMessage" in names
+    assert len(names) == 3
+    assert tool_tokens == 300
+    assert agent.tool_schema_tokens_saved == 400
@@ -0,0 +1,112 @@
+"""Tests for the persistent search/page cache used by WebSearch."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.tool.search.base import SearchItem
+from app.tool.web_search import WebContentFetcher, WebSearch
+from app.utils.sqlite_cache import SQLiteCache
+
+
+ETAG = '"v1"'
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html><body><p>Cached page</p></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture providing a local server that honours If-None-Match."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    """Expired entries are misses and the least recently used entry is evicted."""
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", ttl=0.1, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a").value == 1
+
+    time.sleep(0.15)
+    assert cache.get("c", allow_stale=True).value == 3
+    assert cache.get("c") is None
+
+
+def test_entries_survive_reopening(tmp_path):
+    """Entries are persisted and visible to a new cache instance."""
+    path = tmp_path / "cache.sqlite3"
+    cache = SQLiteCache(path)
+    cache.set("key", {"items": [1, 2]}, metadata={"etag": ETAG})
+    cache.close()
+
+    entry = SQLiteCache(path).get("key")
+    assert entry.value == {"items": [1, 2]}
+    assert entry.metadata == {"etag": ETAG}
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached(caches):
+    """A repeated, differently spaced query does not hit the engine again."""
+    calls = []
+
+    class _Engine:
+        def perform_search(self, query, num_results=10, *args, **kwargs):
+            calls.append(query)
+            return [SearchItem(title="Result", url="https://example.com")]
+
+    tool = WebSearch()
+    tool._search_engine = {"google": _Engine()}
+    params = {"lang": "en", "country": "us"}
+    first = await tool._timed_search("google", "Python  asyncio", 5, params)
+    second = await tool._timed_search("google", "python asyncio", 5, params)
+    assert first == second
+    assert calls == ["Python  asyncio"]
+
+
+@pytest.mark.asyncio
+async def test_stale_page_is_revalidated(caches, server):
+    """A stale page is revalidated with its ETag instead of refetched."""
+    url = f"http://127.0.0.1:{server.server_address[1]}/page"
+    assert await WebContentFetcher.fetch_content(url) == "Cached page"
+    assert await WebContentFetcher.fetch_content(url) == "Cached page"
+    assert server.requests == [None]
+
+    caches["page"].ttl = 0
+    assert await WebContentFetcher.fetch_content(url) == "Cached page"
+    assert server.requests == [None, ETAG]
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])